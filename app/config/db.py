@@ -1,11 +1,12 @@
 import os
 import logging
+import threading
 from pathlib import Path
-from sshtunnel import SSHTunnelForwarder
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from app.config.settings import SSH_CONFIG, DB_CONFIG
+from app.config.settings import SSH_CONFIG, DB_CONFIG, DB_POOL_CONFIG, LOGGING_CONFIG
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -13,88 +14,179 @@ load_dotenv()
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO,  # Change from DEBUG to INFO
+    level=LOGGING_CONFIG["LOG_LEVEL"],
     format="%(asctime)s | %(levelname)s | %(message)s",
 )
 logger = logging.getLogger(__name__)
 
-# Initialize database configuration
-logger.info("Initializing database configuration...")
-
 # Resolve paths
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 SSH_KEY_PATH = str(BASE_DIR / "BastionHostKeyPair.pem")
-logger.debug(f"Base directory resolved: {BASE_DIR}")
-logger.debug(f"Using SSH Key Path: {SSH_KEY_PATH}")
 
 # Get environment type from the .env file
 ENVIRONMENT_TYPE = os.getenv("ENVIRONMENT_TYPE", "local").lower()
 
-# Check if the environment is local or EC2
-if ENVIRONMENT_TYPE == "local":
+# The tunnel and engines are created by init_db() (FastAPI startup hook, or first use
+# in workers and scripts), so importing this module never touches the network.
+# Routes use the async engine; job workers and scripts keep the sync one.
+tunnel = None
+engine = None
+async_engine = None
+DB_URL = None
+_init_lock = threading.Lock()
+
+# Bound to the engines by init_db()
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+# Rows stay readable after commit, since responses are built from them once the transaction is done
+AsyncSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False)
+
+# Base for SQLAlchemy models
+Base = declarative_base()
+
+
+def _open_ssh_tunnel():
     # Ensure SSH key file exists
     if not os.path.exists(SSH_KEY_PATH):
         logger.error("SSH Key file not found! Check the path.")
         raise FileNotFoundError("SSH Key file not found at the specified path.")
-    else:
-        logger.info("SSH Key file found, proceeding with SSH tunnel setup.")
 
-    # Establish SSH Tunnel
+    from sshtunnel import SSHTunnelForwarder
+
     try:
         logger.info("Establishing SSH tunnel...")
-        tunnel = SSHTunnelForwarder(
+        ssh_tunnel = SSHTunnelForwarder(
             (SSH_CONFIG["SSH_HOST"], SSH_CONFIG["SSH_PORT"]),
             ssh_username=SSH_CONFIG["SSH_USERNAME"],
             ssh_pkey=SSH_KEY_PATH,
             remote_bind_address=(DB_CONFIG["DB_HOST"], DB_CONFIG["DB_PORT"]),
         )
-        tunnel.start()
+        ssh_tunnel.start()
         logger.info("SSH tunnel established successfully.")
-        logger.debug(f"Local bind port: {tunnel.local_bind_port}")
+        logger.debug(f"Local bind port: {ssh_tunnel.local_bind_port}")
+        return ssh_tunnel
     except Exception as e:
         logger.error(f"Failed to establish SSH tunnel: {e}")
         raise
 
-    # Database connection string (localhost mapped via SSH tunnel)
-    DB_URL = (
-        f"postgresql://{DB_CONFIG['DB_USER']}:{DB_CONFIG['DB_PASS']}"
-        f"@127.0.0.1:{tunnel.local_bind_port}/{DB_CONFIG['DB_NAME']}"
-    )
-    logger.debug(f"Database URL: {DB_URL}")
 
-else:
-    # If it's EC2, just use the direct DB connection (no SSH tunnel)
-    DB_URL = (
-        f"postgresql://{DB_CONFIG['DB_USER']}:{DB_CONFIG['DB_PASS']}"
-        f"@{DB_CONFIG['DB_HOST']}:{DB_CONFIG['DB_PORT']}/{DB_CONFIG['DB_NAME']}"
+def _pool_options():
+    return {
+        "pool_size": DB_POOL_CONFIG["DB_POOL_SIZE"],
+        "max_overflow": DB_POOL_CONFIG["DB_MAX_OVERFLOW"],
+        "pool_timeout": DB_POOL_CONFIG["DB_POOL_TIMEOUT"],
+        "pool_recycle": DB_POOL_CONFIG["DB_POOL_RECYCLE"],
+        "pool_pre_ping": DB_POOL_CONFIG["DB_POOL_PRE_PING"],
+    }
+
+
+def _create_async_engine(db_url):
+    # asyncpg keeps its own per-connection statement cache, and the dialect caches the
+    # prepared statements on top of it; both follow the one setting so they can be disabled together
+    cache_size = DB_POOL_CONFIG["DB_STATEMENT_CACHE_SIZE"]
+    return create_async_engine(
+        db_url.replace("postgresql://", "postgresql+asyncpg://", 1)
+        + f"?prepared_statement_cache_size={cache_size}",
+        connect_args={"statement_cache_size": cache_size},
+        **_pool_options(),
     )
-    logger.info("Running on EC2, no SSH tunnel required.")
-    logger.debug(f"Database URL: {DB_URL}")
 
-# Create SQLAlchemy engine and session
-try:
-    logger.info("Creating SQLAlchemy engine...")
-    engine = create_engine(DB_URL)
-    logger.info("SQLAlchemy engine created successfully.")
-except Exception as e:
-    logger.error(f"Error creating SQLAlchemy engine: {e}")
-    raise
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def init_db():
+    """Open the SSH tunnel (local environment only) and create both engines; safe to call repeatedly."""
+    global tunnel, engine, async_engine, DB_URL
+    with _init_lock:
+        if engine is not None:
+            return engine
+
+        if ENVIRONMENT_TYPE == "local":
+            tunnel = _open_ssh_tunnel()
+            # Database connection string (localhost mapped via SSH tunnel)
+            DB_URL = (
+                f"postgresql://{DB_CONFIG['DB_USER']}:{DB_CONFIG['DB_PASS']}"
+                f"@127.0.0.1:{tunnel.local_bind_port}/{DB_CONFIG['DB_NAME']}"
+            )
+        else:
+            # If it's EC2, just use the direct DB connection (no SSH tunnel)
+            DB_URL = (
+                f"postgresql://{DB_CONFIG['DB_USER']}:{DB_CONFIG['DB_PASS']}"
+                f"@{DB_CONFIG['DB_HOST']}:{DB_CONFIG['DB_PORT']}/{DB_CONFIG['DB_NAME']}"
+            )
+            logger.info("Running on EC2, no SSH tunnel required.")
+
+        try:
+            engine = create_engine(DB_URL, **_pool_options())
+            async_engine = _create_async_engine(DB_URL)
+            logger.info("SQLAlchemy engines created successfully.")
+        except Exception as e:
+            logger.error(f"Error creating SQLAlchemy engine: {e}")
+            raise
+        SessionLocal.configure(bind=engine)
+        AsyncSessionLocal.configure(bind=async_engine)
+        return engine
+
+
+def get_engine():
+    return engine if engine is not None else init_db()
+
+
+def get_async_engine():
+    if async_engine is None:
+        init_db()
+    return async_engine
+
+
+def get_db_url():
+    get_engine()
+    return DB_URL
+
+
+def close_db():
+    """Dispose of the connection pools and close the tunnel."""
+    global tunnel, engine, async_engine
+    with _init_lock:
+        if engine is not None:
+            engine.dispose()
+            engine = None
+        if async_engine is not None:
+            # Closes pooled asyncpg connections without awaiting them; use
+            # dispose_async_db() from a running loop to close them cleanly
+            async_engine.sync_engine.dispose(close=False)
+            async_engine = None
+        if tunnel is not None:
+            tunnel.stop()
+            tunnel = None
 
-# Base for SQLAlchemy models
-Base = declarative_base()
 
 def get_db():
     """Dependency to get the database session."""
-    logger.info("Creating new database session...")
+    get_engine()
     db = SessionLocal()
     try:
         yield db
-        logger.info("Database session created successfully.")
     except Exception as e:
         logger.error(f"Error during database session: {e}")
         raise
     finally:
         db.close()
-        logger.info("Database session closed.")
+
+
+async def dispose_async_db():
+    """Close the async pool's connections from the event loop that opened them."""
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+def new_async_session():
+    """An async session the caller closes, for work that outlives the request such as a streamed body."""
+    get_async_engine()
+    return AsyncSessionLocal()
+
+
+async def get_async_db():
+    """Dependency to get an async database session for the API routes."""
+    async with new_async_session() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Error during database session: {e}")
+            raise
@@ -23,9 +23,227 @@ DB_CONFIG = {
     "DB_PASS": os.getenv("DB_PASS"),
 }
 
+# Database connection pool configurations, applied to both the sync and the async engine
+DB_POOL_CONFIG = {
+    "DB_POOL_SIZE": int(os.getenv("DB_POOL_SIZE", 10)),
+    "DB_MAX_OVERFLOW": int(os.getenv("DB_MAX_OVERFLOW", 20)),
+    "DB_POOL_TIMEOUT": float(os.getenv("DB_POOL_TIMEOUT", 30)),
+    # Connections older than this are replaced, ahead of server or load-balancer idle timeouts
+    "DB_POOL_RECYCLE": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    # Test each connection on checkout so a dropped tunnel or failover does not surface as a request error
+    "DB_POOL_PRE_PING": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+    # Prepared statements cached per asyncpg connection; set to 0 behind PgBouncer in transaction mode
+    "DB_STATEMENT_CACHE_SIZE": int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100)),
+}
+
 # S3 Configurations
 S3_CONFIG = {
     "AWS_ACCESS_KEY_ID": os.getenv("AWS_ACCESS_KEY_ID"),
     "AWS_SECRET_ACCESS_KEY": os.getenv("AWS_SECRET_ACCESS_KEY"),
     "S3_BUCKET_NAME": os.getenv("S3_BUCKET_NAME"),
+    # Prefix under which transcripts are written; scopes fuzzy key lookups
+    "S3_TRANSCRIPT_PREFIX": os.getenv("S3_TRANSCRIPT_PREFIX", "ConvertedTextFile/"),
+    # Local cache of the transcript key listing and how often it is fully re-listed
+    "S3_KEY_INDEX_DIR": os.getenv("S3_KEY_INDEX_DIR", str(BASE_DIR / ".cache" / "s3_key_index")),
+    "S3_KEY_INDEX_FULL_REFRESH_SECONDS": int(os.getenv("S3_KEY_INDEX_FULL_REFRESH_SECONDS", 3600)),
+    # A lookup miss re-lists everything at most this often; in between it only lists newer keys
+    "S3_KEY_INDEX_MISS_REFRESH_SECONDS": int(os.getenv("S3_KEY_INDEX_MISS_REFRESH_SECONDS", 60)),
+    # Optional endpoint override for MinIO or other S3-compatible stores
+    "S3_ENDPOINT_URL": os.getenv("S3_ENDPOINT_URL"),
+}
+
+# S3 transfer service configurations
+S3_TRANSFER_CONFIG = {
+    "MAX_POOL_CONNECTIONS": int(os.getenv("S3_MAX_POOL_CONNECTIONS", 32)),
+    "MAX_ATTEMPTS": int(os.getenv("S3_MAX_ATTEMPTS", 5)),
+    # Objects at least this large are fetched with parallel ranged GETs
+    "MULTIPART_THRESHOLD_MB": int(os.getenv("S3_MULTIPART_THRESHOLD_MB", 16)),
+    "MULTIPART_CHUNKSIZE_MB": int(os.getenv("S3_MULTIPART_CHUNKSIZE_MB", 8)),
+    "MAX_CONCURRENCY": int(os.getenv("S3_MAX_CONCURRENCY", 10)),
+}
+
+# Whisper model registry configurations
+WHISPER_CONFIG = {
+    # Comma-separated list of model sizes loaded at startup, e.g. "base,small"
+    "WHISPER_MODEL_SIZES": [s.strip() for s in os.getenv("WHISPER_MODEL_SIZES", "base").split(",") if s.strip()],
+    "WHISPER_DEFAULT_MODEL": os.getenv("WHISPER_DEFAULT_MODEL", "base"),
+    "WHISPER_DEVICE": os.getenv("WHISPER_DEVICE"),  # None lets whisper pick cuda/cpu
+    "WHISPER_MEMORY_BUDGET_MB": int(os.getenv("WHISPER_MEMORY_BUDGET_MB", 4096)),
+    "WHISPER_WARMUP": os.getenv("WHISPER_WARMUP", "true").lower() == "true",
+    # "whisper" (openai-whisper on PyTorch) or "faster-whisper" (CTranslate2, quantized)
+    "WHISPER_BACKEND": os.getenv("WHISPER_BACKEND", "whisper"),
+    # Weight type; empty picks the backend's default (float32 for whisper, int8 for faster-whisper)
+    "WHISPER_COMPUTE_TYPE": os.getenv("WHISPER_COMPUTE_TYPE") or None,
+    # Intra-op threads per worker process (0 = library default); keep workers * threads <= cores
+    "WHISPER_CPU_THREADS": int(os.getenv("WHISPER_CPU_THREADS", 0)),
+    # 1 decodes greedily; wider beams are slower and slightly more accurate
+    "WHISPER_BEAM_SIZE": int(os.getenv("WHISPER_BEAM_SIZE", 1)),
+}
+
+# Transcription engine configurations
+TRANSCRIPTION_CONFIG = {
+    # Number of worker processes, each holding its own preloaded Whisper model (0 = run in-process)
+    "TRANSCRIPTION_WORKERS": int(os.getenv("TRANSCRIPTION_WORKERS", 2)),
+    # Jobs allowed to wait for a free worker before the engine reports busy
+    "TRANSCRIPTION_QUEUE_DEPTH": int(os.getenv("TRANSCRIPTION_QUEUE_DEPTH", 8)),
+    # Decoded answers longer than this are split at pauses and the chunks transcribed in parallel (0 = never)
+    "TRANSCRIPTION_LONG_AUDIO_SECONDS": float(os.getenv("TRANSCRIPTION_LONG_AUDIO_SECONDS", 0)),
+    "TRANSCRIPTION_CHUNK_SECONDS": float(os.getenv("TRANSCRIPTION_CHUNK_SECONDS", 60)),
+    # Audio shared by neighbouring chunks, so a word at a cut is heard whole by one of them
+    "TRANSCRIPTION_CHUNK_OVERLAP_SECONDS": float(os.getenv("TRANSCRIPTION_CHUNK_OVERLAP_SECONDS", 1.0)),
+    # Chunks of one answer transcribed at the same time; defaults to the number of workers
+    "TRANSCRIPTION_CHUNK_WORKERS": int(os.getenv("TRANSCRIPTION_CHUNK_WORKERS", 0)),
+}
+
+# Live transcription of answers streamed over the interview WebSocket
+LIVE_TRANSCRIPTION_CONFIG = {
+    # Longest stretch of uncommitted audio transcribed at once; Whisper itself works in 30 s windows
+    "LIVE_WINDOW_SECONDS": float(os.getenv("LIVE_WINDOW_SECONDS", 30)),
+    # New audio needed before the window is transcribed again for a partial transcript
+    "LIVE_STEP_SECONDS": float(os.getenv("LIVE_STEP_SECONDS", 2)),
+    # The newest audio is never committed, since the words at the edge of a window are the least reliable
+    "LIVE_COMMIT_LAG_SECONDS": float(os.getenv("LIVE_COMMIT_LAG_SECONDS", 2)),
+    "LIVE_OVERLAP_SECONDS": float(os.getenv("LIVE_OVERLAP_SECONDS", 1.0)),
+}
+
+# Interview processing pipeline configurations (workers per stage)
+PIPELINE_CONFIG = {
+    "DOWNLOAD_CONCURRENCY": int(os.getenv("PIPELINE_DOWNLOAD_CONCURRENCY", 4)),
+    "EXTRACT_CONCURRENCY": int(os.getenv("PIPELINE_EXTRACT_CONCURRENCY", 2)),
+    "TRANSCRIBE_CONCURRENCY": int(os.getenv("PIPELINE_TRANSCRIBE_CONCURRENCY", max(TRANSCRIPTION_CONFIG["TRANSCRIPTION_WORKERS"], 1))),
+    "UPLOAD_CONCURRENCY": int(os.getenv("PIPELINE_UPLOAD_CONCURRENCY", 4)),
+    # Items allowed to wait between two stages
+    "QUEUE_SIZE": int(os.getenv("PIPELINE_QUEUE_SIZE", 2)),
+}
+
+# Audio extraction configurations
+AUDIO_CONFIG = {
+    # "pipe" decodes through ffmpeg into memory, "file" writes an intermediate WAV
+    "AUDIO_EXTRACTION_MODE": os.getenv("AUDIO_EXTRACTION_MODE", "pipe").lower(),
+    # Decode straight from the S3 object body instead of downloading the video first
+    "AUDIO_STREAM_FROM_S3": os.getenv("AUDIO_STREAM_FROM_S3", "false").lower() == "true",
+}
+
+# Local cache of downloaded videos and decoded audio, keyed by S3 ETag
+MEDIA_CACHE_CONFIG = {
+    "MEDIA_CACHE_ENABLED": os.getenv("MEDIA_CACHE_ENABLED", "true").lower() == "true",
+    "MEDIA_CACHE_DIR": os.getenv("MEDIA_CACHE_DIR", str(BASE_DIR / ".cache" / "media")),
+    # Disk budget; least recently used entries are evicted beyond it
+    "MEDIA_CACHE_MAX_MB": int(os.getenv("MEDIA_CACHE_MAX_MB", 10240)),
+    # Also keep decoded 16 kHz audio, so a re-run skips both the download and ffmpeg
+    "MEDIA_CACHE_AUDIO": os.getenv("MEDIA_CACHE_AUDIO", "true").lower() == "true",
+}
+
+# LLM scoring engine configurations
+SCORING_CONFIG = {
+    # "openai" calls the API, "fake" returns deterministic local scores for tests and benchmarks
+    "SCORING_BACKEND": os.getenv("SCORING_BACKEND", "openai").lower(),
+    "SCORING_MODEL": os.getenv("SCORING_MODEL", "gpt-4o-mini"),
+    "SCORING_REQUESTS_PER_MINUTE": int(os.getenv("SCORING_REQUESTS_PER_MINUTE", 500)),
+    "SCORING_TOKENS_PER_MINUTE": int(os.getenv("SCORING_TOKENS_PER_MINUTE", 200000)),
+    "SCORING_MAX_CONCURRENCY": int(os.getenv("SCORING_MAX_CONCURRENCY", 8)),
+    "SCORING_MAX_RETRIES": int(os.getenv("SCORING_MAX_RETRIES", 4)),
+    "SCORING_BACKOFF_SECONDS": float(os.getenv("SCORING_BACKOFF_SECONDS", 0.5)),
+    "SCORING_FAKE_LATENCY_SECONDS": float(os.getenv("SCORING_FAKE_LATENCY_SECONDS", 0.0)),
+}
+
+# Score cache configurations
+SCORE_CACHE_CONFIG = {
+    "SCORE_CACHE_ENABLED": os.getenv("SCORE_CACHE_ENABLED", "true").lower() == "true",
+    # "sqlite" keeps the cache in a local file, "postgres" shares it through the application database
+    "SCORE_CACHE_BACKEND": os.getenv("SCORE_CACHE_BACKEND", "sqlite").lower(),
+    "SCORE_CACHE_PATH": os.getenv("SCORE_CACHE_PATH", str(BASE_DIR / ".cache" / "score_cache.db")),
+    "SCORE_CACHE_MAX_ENTRIES": int(os.getenv("SCORE_CACHE_MAX_ENTRIES", 100000)),
+    "SCORE_CACHE_TTL_SECONDS": int(os.getenv("SCORE_CACHE_TTL_SECONDS", 30 * 24 * 3600)),
+}
+
+# Interview processing job queue configurations
+JOB_CONFIG = {
+    # Job loops run inside each API process; set to 0 when dedicated workers (python -m app.worker) are deployed.
+    # Heavy work is bounded by the scheduler slots, so more loops than slots lets small interviews run alongside large ones
+    "JOB_API_WORKERS": int(os.getenv("JOB_API_WORKERS", 4)),
+    # Worker processes started by python -m app.worker, and job loops in each of them
+    "JOB_WORKER_PROCESSES": int(os.getenv("JOB_WORKER_PROCESSES", 2)),
+    "JOB_LOOPS_PER_WORKER": int(os.getenv("JOB_LOOPS_PER_WORKER", 4)),
+    "JOB_POLL_SECONDS": float(os.getenv("JOB_POLL_SECONDS", 2)),
+    "JOB_HEARTBEAT_SECONDS": float(os.getenv("JOB_HEARTBEAT_SECONDS", 30)),
+    # Running jobs whose heartbeat is older than this are treated as crashed and re-claimed
+    "JOB_STALE_SECONDS": int(os.getenv("JOB_STALE_SECONDS", 300)),
+    "JOB_MAX_ATTEMPTS": int(os.getenv("JOB_MAX_ATTEMPTS", 3)),
+}
+
+# Fair scheduler for the audio decode and transcription work of every job in a process
+SCHEDULER_CONFIG = {
+    # Concurrent decode+transcribe slots per process; 0 derives it from this process's share of the host
+    "SCHEDULER_SLOTS": int(os.getenv("SCHEDULER_SLOTS", 0)),
+    # Processes on this host that run job loops and split its cores and memory between them;
+    # 0 counts JOB_WORKER_PROCESSES plus the API process when JOB_API_WORKERS > 0
+    "SCHEDULER_HOST_PROCESSES": int(os.getenv("SCHEDULER_HOST_PROCESSES", 0)),
+    "SCHEDULER_CPUS_PER_SLOT": float(os.getenv("SCHEDULER_CPUS_PER_SLOT", 1)),
+    # Decoded audio, Whisper activations and ffmpeg buffers for one video
+    "SCHEDULER_MEMORY_PER_SLOT_MB": int(os.getenv("SCHEDULER_MEMORY_PER_SLOT_MB", 1024)),
+    # Kept free for the API, the loaded Whisper models and the OS
+    "SCHEDULER_RESERVED_MEMORY_MB": int(os.getenv("SCHEDULER_RESERVED_MEMORY_MB", 2048)),
+}
+
+# WebSocket progress hub configurations
+PROGRESS_CONFIG = {
+    # "memory" delivers within one process, "postgres" fans out across processes via LISTEN/NOTIFY
+    "PROGRESS_BACKEND": os.getenv("PROGRESS_BACKEND", "memory").lower(),
+    "PROGRESS_CHANNEL": os.getenv("PROGRESS_CHANNEL", "interview_progress"),
+    # Progress updates per interview are coalesced to at most this rate
+    "PROGRESS_MAX_UPDATES_PER_SECOND": float(os.getenv("PROGRESS_MAX_UPDATES_PER_SECOND", 2)),
+    # Messages buffered per subscriber before stale ones are dropped
+    "PROGRESS_SUBSCRIBER_QUEUE_SIZE": int(os.getenv("PROGRESS_SUBSCRIBER_QUEUE_SIZE", 16)),
+}
+
+# Local semantic similarity index configurations
+SEMANTIC_INDEX_CONFIG = {
+    # "llm" keeps the semantic and topic scores from the scoring model, "local" computes them from the index
+    "SEMANTIC_SCORER": os.getenv("SEMANTIC_SCORER", "llm").lower(),
+    "SEMANTIC_INDEX_DIR": os.getenv("SEMANTIC_INDEX_DIR", str(BASE_DIR / ".cache" / "semantic_index")),
+    # Width of the hashed term vectors; larger means fewer collisions and a bigger matrix
+    "SEMANTIC_INDEX_DIMENSIONS": int(os.getenv("SEMANTIC_INDEX_DIMENSIONS", 4096)),
+}
+
+# Local speech analysis configurations
+SPEECH_ANALYSIS_CONFIG = {
+    # "llm" keeps the grammar and disfluency scores from the scoring model, "local" derives them from Whisper output
+    "FLUENCY_SCORER": os.getenv("FLUENCY_SCORER", "llm").lower(),
+    # "rules" uses built-in checks; "languagetool" uses language_tool_python (needs Java)
+    "GRAMMAR_CHECKER": os.getenv("GRAMMAR_CHECKER", "rules").lower(),
+    # Gaps between words longer than this count as long pauses
+    "LONG_PAUSE_SECONDS": float(os.getenv("LONG_PAUSE_SECONDS", 1.0)),
+    # Word timings make Whisper a little slower but are needed for pause and speech-rate features
+    "WHISPER_WORD_TIMESTAMPS": os.getenv("WHISPER_WORD_TIMESTAMPS", "true").lower() == "true",
+}
+
+# Read-through cache for Interview, Questions and Answers rows
+METADATA_CACHE_CONFIG = {
+    "METADATA_CACHE_ENABLED": os.getenv("METADATA_CACHE_ENABLED", "true").lower() == "true",
+    "METADATA_CACHE_MAX_ENTRIES": int(os.getenv("METADATA_CACHE_MAX_ENTRIES", 10000)),
+    "METADATA_CACHE_TTL_SECONDS": int(os.getenv("METADATA_CACHE_TTL_SECONDS", 600)),
+    # "none" keeps entries per process, "sqlite" also shares them between workers on the same host
+    "METADATA_CACHE_SHARED_BACKEND": os.getenv("METADATA_CACHE_SHARED_BACKEND", "none").lower(),
+    "METADATA_CACHE_SHARED_PATH": os.getenv("METADATA_CACHE_SHARED_PATH", str(BASE_DIR / ".cache" / "metadata_cache.db")),
+}
+
+# Metrics and profiling configurations
+METRICS_CONFIG = {
+    "LOOP_LAG_INTERVAL_SECONDS": float(os.getenv("LOOP_LAG_INTERVAL_SECONDS", 0.25)),
+    # Lets a request ask for a profile with "X-Profile: 1" or "?profile=1"; keep off in production
+    "PROFILER_ENABLED": os.getenv("PROFILER_ENABLED", "false").lower() == "true",
+    "PROFILER_DIR": os.getenv("PROFILER_DIR", str(BASE_DIR / ".cache" / "profiles")),
+}
+
+# Logging configurations
+LOGGING_CONFIG = {
+    # DEBUG adds per-item pipeline messages and one JSON line per timing span
+    "LOG_LEVEL": os.getenv("LOG_LEVEL", "INFO").upper(),
+}
+
+# Process role configurations
+APP_CONFIG = {
+    # API-only processes serve HTTP and WebSockets and queue jobs, but never load Whisper or run jobs
+    "API_ONLY": os.getenv("API_ONLY", "false").lower() == "true",
 }
@@ -7,6 +7,6 @@ class Answers(Base):
     __tablename__ = 'answers'
     answer_id = Column(BigInteger, primary_key=True)
     answer = Column(Text)
-    question_id = Column(BigInteger)
+    question_id = Column(BigInteger, index=True)
     created_at = Column(TIMESTAMP)
     updated_at = Column(TIMESTAMP)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, BigInteger, Numeric, Text, TIMESTAMP
+from sqlalchemy import Column, Integer, String, BigInteger, Numeric, Text, TIMESTAMP, Index
 from app.config.db import Base
 
 class Evaluation(Base):
@@ -15,5 +15,12 @@ class Evaluation(Base):
     videofilename = Column(Text)
     videofile_s3key = Column(Text)
     asrfile_s3key = Column(Text)
+    # ETag of the video the transcript was made from; a different ETag means the video changed
+    video_etag = Column(Text)
     created_at = Column(TIMESTAMP)
-    updated_at = Column(TIMESTAMP)
\ No newline at end of file
+    updated_at = Column(TIMESTAMP)
+
+    __table_args__ = (
+        # As in migrations/001
+        Index("ix_evaluation_interview_question", "interview_id", "question_id"),
+    )
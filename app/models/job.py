@@ -0,0 +1,39 @@
+from sqlalchemy import Column, BigInteger, Boolean, Integer, SmallInteger, String, Text, TIMESTAMP, Index, text
+from app.config.db import Base
+
+# BIGINT primary keys only autoincrement as INTEGER on SQLite
+JobId = BigInteger().with_variant(Integer, "sqlite")
+
+class ProcessingJob(Base):
+    __tablename__ = "processing_job"
+
+    job_id = Column(JobId, primary_key=True, autoincrement=True)
+    interview_id = Column(BigInteger, nullable=False, index=True)
+    status = Column(String(16), nullable=False, default="queued")  # queued, running, completed, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    priority = Column(SmallInteger, nullable=False, default=1)  # lower runs first, see PRIORITY_CLASSES
+    force = Column(Boolean, nullable=False, default=False)  # re-transcribe even when transcripts are current
+    worker_id = Column(Text)
+    error = Column(Text)
+    created_at = Column(TIMESTAMP)
+    started_at = Column(TIMESTAMP)
+    heartbeat_at = Column(TIMESTAMP)
+    finished_at = Column(TIMESTAMP)
+
+    __table_args__ = (
+        Index("ix_processing_job_status_created_at", "status", "created_at"),
+        Index("ix_processing_job_status_priority_created_at", "status", "priority", "created_at"),
+        # At most one active job per interview, as in migrations/002
+        Index("ux_processing_job_active_interview", "interview_id", unique=True,
+              postgresql_where=text("status IN ('queued', 'running')"),
+              sqlite_where=text("status IN ('queued', 'running')")),
+    )
+
+class ProcessingJobCheckpoint(Base):
+    __tablename__ = "processing_job_checkpoint"
+
+    job_id = Column(JobId, primary_key=True)
+    evaluation_id = Column(BigInteger, primary_key=True)
+    asrfile_s3key = Column(Text)
+    video_etag = Column(Text)
+    created_at = Column(TIMESTAMP)
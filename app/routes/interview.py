@@ -1,34 +1,60 @@
 # Importing necessary modules and dependencies
 import os
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+import json
+import time
+import asyncio
+import logging
+import threading
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
+from datetime import datetime
 from pathlib import Path
-from app.config.db import get_db
-from app.models.interview import Interview
+from app.config.db import get_db, get_async_db, new_async_session
 from app.models.evaluation import Evaluation
-from app.models.questions import Questions
-from app.models.answers import Answers
-from app.utils.s3_utils import download_file_from_s3, upload_file_to_s3
-from app.config.settings import S3_CONFIG
-from app.routes.websocket import connected_clients
-import moviepy.editor as mp
-import traceback
-import whisper
-from sqlalchemy.sql import text
-import boto3
-from openai import OpenAI
+from app.utils.s3_utils import download_file_from_s3, open_s3_object_stream, head_s3_object, s3_key_from_uri, S3KeyIndex, get_s3_service
+from app.config.settings import S3_CONFIG, PIPELINE_CONFIG, AUDIO_CONFIG, MEDIA_CACHE_CONFIG, SEMANTIC_INDEX_CONFIG, SPEECH_ANALYSIS_CONFIG
+from app.services.progress_hub import progress_hub
+from app.services.transcription_engine import transcription_engine
+from app.services.audio import extract_audio, decode_audio_stream
+from app.services.pipeline import PipelineStage, run_pipeline
+from app.services.scoring import get_scoring_engine, PROMPT_VERSION
+from app.services.db_writes import EvaluationBatchWriter
+from app.services.semantic_index import semantic_index, refresh_semantic_index
+from app.services.speech_analysis import analyze_interview
+from app.services.metadata_cache import get_interview, get_interviews, metadata_cache
+from app.services.jobs import submit_job, submit_jobs, get_job, get_checkpoints, record_checkpoint, PRIORITY_CLASSES, priority_name
+from app.services.scheduler import scheduler
+from app.services.media_cache import media_cache
+from app.services.score_cache import get_score_cache, score_cache_key
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Create a FastAPI router
 router = APIRouter()
 
 # Define Pydantic models for request and response validation
+Priority = Literal["urgent", "normal", "bulk"]
+
 class InterviewRequest(BaseModel):
     interview_id: int
+    # Only used when queueing processing; urgent jobs are claimed and scheduled first
+    priority: Priority = "normal"
+    # Re-transcribe every video, even those whose transcript is current
+    force: bool = False
+
+class BatchInterviewRequest(BaseModel):
+    interview_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    priority: Priority = "normal"
+    force: bool = False
 
 class InterviewResponse(BaseModel):
     interview_id: int
@@ -36,6 +62,32 @@ class InterviewResponse(BaseModel):
     manager_id: int
     status: str
     message: str
+    job_id: Optional[int] = None
+
+class BatchJobResult(BaseModel):
+    interview_id: int
+    status: str
+    job_id: Optional[int] = None
+    priority: Optional[Priority] = None
+
+class BatchInterviewResponse(BaseModel):
+    queued: int
+    already_queued: int
+    not_found: List[int]
+    jobs: List[BatchJobResult]
+
+class JobStatusResponse(BaseModel):
+    job_id: int
+    interview_id: int
+    status: str
+    priority: str
+    attempts: int
+    evaluations_completed: int
+    worker_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
 class ScoringResponse(BaseModel):
     interview_id: int
@@ -46,250 +98,720 @@ class ScoringResponse(BaseModel):
     disfluency_score: float
     message: str
 
-# Route to start processing an interview asynchronously
+SCORE_FIELDS = ("semantic_similarity_score", "broad_topic_sim_score", "grammar_score", "disfluency_score")
+
+class QuestionScores(BaseModel):
+    evaluation_id: int
+    question_id: Optional[int] = None
+    status: Literal["scored", "failed"]
+    semantic_similarity_score: Optional[float] = None
+    broad_topic_sim_score: Optional[float] = None
+    grammar_score: Optional[float] = None
+    disfluency_score: Optional[float] = None
+    error: Optional[str] = None
+
+class InterviewScoresResponse(BaseModel):
+    interview_id: int
+    scored: int
+    failed: List[int]
+    results: List[QuestionScores]
+    message: str
+
+# Route to queue processing of an interview
 @router.post("/process-interview", response_model=InterviewResponse)
-async def process_interview(request: InterviewRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def process_interview(request: InterviewRequest, db: AsyncSession = Depends(get_async_db)):
     # Check if the interview exists in the database
-    interview = db.query(Interview).filter(Interview.interview_id == request.interview_id).first()
+    interview = await db.run_sync(get_interview, request.interview_id)
 
     if not interview:
         raise HTTPException(status_code=404, detail="Interview ID not found in the database")
 
-    print(f"Processing interview {request.interview_id} for candidate {interview.candidate_id}...")
-
-    # Add the file processing task to the background queue
-    background_tasks.add_task(process_files, interview.interview_id, db)
+    # Queue a durable job; re-submitting an interview that is already queued or running returns the same job
+    job, created = await db.run_sync(submit_job, interview.interview_id, PRIORITY_CLASSES[request.priority], request.force)
+    logger.info(f"{'Queued' if created else 'Already queued'} job {job.job_id} for interview {request.interview_id}, candidate {interview.candidate_id}")
 
     return InterviewResponse(
         interview_id=interview.interview_id,
         candidate_id=interview.candidate_id,
         manager_id=interview.manager_id,
-        status="processing",
-        message="The Processing has started. Connect to the WebSocket for progress updates.",
+        status=job.status,
+        message="The Processing has been queued. Poll /jobs/{job_id} or connect to the WebSocket for progress updates.",
+        job_id=job.job_id,
+    )
+
+# Route to queue processing of many interviews in one call
+@router.post("/process-interviews", response_model=BatchInterviewResponse)
+async def process_interviews(request: BatchInterviewRequest, db: AsyncSession = Depends(get_async_db)):
+    interview_ids = list(dict.fromkeys(request.interview_ids))
+    interviews = await db.run_sync(get_interviews, interview_ids)
+    not_found = [interview_id for interview_id in interview_ids if interview_id not in interviews]
+
+    # One transaction for the whole batch; the scheduler decides how many of them run at once
+    submitted = await db.run_sync(
+        submit_jobs, [i for i in interview_ids if i in interviews], PRIORITY_CLASSES[request.priority], request.force
+    )
+    queued = sum(created for _, created in submitted.values())
+    logger.info(f"Batch of {len(interview_ids)} interviews: {queued} queued, "
+                f"{len(submitted) - queued} already queued, {len(not_found)} not found")
+
+    return BatchInterviewResponse(
+        queued=queued,
+        already_queued=len(submitted) - queued,
+        not_found=not_found,
+        jobs=[
+            BatchJobResult(interview_id=interview_id, status="not_found") if interview_id in not_found
+            else BatchJobResult(
+                interview_id=interview_id,
+                status=submitted[interview_id][0].status,
+                job_id=submitted[interview_id][0].job_id,
+                priority=priority_name(submitted[interview_id][0].priority),
+            )
+            for interview_id in interview_ids
+        ],
+    )
+
+# Route to check on a processing job
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def job_status(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    job = await db.run_sync(get_job, job_id)
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job ID not found")
+
+    checkpoints = await db.run_sync(get_checkpoints, job.job_id)
+
+    return JobStatusResponse(
+        job_id=job.job_id,
+        interview_id=job.interview_id,
+        status=job.status,
+        priority=priority_name(job.priority),
+        attempts=job.attempts,
+        evaluations_completed=len(checkpoints),
+        worker_id=job.worker_id,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
     )
 
-# Background task to process files related to an interview
-async def process_files(interview_id: int, db: Session):
-    print(f"Started processing files for interview {interview_id}...")
+def _etag(head):
+    return head["ETag"].strip('"') if head and head.get("ETag") else None
 
+async def _find_current_transcripts(evaluations, bucket_name):
+    """HEAD every video and find the evaluations whose transcript was made from it as it is now.
+
+    Returns ({evaluation_id: video HEAD or None}, {evaluation_id: video ETag of current transcripts}).
+    Transcripts written before ETags were recorded count as current when they are newer than
+    the video, which costs one more HEAD for the transcript.
+    """
+    async def head(key):
+        try:
+            return await asyncio.to_thread(head_s3_object, bucket_name, key)
+        except Exception as e:
+            logger.warning(f"HEAD failed for {key}: {e}")
+            return None
+
+    heads = dict(zip(
+        (e.evaluation_id for e in evaluations),
+        await asyncio.gather(*(head(e.videofile_s3key.replace("s3://seekers3data/", "")) for e in evaluations)),
+    ))
+    legacy = [e for e in evaluations if e.asrfile_s3key and not e.video_etag and heads[e.evaluation_id]]
+    transcript_heads = dict(zip(
+        (e.evaluation_id for e in legacy),
+        await asyncio.gather(*(head(s3_key_from_uri(e.asrfile_s3key)) for e in legacy)),
+    ))
+
+    current = {}
+    for evaluation in evaluations:
+        video = heads[evaluation.evaluation_id]
+        if not evaluation.asrfile_s3key or video is None:
+            continue
+        if evaluation.video_etag:
+            if evaluation.video_etag == _etag(video):
+                current[evaluation.evaluation_id] = evaluation.video_etag
+            continue
+        transcript = transcript_heads.get(evaluation.evaluation_id)
+        if transcript is not None and transcript["LastModified"] >= video["LastModified"]:
+            current[evaluation.evaluation_id] = _etag(video)
+    return heads, current
+
+# Job handler to process files related to an interview
+async def process_files(interview_id: int, db: Session, job_id: Optional[int] = None, force: bool = False):
+    logger.info(f"Started processing files for interview {interview_id}...")
+
+    # Job loops can share the API's event loop, so every sync-Session call runs in a thread
     # Fetch evaluations related to the interview
-    evaluations = db.query(Evaluation).filter(Evaluation.interview_id == interview_id).all()
+    evaluations = await asyncio.to_thread(
+        lambda: db.query(Evaluation).filter(Evaluation.interview_id == interview_id).all()
+    )
 
     if not evaluations:
-        print(f"No evaluations found for interview {interview_id}.")
+        logger.info(f"No evaluations found for interview {interview_id}.")
         return
 
-    print(f"Found {len(evaluations)} evaluations for interview {interview_id}...")
+    logger.info(f"Found {len(evaluations)} evaluations for interview {interview_id}...")
 
     # Set up a local directory for downloaded videos
     base_dir = Path(__file__).resolve().parent.parent.parent
     videos_dir = base_dir / "videos"
     videos_dir.mkdir(parents=True, exist_ok=True)
 
-    downloaded_files = []
+    bucket_name = S3_CONFIG["S3_BUCKET_NAME"]
 
-    # Loop through evaluations and process each video file
-    for evaluation in evaluations:
-        print(f"Processing evaluation {evaluation.evaluation_id}...")
+    # ASR keys are written in one transaction at the end
+    writer = EvaluationBatchWriter(db)
+
+    # A restarted job resumes after the evaluations it already finished
+    checkpoints = await asyncio.to_thread(get_checkpoints, db, job_id, True) if job_id else {}
+    job = await asyncio.to_thread(get_job, db, job_id) if job_id else None
+    priority = job.priority if job else PRIORITY_CLASSES["normal"]
+    force = bool(job.force) if job else force
+    if checkpoints:
+        logger.info(f"Resuming job {job_id}: {len(checkpoints)} evaluations already done")
 
+    # Only new or changed videos are transcribed again, unless the job was forced
+    pending = [e for e in evaluations if e.videofile_s3key and e.evaluation_id not in checkpoints]
+    heads, current = await _find_current_transcripts(pending, bucket_name)
+    if force:
+        current = {}
+
+    # Build one pipeline item per evaluation that has a video
+    items = []
+    for evaluation in evaluations:
         videofile_s3key = evaluation.videofile_s3key
 
         if not videofile_s3key:
-            print(f"No videofile_s3key found for evaluation {evaluation.evaluation_id}, skipping...")
+            logger.debug(f"No videofile_s3key found for evaluation {evaluation.evaluation_id}, skipping...")
             continue
 
-        # Extract the S3 key and prepare for download
-        s3_key = videofile_s3key.replace("s3://seekers3data/", "")
-        bucket_name = S3_CONFIG["S3_BUCKET_NAME"]
-        local_path = videos_dir / Path(s3_key).name
-
-        total_size = 0
-        bytes_transferred = 0
-
-        # Progress callback to send updates over WebSocket
-        async def progress_callback(bytes_transferred, total_size):
-            progress = int((bytes_transferred / total_size) * 100)
-            print(f"Sending progress update: {progress}% for interview {interview_id}")
-            if interview_id in connected_clients:
-                await connected_clients[interview_id].send_json({
-                    "status": "in_progress",
-                    "interview_id": interview_id,
-                    "progress": progress,
-                    "message": f"Downloading {progress}% complete for video {s3_key}",
-                })
-
-        print(f"Downloading video file from S3: {s3_key}...")
-
-        # Download the video file from S3
-        download_file_from_s3(bucket_name, s3_key, str(local_path), progress_callback)
-        downloaded_files.append(local_path)
-
-        print(f"Processing video file for transcription: {local_path}...")
-
-        # Transcribe the video file and upload the text to S3
-        asr_file_path = await process_video_file(str(local_path), "ConvertedTextFile/")
-
-        if asr_file_path:
-            # Update the ASR filename in the database
-            update_asr_filename_in_postgres(db, videofile_s3key, asr_file_path)
+        if evaluation.evaluation_id in checkpoints:
+            writer.add_asr_key(evaluation.evaluation_id, *checkpoints[evaluation.evaluation_id])
+            continue
 
-    print(f"All video files processed for interview {interview_id}.")
+        if evaluation.evaluation_id in current:
+            if not evaluation.video_etag:
+                # Record the ETag of a transcript made before ETags were tracked
+                writer.add_asr_key(evaluation.evaluation_id, evaluation.asrfile_s3key, current[evaluation.evaluation_id])
+            continue
 
-    # Notify the WebSocket clients about completion
-    if interview_id in connected_clients:
-        await connected_clients[interview_id].send_json({
-            "status": "completed",
-            "interview_id": interview_id,
-            "message": "Downloading and transcription completed successfully."
+        s3_key = videofile_s3key.replace("s3://seekers3data/", "")
+        head = heads.get(evaluation.evaluation_id)
+        items.append({
+            "evaluation_id": evaluation.evaluation_id,
+            "videofile_s3key": videofile_s3key,
+            "s3_key": s3_key,
+            # Prefixed with the evaluation, since keys from different interviews share basenames
+            "local_path": str(videos_dir / f"{evaluation.evaluation_id}_{Path(s3_key).name}"),
+            "video_etag": _etag(head),
+            "size": head["ContentLength"] if head else None,
+            "audio": None,
+            "audio_path": None,
+            "streamed": False,
         })
-
-    # Clean up downloaded files
-    for file_path in downloaded_files:
+    if current:
+        logger.info(f"Skipping {len(current)} evaluations of interview {interview_id} whose transcripts are current")
+
+    def cache_key(item, kind):
+        # The ETag identifies the content, so a changed video never hits a stale entry
+        if media_cache is None or not item["video_etag"]:
+            return None
+        if kind == "audio":
+            return f"{item['video_etag']}.s16le" if MEDIA_CACHE_CONFIG["MEDIA_CACHE_AUDIO"] else None
+        return item["video_etag"] + Path(item["s3_key"]).suffix
+
+    # Stage 1: download the video from S3 without blocking the event loop
+    async def download(item, stream=AUDIO_CONFIG["AUDIO_STREAM_FROM_S3"], use_audio_cache=True):
+        s3_key = item["s3_key"]
+
+        # Audio decoded on an earlier run needs neither the video nor ffmpeg
+        audio_key = cache_key(item, "audio")
+        if use_audio_cache and audio_key and media_cache.has("audio", audio_key):
+            item["cached_audio"] = True
+            return item
+
+        video_key = cache_key(item, "video")
+        if video_key and await asyncio.to_thread(media_cache.fetch, "video", video_key, item["local_path"]):
+            logger.debug(f"Video {s3_key} served from the media cache")
+            item["streamed"] = False
+            return item
+
+        if stream and AUDIO_CONFIG["AUDIO_EXTRACTION_MODE"] == "pipe":
+            # The extract stage decodes straight from the S3 object body
+            item["streamed"] = True
+            return item
+
+        # Progress callback to publish coalesced updates to every WebSocket subscriber
+        def progress_callback(bytes_transferred, total_size):
+            progress = int((bytes_transferred / total_size) * 100)
+            progress_hub.publish_progress_threadsafe(interview_id, {
+                "status": "in_progress",
+                "interview_id": interview_id,
+                "progress": progress,
+                "message": f"Downloading {progress}% complete for video {s3_key}",
+            })
+
+        logger.debug(f"Downloading video file from S3: {s3_key}...")
+        # Never write through a link left by an earlier run; it may share its file with the cache
+        _remove_files(item["local_path"])
+        await asyncio.to_thread(download_file_from_s3, bucket_name, s3_key, item["local_path"], progress_callback, item["size"])
+        if video_key:
+            await asyncio.to_thread(media_cache.store, "video", video_key, item["local_path"])
+        return item
+
+    def release_slot(item):
+        if item.pop("slot", False):
+            scheduler.release(interview_id)
+
+    # Stage 2: decode the audio track, in memory when possible
+    async def extract(item):
+        # Decoding and transcription are the CPU- and memory-heavy part; the scheduler slot
+        # taken here is shared fairly with every other job and held until transcription ends
+        await scheduler.acquire(interview_id, priority)
+        item["slot"] = True
         try:
-            os.remove(file_path)
-            print(f"Deleted downloaded file: {file_path}")
-        except Exception as e:
-            print(f"Error deleting file {file_path}: {e}")
-
-    print(f"Completed processing for interview {interview_id}")
-
-# Function to transcribe a video file using Whisper
-async def process_video_file(video_file_path, upload_dir):
+            audio_stats = None
+            if item.get("cached_audio"):
+                item["audio"] = await asyncio.to_thread(media_cache.load_audio, cache_key(item, "audio"))
+                if item["audio"] is not None:
+                    audio_stats = {
+                        "mode": "cache",
+                        "disk_bytes_read": item["audio"].nbytes // 2,
+                        "disk_bytes_written": 0,
+                        "peak_buffer_bytes": item["audio"].nbytes * 3 // 2,
+                        "process_peak_rss_bytes": 0,
+                    }
+                else:
+                    # Evicted since the download stage looked
+                    await download(item, use_audio_cache=False)
+            if audio_stats is None and item["streamed"]:
+                try:
+                    body = await asyncio.to_thread(open_s3_object_stream, bucket_name, item["s3_key"])
+                    item["audio"], audio_stats = await asyncio.to_thread(decode_audio_stream, body)
+                except Exception as e:
+                    logger.warning(f"Streaming decode failed for {item['s3_key']}, downloading instead: {e}")
+                    item["streamed"] = False
+                    await download(item, stream=False)
+            if audio_stats is None and not item["streamed"]:
+                item["audio"], audio_stats = await asyncio.to_thread(extract_audio, item["local_path"])
+                if isinstance(item["audio"], str):
+                    item["audio_path"] = item["audio"]
+            if audio_stats["mode"] in ("pipe", "stream") and cache_key(item, "audio"):
+                await asyncio.to_thread(media_cache.store_audio, cache_key(item, "audio"), item["audio"])
+        except BaseException:
+            release_slot(item)
+            raise
+        item["audio_stats"] = audio_stats
+        logger.debug(f"Audio extracted for evaluation {item['evaluation_id']}: {audio_stats}")
+        return item
+
+    # Stage 3: transcribe on the transcription engine, then drop the local media
+    async def transcribe(item):
+        try:
+            transcript = await transcription_engine.transcribe_audio(item["audio"])
+            item["text"], item["segments"] = transcript["text"], transcript["segments"]
+            logger.debug(f"Text extracted for evaluation {item['evaluation_id']}: {item['text'][:100]}...")
+        finally:
+            _remove_files(item["local_path"], item["audio_path"])
+            item["audio"] = None
+            release_slot(item)
+        return item
+
+    # Stage 4: upload the transcript and its segment timings to S3
+    async def upload(item):
+        upload_file_path = os.path.join("ConvertedTextFile/", Path(item["s3_key"]).stem + '.txt')
+        failed = await asyncio.to_thread(get_s3_service().upload_texts, bucket_name, [
+            (upload_file_path, item["text"]),
+            (segments_key(upload_file_path), json.dumps(item["segments"])),
+        ])
+        if failed:
+            raise RuntimeError(f"Failed to upload {failed}")
+        item["asr_file_path"] = f"s3://{bucket_name}/{upload_file_path}"
+        return item
+
+    # Stage 5: checkpoint the finished evaluation and queue its ASR key
+    async def save(item):
+        if job_id:
+            await asyncio.to_thread(
+                record_checkpoint, db, job_id, item["evaluation_id"], item["asr_file_path"], item["video_etag"]
+            )
+        writer.add_asr_key(item["evaluation_id"], item["asr_file_path"], item["video_etag"])
+        return item
+
+    stages = [
+        PipelineStage("download", download, PIPELINE_CONFIG["DOWNLOAD_CONCURRENCY"]),
+        PipelineStage("extract", extract, PIPELINE_CONFIG["EXTRACT_CONCURRENCY"]),
+        PipelineStage("transcribe", transcribe, PIPELINE_CONFIG["TRANSCRIBE_CONCURRENCY"]),
+        PipelineStage("upload", upload, PIPELINE_CONFIG["UPLOAD_CONCURRENCY"]),
+        PipelineStage("save", save, 1),
+    ]
     try:
-        print(f"Processing video file: {video_file_path}")
-        video = mp.VideoFileClip(video_file_path)
-
-        # Extract audio from the video
-        audio_path = video_file_path.rsplit('.', 1)[0] + '.wav'
-        video.audio.write_audiofile(audio_path, codec='pcm_s16le')
-        print(f"Audio extracted: {audio_path}")
+        results, stats = await run_pipeline(items, stages, PIPELINE_CONFIG["QUEUE_SIZE"])
+    finally:
+        # A cancelled job can leave decoded items waiting for the transcribe stage
+        for item in items:
+            release_slot(item)
 
-        # Transcribe the audio using Whisper
-        whisper_model = whisper.load_model("base")
-        result = whisper_model.transcribe(audio_path)
-        text = result['text']
-        print(f"Text extracted: {text[:100]}...")
+    logger.info(f"{len(results)} of {len(items)} video files processed for interview {interview_id}: {stats}")
 
-        # Upload the transcribed text to S3
-        upload_file_path = os.path.join(upload_dir, os.path.basename(video_file_path).rsplit('.', 1)[0] + '.txt')
-        upload_file_to_s3(S3_CONFIG["S3_BUCKET_NAME"], upload_file_path, text)
-        print(f"Transcribed text uploaded to S3: {upload_file_path}")
+    await asyncio.to_thread(writer.flush)
 
-        video.close()
-        os.remove(audio_path)
+    # Disk I/O and peak buffer size of the audio path, to compare the pipe and file modes
+    audio_stats = [item["audio_stats"] for item in results]
+    if audio_stats:
+        logger.info(f"Audio extraction for interview {interview_id}: "
+                    f"modes={sorted({s['mode'] for s in audio_stats})}, "
+                    f"disk_read={sum(s['disk_bytes_read'] for s in audio_stats)}B, "
+                    f"disk_written={sum(s['disk_bytes_written'] for s in audio_stats)}B, "
+                    f"peak_buffer={max(s['peak_buffer_bytes'] for s in audio_stats)}B")
 
-        return f"s3://{S3_CONFIG['S3_BUCKET_NAME']}/{upload_file_path}"
-    except Exception as e:
-        print(f"Error processing video file {video_file_path}: {e}")
-        traceback.print_exc()
-        return None
-
-# Update ASR filename in PostgreSQL database
-def update_asr_filename_in_postgres(db: Session, video_file_name: str, asr_file_name: str):
+    # Notify the WebSocket clients about completion
+    await progress_hub.publish(interview_id, {
+        "status": "completed" if len(results) == len(items) else "error",
+        "interview_id": interview_id,
+        "message": "Downloading and transcription completed successfully."
+        + (f" {len(current)} unchanged videos were skipped." if current else "") if len(results) == len(items)
+        else f"{len(items) - len(results)} of {len(items)} videos failed and will be retried.",
+    })
+
+    # Clean up anything left behind by items that failed part way through
+    for item in items:
+        _remove_files(item["local_path"], item["audio_path"])
+
+    # Failing the job lets it be retried; checkpoints limit the retry to the failed evaluations
+    if len(results) < len(items):
+        raise RuntimeError(f"{len(items) - len(results)} of {len(items)} evaluations failed for interview {interview_id}")
+
+    logger.info(f"Completed processing for interview {interview_id}")
+
+# Remove local media files that may or may not exist
+def _remove_files(*file_paths):
+    for file_path in file_paths:
+        if file_path and os.path.exists(file_path):
+            try:
+                os.remove(file_path)
+            except Exception as e:
+                logger.warning(f"Error deleting file {file_path}: {e}")
+
+# One transcript key index per bucket, only built when a fuzzy lookup is needed
+_transcript_key_indexes = {}
+# Lookups run on asyncio.to_thread workers, so two of them can race to build the same index
+_transcript_key_indexes_lock = threading.Lock()
+
+def get_transcript_key_index(bucket):
+    with _transcript_key_indexes_lock:
+        if bucket not in _transcript_key_indexes:
+            _transcript_key_indexes[bucket] = S3KeyIndex(
+                bucket,
+                S3_CONFIG["S3_TRANSCRIPT_PREFIX"],
+                S3_CONFIG["S3_KEY_INDEX_DIR"],
+                S3_CONFIG["S3_KEY_INDEX_FULL_REFRESH_SECONDS"],
+                S3_CONFIG["S3_KEY_INDEX_MISS_REFRESH_SECONDS"],
+            )
+        return _transcript_key_indexes[bucket]
+
+# Whisper segments and word timings are stored as JSON next to each transcript
+def segments_key(transcript_key):
+    return str(Path(transcript_key).with_suffix(".json"))
+
+def read_s3_segments(bucket, transcript_key):
     try:
-        print(f"Updating ASRFileName for {video_file_name} in PostgreSQL...")
-        update_query = """
-        UPDATE public.evaluation
-        SET 
-            "asrfile_s3key" = :asr_file_name
-        WHERE 
-            "videofile_s3key" = :video_file_name;
-        """
-        print(f"Executing query: {update_query} with values {video_file_name}, {asr_file_name}")
-        result = db.execute(text(update_query), {"asr_file_name": asr_file_name, "video_file_name": video_file_name})
-        db.commit()
-        if result.rowcount > 0:
-            print(f"ASRFileName for {video_file_name} updated successfully.")
-        else:
-            print(f"No rows updated for {video_file_name}, check the query conditions.")
+        return json.loads(get_s3_service().read_text(bucket, segments_key(transcript_key)))
     except Exception as e:
-        print(f"Error updating ASRFileName in PostgreSQL: {e}")
-        traceback.print_exc()
+        # Transcripts from before segments were stored are analysed from their text alone
+        logger.debug(f"No segments for {transcript_key}: {e}")
+        return None
 
 # Function to read a text file from S3
 def read_s3_text_file(bucket, file_name):
+    s3 = get_s3_service()
     try:
-        print(f"Bucket: {bucket}")
-        print(f"Searching for file: {file_name}")
-
-        s3_client = boto3.client('s3')
-        s3_objects = s3_client.list_objects(Bucket=bucket).get('Contents', [])
-
-        for s3_key in s3_objects:
-            s3_object = s3_key['Key']
-            if file_name in s3_object and s3_object.endswith(".txt"):
-                print(f"Found file: {s3_object}")
+        # The exact key is stored on the evaluation, so a direct GET is normally enough
+        return s3.read_text(bucket, file_name)
+    except s3.client.exceptions.NoSuchKey:
+        logger.info(f"No object at {file_name}, searching the transcript key index...")
+    except Exception as e:
+        logger.error(f"An error occurred: {e}")
+        return ""
 
-                obj = s3_client.get_object(Bucket=bucket, Key=s3_object)
-                content = obj['Body'].read().decode('utf-8')
-                return content
+    try:
+        s3_object = get_transcript_key_index(bucket).find(file_name, suffix=".txt")
+        if not s3_object:
+            logger.warning(f"No matching .txt file found for {file_name}")
+            return ""
 
-        print(f"No matching .txt file found for {file_name}")
-        return ""
+        logger.debug(f"Found file: {s3_object}")
+        return s3.read_text(bucket, s3_object)
     except Exception as e:
-        print(f"An error occurred: {e}")
+        logger.error(f"An error occurred: {e}")
         return ""
 
 # Function to calculate scores using GPT-4o-mini
-def calculate_scores_with_gpt4o(transcribed_text):
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY is not set in the .env file")
-    client = OpenAI(api_key=api_key)
-    prompt = f"Calculate the following scores for the given text: semantic similarity, broad topic similarity, grammar, and disfluency. Each score should be on a scale of 0 to 100. Output only the scores separated by commas.\n\nText: {transcribed_text} \n\n Output only the scores separated by commas. I don't want any other text or explanation."
-    data = {"prompt": prompt}
-    print(f"Requesting GPT-4o mini for scoring...")
-    chat_completion = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": prompt}]
-    )
-
-    generated_text = chat_completion.choices[0].message.content
-    print("Assistant: " + generated_text)
-
-    scores = generated_text.split(',')
-    return float(scores[0]), float(scores[1]), float(scores[2]), float(scores[3])
-
-# Route to score an interview using GPT-4o-mini
-@router.post("/score-interview-gpt-4o-mini", response_model=ScoringResponse)
-async def score_interview(request: InterviewRequest, db: Session = Depends(get_db)):
-    interview = db.query(Interview).filter(Interview.interview_id == request.interview_id).first()
+async def calculate_scores_with_gpt4o(transcribed_text, question_id=None):
+    engine = get_scoring_engine()
+    cache = get_score_cache()
+
+    # Unchanged answers scored with the same model and prompt are served from the cache
+    if cache is not None:
+        cache_key = score_cache_key(transcribed_text, question_id, engine.backend.model, PROMPT_VERSION)
+        cached_scores = await asyncio.to_thread(cache.get, cache_key)
+        if cached_scores is not None:
+            return cached_scores
+
+    # The shared engine reuses one async client, rate-limits and retries
+    logger.debug(f"Requesting GPT-4o mini for scoring...")
+    scores = await engine.score(transcribed_text)
+
+    if cache is not None:
+        await asyncio.to_thread(cache.put, cache_key, scores)
+    return scores
+
+def _write_scores(db: Session, scored):
+    writer = EvaluationBatchWriter(db)
+    for evaluation_id, scores in scored:
+        writer.add_scores(evaluation_id, scores)
+    writer.flush()
+
+async def _load_transcripts(interview_id, db: AsyncSession):
+    """The interview's evaluations and their transcripts; raises 404 for anything missing."""
+    interview = await db.run_sync(get_interview, interview_id)
 
     if not interview:
         raise HTTPException(status_code=404, detail="Interview ID not found in the database")
 
-    evaluations = db.query(Evaluation).filter(Evaluation.interview_id == request.interview_id).all()
+    evaluations = (await db.scalars(
+        select(Evaluation).where(Evaluation.interview_id == interview_id)
+    )).all()
 
     if not evaluations:
         raise HTTPException(status_code=404, detail="Evaluations for Interview ID not found in the database")
 
-    print(f"Found {len(evaluations)} evaluations for interview {request.interview_id}.")
+    logger.debug(f"Found {len(evaluations)} evaluations for interview {interview_id}.")
+    # End the read transaction so the pooled connection is not held while transcripts are scored
+    await db.commit()
 
     for evaluation in evaluations:
-        asrfile_s3key = evaluation.asrfile_s3key.replace("s3://seekers3data/", "")
-
-        print(f"Reading transcribed text from S3 for ASR file: {asrfile_s3key}...")
-        transcribed_text = read_s3_text_file(S3_CONFIG["S3_BUCKET_NAME"], asrfile_s3key)
-
+        if not evaluation.asrfile_s3key:
+            raise HTTPException(status_code=404, detail=f"Evaluation {evaluation.evaluation_id} has not been transcribed yet")
+
+    # Read every transcript concurrently
+    asrfile_s3keys = [s3_key_from_uri(evaluation.asrfile_s3key) for evaluation in evaluations]
+    logger.debug(f"Reading {len(asrfile_s3keys)} transcribed texts from S3...")
+    transcribed_texts = await asyncio.gather(*(
+        asyncio.to_thread(read_s3_text_file, S3_CONFIG["S3_BUCKET_NAME"], asrfile_s3key)
+        for asrfile_s3key in asrfile_s3keys
+    ))
+
+    for asrfile_s3key, transcribed_text in zip(asrfile_s3keys, transcribed_texts):
         if not transcribed_text:
             raise HTTPException(status_code=404, detail=f"ASR file not found in S3: {asrfile_s3key}")
+    return evaluations, asrfile_s3keys, transcribed_texts
+
+async def _scores_as_completed(interview_id, evaluations, asrfile_s3keys, transcribed_texts, db: AsyncSession):
+    """Yield (evaluation, scores) as each evaluation's scores are ready, fastest first.
+
+    `scores` is the exception instead when scoring that evaluation failed. Scoring-model
+    calls start first; the local semantic and fluency scores are computed while they are
+    in flight and merged into each result as it completes.
+    """
+    local_semantic = SEMANTIC_INDEX_CONFIG["SEMANTIC_SCORER"] == "local"
+    local_fluency = SPEECH_ANALYSIS_CONFIG["FLUENCY_SCORER"] == "local"
+
+    logger.debug(f"Calculating scores for interview {interview_id}...")
+    tasks = {}
+    if not (local_semantic and local_fluency):
+        # Fan every transcript out to the scoring engine at once
+        tasks = {
+            asyncio.ensure_future(calculate_scores_with_gpt4o(transcribed_text, evaluation.question_id)): index
+            for index, (evaluation, transcribed_text) in enumerate(zip(evaluations, transcribed_texts))
+        }
 
-        print(f"Calculating scores for interview {request.interview_id}...")
-        semantic_similarity_score, broad_topic_sim_score, grammar_score, disfluency_score = calculate_scores_with_gpt4o(transcribed_text)
-
-        print(f"Updating evaluation {evaluation.evaluation_id} with scores...")
-        evaluation.semantic_similarity_score = semantic_similarity_score
-        evaluation.broad_topic_sim_score = broad_topic_sim_score
-        evaluation.grammar_score = grammar_score
-        evaluation.disfluency_score = disfluency_score
-        db.commit()
+    try:
+        # Semantic and topic similarity from the local reference-answer index, with no network call
+        similarities = None
+        if local_semantic:
+            # Questions added since the last index rebuild are scored from their cached rows
+            prefetched = await db.run_sync(metadata_cache.prefetch_interview, interview_id)
+            fallback = {
+                question_id: {
+                    "answer": [a.answer or "" for a in rows["answers"]],
+                    "topic": [f"{rows['question'].question_text or ''} {rows['question'].sub_tech or ''}"] if rows["question"] else [],
+                }
+                for question_id, rows in prefetched.items()
+            }
+            similarities = await asyncio.to_thread(
+                semantic_index.score, [(e.question_id, t) for e, t in zip(evaluations, transcribed_texts)], fallback
+            )
+
+        # Grammar and disfluency from the Whisper segments and word timings
+        analyses = None
+        if local_fluency:
+            segments = await asyncio.gather(*(
+                asyncio.to_thread(read_s3_segments, S3_CONFIG["S3_BUCKET_NAME"], asrfile_s3key)
+                for asrfile_s3key in asrfile_s3keys
+            ))
+            analyses = await asyncio.to_thread(analyze_interview, [
+                {"text": t, "segments": s} for t, s in zip(transcribed_texts, segments)
+            ])
+
+        def merge(index, scores):
+            if isinstance(scores, Exception):
+                return scores
+            if similarities is not None:
+                scores = (*similarities[index], *scores[2:])
+            if analyses is not None:
+                scores = (*scores[:2], analyses[index]["grammar_score"], analyses[index]["disfluency_score"])
+            return scores
+
+        if not tasks:
+            # Every score is computed locally, so the scoring model is not called at all
+            for index, evaluation in enumerate(evaluations):
+                yield evaluation, merge(index, (0.0, 0.0, 0.0, 0.0))
+            return
+
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=tasks.get):
+                index = tasks[task]
+                yield evaluations[index], merge(index, task.exception() or task.result())
+    finally:
+        # Nothing is left running when the client disconnects part way through a stream
+        for task in tasks:
+            task.cancel()
+
+def _split_results(results):
+    """Scores to write and ids of failed evaluations, from (evaluation, scores or exception) pairs."""
+    scored, failed = [], []
+    for evaluation, scores in results:
+        if isinstance(scores, Exception):
+            logger.warning(f"Scoring failed for evaluation {evaluation.evaluation_id}: {scores}")
+            failed.append(evaluation.evaluation_id)
+            continue
+        scored.append((evaluation.evaluation_id, scores))
+    return scored, failed
+
+def _question_scores(evaluation, scores):
+    if isinstance(scores, Exception):
+        return QuestionScores(evaluation_id=evaluation.evaluation_id, question_id=evaluation.question_id,
+                              status="failed", error=f"{type(scores).__name__}: {scores}")
+    return QuestionScores(
+        evaluation_id=evaluation.evaluation_id,
+        question_id=evaluation.question_id,
+        status="scored",
+        **dict(zip(SCORE_FIELDS, (float(score) for score in scores))),
+    )
 
+# Route to score an interview using GPT-4o-mini
+@router.post("/score-interview-gpt-4o-mini", response_model=ScoringResponse)
+async def score_interview(request: InterviewRequest, db: AsyncSession = Depends(get_async_db)):
+    evaluations, asrfile_s3keys, transcribed_texts = await _load_transcripts(request.interview_id, db)
+    completed = {}
+    async for evaluation, scores in _scores_as_completed(
+        request.interview_id, evaluations, asrfile_s3keys, transcribed_texts, db
+    ):
+        completed[evaluation.evaluation_id] = scores
+    results = [completed[evaluation.evaluation_id] for evaluation in evaluations]
+
+    # Write every score in a single transaction
+    scored, failed = _split_results(zip(evaluations, results))
+    await db.run_sync(_write_scores, scored)
+
+    if failed:
+        raise HTTPException(status_code=502, detail=f"Scoring failed for evaluations: {failed}")
+
+    # Kept for existing clients: the last question's scores; /all and /stream return every question
+    semantic_similarity_score, broad_topic_sim_score, grammar_score, disfluency_score = results[-1]
     return ScoringResponse(
         interview_id=request.interview_id,
-        question_id=evaluation.question_id,
+        question_id=evaluations[-1].question_id,
         semantic_similarity_score=semantic_similarity_score,
         broad_topic_sim_score=broad_topic_sim_score,
         grammar_score=grammar_score,
         disfluency_score=disfluency_score,
         message="Scoring completed successfully."
     )
+
+# Route to score an interview and return every question's scores
+@router.post("/score-interview-gpt-4o-mini/all", response_model=InterviewScoresResponse, response_model_exclude_none=True)
+async def score_interview_all(request: InterviewRequest, db: AsyncSession = Depends(get_async_db)):
+    evaluations, asrfile_s3keys, transcribed_texts = await _load_transcripts(request.interview_id, db)
+    completed = {}
+    async for evaluation, scores in _scores_as_completed(
+        request.interview_id, evaluations, asrfile_s3keys, transcribed_texts, db
+    ):
+        completed[evaluation.evaluation_id] = scores
+    results = [(evaluation, completed[evaluation.evaluation_id]) for evaluation in evaluations]
+
+    scored, failed = _split_results(results)
+    await db.run_sync(_write_scores, scored)
+    return InterviewScoresResponse(
+        interview_id=request.interview_id,
+        scored=len(scored),
+        failed=failed,
+        results=[_question_scores(evaluation, scores) for evaluation, scores in results],
+        message="Scoring completed successfully." if not failed else f"Scoring failed for evaluations: {failed}",
+    )
+
+def _stream_record(kind, record, sse):
+    data = json.dumps({"type": kind, **record})
+    return f"event: {kind}\ndata: {data}\n\n" if sse else data + "\n"
+
+# Route to score an interview and stream each question's scores as soon as they are ready
+@router.post("/score-interview-gpt-4o-mini/stream")
+async def score_interview_stream(request: InterviewRequest, http_request: Request,
+                                 format: Optional[Literal["ndjson", "sse"]] = None,
+                                 db: AsyncSession = Depends(get_async_db)):
+    """One record per evaluation in completion order, then a summary once every score is written.
+
+    NDJSON by default; Server-Sent Events with ?format=sse or Accept: text/event-stream.
+    Lookup errors (unknown interview, missing transcripts) are still plain 404 responses.
+    """
+    evaluations, asrfile_s3keys, transcribed_texts = await _load_transcripts(request.interview_id, db)
+    sse = format == "sse" or (format is None and "text/event-stream" in http_request.headers.get("accept", ""))
+
+    async def records():
+        started = time.perf_counter()
+        results = []
+        # The body streams after the endpoint returns, when the request's session may already be closed
+        async with new_async_session() as stream_db:
+            async for evaluation, scores in _scores_as_completed(
+                request.interview_id, evaluations, asrfile_s3keys, transcribed_texts, stream_db
+            ):
+                results.append((evaluation, scores))
+                record = _question_scores(evaluation, scores).model_dump(exclude_none=True)
+                yield _stream_record("result", {**record, "elapsed_seconds": round(time.perf_counter() - started, 3)}, sse)
+
+            # Scores reach the database in one transaction, just before the summary
+            scored, failed = _split_results(results)
+            await stream_db.run_sync(_write_scores, scored)
+        yield _stream_record("summary", {
+            "interview_id": request.interview_id,
+            "scored": len(scored),
+            "failed": failed,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+            "message": "Scoring completed successfully." if not failed else f"Scoring failed for evaluations: {failed}",
+        }, sse)
+
+    return StreamingResponse(
+        records(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        # Proxies must pass each record on as it is written
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# Route to rebuild the local semantic index after reference answers or questions change
+@router.post("/semantic-index/refresh")
+async def refresh_semantic_index_route(db: Session = Depends(get_db)):
+    # Reference answers or questions changed, so cached copies are stale too
+    metadata_cache.invalidate()
+    return await asyncio.to_thread(refresh_semantic_index, db)
+
+# Route to drop cached Interview/Questions/Answers rows after they are edited
+@router.post("/metadata-cache/invalidate")
+async def invalidate_metadata_cache(kind: Optional[str] = None, id: Optional[int] = None):
+    if kind is not None and kind not in ("interview", "question", "answers"):
+        raise HTTPException(status_code=400, detail="kind must be one of interview, question, answers")
+    if kind is not None and id is None:
+        raise HTTPException(status_code=400, detail="id is required when kind is given")
+    metadata_cache.invalidate(kind, id)
+    return {"status": "invalidated", "kind": kind or "all", "id": id}
@@ -0,0 +1,70 @@
+import io
+import os
+import shutil
+import subprocess
+import numpy as np
+import pytest
+from app.services import audio
+from app.services.audio import SAMPLE_RATE, decode_audio_file, decode_audio_stream, extract_audio
+
+@pytest.fixture
+def ffmpeg(tmp_path, monkeypatch):
+    """Put ffmpeg on PATH, from the imageio-ffmpeg wheel when the host has none (as benchmarks/e2e.py does)."""
+    if not shutil.which("ffmpeg"):
+        imageio_ffmpeg = pytest.importorskip("imageio_ffmpeg")
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        os.symlink(imageio_ffmpeg.get_ffmpeg_exe(), bin_dir / "ffmpeg")
+        monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+def make_video(path, seconds, *output_args):
+    subprocess.run([
+        "ffmpeg", "-nostdin", "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc=size=160x120:rate=10:duration={seconds}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=44100:duration={seconds}",
+        "-c:v", "mpeg4", "-c:a", "aac", "-shortest", *output_args, str(path),
+    ], check=True)
+    return str(path)
+
+def assert_tone(samples, seconds):
+    assert samples.dtype == np.float32 and samples.ndim == 1
+    # Resampled to 16 kHz mono; AAC priming may add or trim a frame either side
+    assert abs(len(samples) / SAMPLE_RATE - seconds) < 0.1
+    assert 0.05 < np.abs(samples).max() <= 1.0
+
+def test_video_files_decode_to_16khz_mono_float32(ffmpeg, tmp_path):
+    video = make_video(tmp_path / "answer.mp4", 2)
+
+    samples, stats = decode_audio_file(video)
+
+    assert_tone(samples, 2)
+    assert stats["mode"] == "pipe" and stats["disk_bytes_written"] == 0
+    assert stats["disk_bytes_read"] == os.path.getsize(video)
+
+def test_streams_decode_without_touching_disk(ffmpeg, tmp_path):
+    # faststart puts the MP4 index up front, so the file can be read front to back from a pipe
+    video = make_video(tmp_path / "answer.mp4", 2, "-movflags", "+faststart")
+    with open(video, "rb") as f:
+        body = f.read()
+
+    samples, stats = decode_audio_stream(io.BytesIO(body))
+
+    assert_tone(samples, 2)
+    assert stats["mode"] == "stream" and stats["network_bytes_read"] == len(body)
+    with pytest.raises(subprocess.CalledProcessError):
+        decode_audio_stream(io.BytesIO(b"not a video" * 100))
+
+def test_extraction_falls_back_to_wav_when_ffmpeg_cannot_be_used(ffmpeg, tmp_path, monkeypatch):
+    fallbacks = []
+    monkeypatch.setattr(audio, "extract_audio_to_wav", lambda path: fallbacks.append(path) or (path + ".wav", {"mode": "file"}))
+    broken = tmp_path / "broken.mp4"
+    broken.write_bytes(b"not a video" * 100)
+
+    # ffmpeg runs but cannot decode the file
+    assert extract_audio(str(broken), mode="pipe") == (f"{broken}.wav", {"mode": "file"})
+    # ffmpeg is not installed
+    monkeypatch.setattr(audio.shutil, "which", lambda name: None)
+    assert extract_audio(str(broken), mode="pipe")[1]["mode"] == "file"
+    # "file" mode never tries the pipe
+    assert extract_audio(str(broken), mode="file")[1]["mode"] == "file"
+    assert fallbacks == [str(broken)] * 3
@@ -0,0 +1,39 @@
+import numpy as np
+from app.services.audio import SAMPLE_RATE
+from app.services.chunking import plan_chunks, stitch
+
+def _tone(seconds):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return 0.3 * np.sin(2 * np.pi * 440 * t)
+
+def test_long_audio_is_cut_inside_pauses_near_the_target_length():
+    # 8 s of sound, then a 1 s pause, repeated: the pauses start at 8, 17, 26, ... seconds
+    audio = np.concatenate([np.concatenate([_tone(8), np.zeros(SAMPLE_RATE)]) for _ in range(10)]).astype(np.float32)
+    chunks = plan_chunks(audio, chunk_seconds=20, overlap_seconds=0.5, search_seconds=5)
+
+    assert chunks[0][:1] == (0,) and chunks[-1][1] == len(audio)
+    for (_, _, _, own_end), (start, _, own_start, _) in zip(chunks, chunks[1:]):
+        assert own_end == own_start
+        cut = own_start / SAMPLE_RATE
+        # Every cut lands inside a pause, with the overlap reaching back before it
+        assert (cut % 9) >= 8
+        assert start == own_start - SAMPLE_RATE // 2
+
+def test_stitch_keeps_each_overlapping_word_once():
+    def word(text, start, end=None):
+        return {"word": " " + text, "start": start, "end": end or start + 0.3}
+
+    # Two chunks cut at 10 s with 1 s of overlap; "slow" (9.5-9.8 s) is heard by both
+    chunks = [(0, 11 * SAMPLE_RATE, 0, 10 * SAMPLE_RATE), (9 * SAMPLE_RATE, 20 * SAMPLE_RATE, 10 * SAMPLE_RATE, 20 * SAMPLE_RATE)]
+    first = [word("the", 8.0), word("query", 8.8), word("is", 9.2), word("slow", 9.5), word("so", 10.4)]
+    # The second chunk hears "slow" run on past the cut, so each chunk owns a copy of it
+    second = [word("slow", 0.7, 1.4), word("so", 1.4), word("we", 2.0)]
+    results = [
+        {"segments": [{"start": 8.0, "end": 10.7, "text": "".join(w["word"] for w in first), "words": first}]},
+        {"segments": [{"start": 0.7, "end": 2.3, "text": "".join(w["word"] for w in second), "words": second}]},
+    ]
+
+    stitched = stitch(results, chunks)
+
+    assert stitched["text"] == " the query is slow so we"
+    assert [w["start"] for s in stitched["segments"] for w in s["words"]] == [8.0, 8.8, 9.2, 9.5, 10.4, 11.0]
@@ -0,0 +1,23 @@
+import os
+
+# Direct-connection settings: engines are created without opening an SSH tunnel or connecting
+os.environ.setdefault("ENVIRONMENT_TYPE", "ec2")
+
+from app.config import db
+from app.config.settings import DB_POOL_CONFIG
+
+def test_init_db_creates_tuned_sync_and_async_engines():
+    try:
+        engine = db.init_db()
+        async_engine = db.get_async_engine()
+        assert engine.dialect.driver == "psycopg2" and async_engine.dialect.driver == "asyncpg"
+        for pool in (engine.pool, async_engine.sync_engine.pool):
+            assert pool.size() == DB_POOL_CONFIG["DB_POOL_SIZE"]
+            assert pool._max_overflow == DB_POOL_CONFIG["DB_MAX_OVERFLOW"]
+            assert pool._pre_ping == DB_POOL_CONFIG["DB_POOL_PRE_PING"]
+        assert async_engine.url.query["prepared_statement_cache_size"] == str(DB_POOL_CONFIG["DB_STATEMENT_CACHE_SIZE"])
+        # Repeated calls reuse the same engines
+        assert db.init_db() is engine and db.get_async_engine() is async_engine
+    finally:
+        db.close_db()
+    assert db.engine is None and db.async_engine is None
@@ -0,0 +1,81 @@
+import os
+
+# Direct-connection settings, so anything that falls through to init_db() never tries an SSH tunnel
+os.environ.setdefault("ENVIRONMENT_TYPE", "ec2")
+
+from types import SimpleNamespace
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from app.models.evaluation import Evaluation
+from app.services.db_writes import EvaluationBatchWriter, SCORE_COLUMNS
+
+def test_flush_writes_every_field_in_one_transaction():
+    engine = create_engine("sqlite://")
+    Evaluation.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([Evaluation(evaluation_id=e, interview_id=1) for e in (1, 2, 3)])
+    session.commit()
+
+    statements, commits = [], []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, params, context, many: statements.append((statement, many)))
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+
+    writer = EvaluationBatchWriter(session)
+    writer.add_asr_key(1, "s3://bucket/ConvertedTextFile/a.txt", "etag-a")
+    writer.add_asr_key(2, "s3://bucket/ConvertedTextFile/b.txt")
+    writer.add_scores(1, (80, 70, 60, 50))
+    writer.add_scores(3, (10, 20, 30, 40))
+    assert len(writer) == 4
+
+    assert writer.flush() == 4
+    # One executemany per kind of update and a single commit, whatever the number of evaluations
+    assert [many for _, many in statements] == [True, True] and len(commits) == 1
+    assert len(writer) == 0 and writer.flush() == 0
+
+    session.expire_all()
+    first, second, third = (session.get(Evaluation, e) for e in (1, 2, 3))
+    assert (first.asrfile_s3key, first.video_etag) == ("s3://bucket/ConvertedTextFile/a.txt", "etag-a")
+    assert [float(getattr(first, c)) for c in SCORE_COLUMNS] == [80, 70, 60, 50]
+    assert second.asrfile_s3key.endswith("b.txt") and second.video_etag is None and second.grammar_score is None
+    assert third.asrfile_s3key is None and float(third.disfluency_score) == 40
+    # Both write paths stamp the rows they touch
+    assert first.updated_at and second.updated_at and third.updated_at
+
+class RecordingPostgresSession:
+    def __init__(self):
+        self.executed = []
+        self.commits = 0
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    def execute(self, statement, params):
+        self.executed.append((statement, params))
+        return SimpleNamespace(rowcount=sum(key.startswith("id_") for key in params))
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+def test_postgres_path_is_one_update_from_values_per_kind():
+    session = RecordingPostgresSession()
+    writer = EvaluationBatchWriter(session)
+    writer.add_asr_key(1, "s3://bucket/a.txt", "etag-a")
+    writer.add_asr_key(2, "s3://bucket/b.txt", None)
+    writer.add_scores(2, (1, 2, 3, 4))
+
+    assert writer.flush() == 3
+    assert len(session.executed) == 2 and session.commits == 1
+
+    (asr_statement, asr_params), (score_statement, score_params) = session.executed
+    asr_sql = str(asr_statement.compile(dialect=postgresql.dialect()))
+    assert "FROM (VALUES (CAST(%(id_0)s AS BIGINT), CAST(%(asrfile_s3key_0)s AS TEXT)" in asr_sql
+    assert '"updated_at" = now()' in asr_sql and "WHERE e.evaluation_id = v.evaluation_id" in asr_sql
+    assert asr_params == {"id_0": 1, "asrfile_s3key_0": "s3://bucket/a.txt", "video_etag_0": "etag-a",
+                          "id_1": 2, "asrfile_s3key_1": "s3://bucket/b.txt", "video_etag_1": None}
+    assert "v(evaluation_id, semantic_similarity_score, broad_topic_sim_score, grammar_score, disfluency_score)" in str(score_statement)
+    assert score_params["grammar_score_0"] == 3
@@ -1,13 +1,176 @@
+import os
+
+# Direct-connection settings, so anything that falls through to init_db() never tries an SSH tunnel
+os.environ.setdefault("ENVIRONMENT_TYPE", "ec2")
+
+import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
-from app.routes.interview import app
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from app.config.db import Base, get_db, get_async_db
+from app.models.evaluation import Evaluation
+from app.models.interview import Interview
+from app.models.job import ProcessingJob, ProcessingJobCheckpoint
+from app.routes import interview
+from app.services.metadata_cache import metadata_cache
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # A file database, so the sync engine (setup and workers) and the async engine (routes) share it
+    db_path = tmp_path / "interview.db"
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine, tables=[Evaluation.__table__, ProcessingJob.__table__, ProcessingJobCheckpoint.__table__])
+    Interview.__table__.create(engine)
+    session_factory = sessionmaker(bind=engine)
+    db = session_factory()
+    db.add(Interview(interview_id=1, candidate_id=5, manager_id=6))
+    db.add(Interview(interview_id=2, candidate_id=7, manager_id=6))
+    db.add(Evaluation(evaluation_id=1, interview_id=1, question_id=10, videofile_s3key="s3://seekers3data/videos/a.mp4"))
+    db.commit()
+    db.close()
+
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    async_session_factory = async_sessionmaker(create_async_engine(f"sqlite+aiosqlite:///{db_path}"), expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with async_session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(interview.router)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    # Streamed responses open their own session once the request's is gone
+    monkeypatch.setattr(interview, "new_async_session", async_session_factory)
+    metadata_cache.invalidate()
+    return TestClient(app)
 
-client = TestClient(app)
+def test_process_interview_queues_one_job(client):
+    response = client.post("/process-interview", json={"interview_id": 1})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "queued" and body["candidate_id"] == 5 and body["manager_id"] == 6
+
+    # Submitting again while the job is queued returns the same job
+    again = client.post("/process-interview", json={"interview_id": 1}).json()
+    assert again["job_id"] == body["job_id"]
+
+    job = client.get(f"/jobs/{body['job_id']}").json()
+    assert job["interview_id"] == 1 and job["status"] == "queued" and job["evaluations_completed"] == 0
+
+def test_batch_submission_queues_each_interview_once(client):
+    single = client.post("/process-interview", json={"interview_id": 1}).json()
 
-def test_interview_endpoint():
-    response = client.post("/interview", json={"data": "test"})
+    response = client.post("/process-interviews", json={"interview_ids": [1, 2, 999, 2], "priority": "urgent"})
     assert response.status_code == 200
-    assert "expected_key" in response.json()  # Replace with actual expected key
+    body = response.json()
+    assert body["queued"] == 1 and body["already_queued"] == 1 and body["not_found"] == [999]
+    jobs = {job["interview_id"]: job for job in body["jobs"]}
+    assert list(jobs) == [1, 2, 999]
+    # The queued interview is moved up to the batch's priority
+    assert jobs[1]["job_id"] == single["job_id"] and jobs[1]["priority"] == "urgent"
+    assert jobs[2]["status"] == "queued" and jobs[999]["status"] == "not_found"
+    assert client.get(f"/jobs/{jobs[2]['job_id']}").json()["priority"] == "urgent"
+
+    assert client.post("/process-interviews", json={"interview_ids": []}).status_code == 422
+    assert client.post("/process-interviews", json={"interview_ids": [1], "priority": "asap"}).status_code == 422
+
+def test_unknown_interview_and_job(client):
+    assert client.post("/process-interview", json={"interview_id": 999}).status_code == 404
+    assert client.post("/process-interview", json={"interview_id": "abc"}).status_code == 422
+    assert client.get("/jobs/999").status_code == 404
+    assert client.post("/score-interview-gpt-4o-mini", json={"interview_id": 999}).status_code == 404
+
+def test_scoring_requires_transcripts(client):
+    response = client.post("/score-interview-gpt-4o-mini", json={"interview_id": 1})
+    assert response.status_code == 404
+    assert "has not been transcribed" in response.json()["detail"]
+
+def test_only_new_or_changed_videos_need_transcribing(monkeypatch):
+    import asyncio
+    from types import SimpleNamespace
+    import boto3
+    from moto import mock_aws
+    from app.utils import s3_utils
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        client = boto3.client("s3", aws_access_key_id="test", aws_secret_access_key="test")
+        client.create_bucket(Bucket="seekers3data")
+        etags = {name: client.put_object(Bucket="seekers3data", Key=f"videos/{name}.mp4", Body=name.encode())["ETag"].strip('"')
+                 for name in ("new", "same", "changed", "legacy")}
+        client.put_object(Bucket="seekers3data", Key="ConvertedTextFile/legacy.txt", Body=b"transcript")
+        service = s3_utils.S3TransferService(client=client)
+        monkeypatch.setattr(s3_utils, "_s3_service", service)
+
+        def evaluation(evaluation_id, name, asr=None, etag=None):
+            return SimpleNamespace(evaluation_id=evaluation_id, videofile_s3key=f"s3://seekers3data/videos/{name}.mp4",
+                                   asrfile_s3key=asr, video_etag=etag)
+        evaluations = [
+            evaluation(1, "new"),
+            evaluation(2, "same", "s3://seekers3data/ConvertedTextFile/same.txt", etags["same"]),
+            evaluation(3, "changed", "s3://seekers3data/ConvertedTextFile/changed.txt", "stale-etag"),
+            # Transcribed before ETags were recorded, and newer than its video
+            evaluation(4, "legacy", "s3://seekers3data/ConvertedTextFile/legacy.txt"),
+            evaluation(5, "missing", "s3://seekers3data/ConvertedTextFile/missing.txt", "gone"),
+        ]
+        try:
+            heads, current = asyncio.run(interview._find_current_transcripts(evaluations, "seekers3data"))
+        finally:
+            service.close()
+
+    assert current == {2: etags["same"], 4: etags["legacy"]}
+    assert heads[1]["ContentLength"] == 3 and heads[5] is None
+
+def test_scores_stream_in_completion_order_and_bulk_lists_every_question(client, tmp_path, monkeypatch):
+    import asyncio
+    import json
+
+    session_factory = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'interview.db'}"))
+    with session_factory() as db:
+        db.get(Evaluation, 1).asrfile_s3key = "s3://seekers3data/ConvertedTextFile/a.txt"
+        db.add(Evaluation(evaluation_id=2, interview_id=1, question_id=11, asrfile_s3key="s3://seekers3data/ConvertedTextFile/b.txt"))
+        db.add(Evaluation(evaluation_id=3, interview_id=1, question_id=12, asrfile_s3key="s3://seekers3data/ConvertedTextFile/c.txt"))
+        db.commit()
+
+    delays = {10: 0.3, 11: 0.02, 12: 0.15}
+
+    async def fake_scores(transcribed_text, question_id=None):
+        await asyncio.sleep(delays[question_id])
+        if question_id == 12:
+            raise RuntimeError("rate limited")
+        return (question_id, 20.0, 30.0, 40.0)
+
+    monkeypatch.setattr(interview, "read_s3_text_file", lambda bucket, key: f"answer in {key}")
+    monkeypatch.setattr(interview, "calculate_scores_with_gpt4o", fake_scores)
+
+    with client.stream("POST", "/score-interview-gpt-4o-mini/stream", json={"interview_id": 1}) as response:
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in response.iter_lines() if line]
+
+    # Fastest first, each as soon as it is scored, then the summary
+    assert [(r["type"], r.get("question_id")) for r in records] == [("result", 11), ("result", 12), ("result", 10), ("summary", None)]
+    assert records[0]["status"] == "scored" and records[0]["semantic_similarity_score"] == 11.0
+    assert records[0]["elapsed_seconds"] < 0.2
+    assert records[1]["status"] == "failed" and "rate limited" in records[1]["error"]
+    assert records[-1]["scored"] == 2 and records[-1]["failed"] == [3]
+    with session_factory() as db:
+        assert [float(db.get(Evaluation, i).grammar_score or 0) for i in (1, 2, 3)] == [30.0, 30.0, 0.0]
+
+    sse = client.post("/score-interview-gpt-4o-mini/stream?format=sse", json={"interview_id": 1})
+    assert sse.headers["content-type"].startswith("text/event-stream")
+    assert sse.text.startswith("event: result\ndata: {") and sse.text.count("event: summary\n") == 1
+
+    bulk = client.post("/score-interview-gpt-4o-mini/all", json={"interview_id": 1}).json()
+    assert [(r["question_id"], r["status"]) for r in bulk["results"]] == [(10, "scored"), (11, "scored"), (12, "failed")]
+    assert bulk["scored"] == 2 and bulk["failed"] == [3]
 
-def test_interview_endpoint_invalid_data():
-    response = client.post("/interview", json={"data": ""})
-    assert response.status_code == 400  # Replace with actual expected status code for invalid data
\ No newline at end of file
+    assert client.post("/score-interview-gpt-4o-mini/stream", json={"interview_id": 999}).status_code == 404
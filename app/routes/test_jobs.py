@@ -0,0 +1,109 @@
+import os
+
+# Direct-connection settings, so anything that falls through to init_db() never tries an SSH tunnel
+os.environ.setdefault("ENVIRONMENT_TYPE", "ec2")
+
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from app.config.db import Base
+from app.config.settings import JOB_CONFIG
+from app.models.job import ProcessingJob, ProcessingJobCheckpoint
+from app.services.jobs import (
+    PRIORITY_CLASSES, claim_job, complete_job, fail_job, get_checkpoints, queue_stats, record_checkpoint, submit_job, submit_jobs,
+)
+
+@pytest.fixture
+def db():
+    # SQLite stands in for Postgres; it ignores FOR UPDATE SKIP LOCKED
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[ProcessingJob.__table__, ProcessingJobCheckpoint.__table__])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+def test_submit_is_idempotent_while_active(db):
+    job, created = submit_job(db, 10)
+    again, created_again = submit_job(db, 10)
+
+    assert created and not created_again
+    assert again.job_id == job.job_id
+
+    claim_job(db, "worker-1")
+    complete_job(db, job.job_id)
+    _, created_after_completion = submit_job(db, 10)
+    assert created_after_completion
+
+def test_claim_and_retry_resumes_from_checkpoints(db):
+    job, _ = submit_job(db, 11)
+
+    claimed = claim_job(db, "worker-1")
+    assert claimed.job_id == job.job_id and claimed.status == "running"
+    assert claim_job(db, "worker-2") is None
+
+    record_checkpoint(db, job.job_id, 101, "s3://bucket/ConvertedTextFile/a.txt")
+    fail_job(db, job.job_id, "RuntimeError: boom")
+
+    reclaimed = claim_job(db, "worker-2")
+    assert reclaimed.job_id == job.job_id and reclaimed.attempts == 2
+    assert get_checkpoints(db, job.job_id) == {101: "s3://bucket/ConvertedTextFile/a.txt"}
+
+def test_stale_running_job_is_reclaimed(db):
+    job, _ = submit_job(db, 12)
+    claim_job(db, "crashed-worker")
+    job.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+    db.commit()
+
+    assert claim_job(db, "worker-2").worker_id == "worker-2"
+
+def test_a_job_that_keeps_killing_its_worker_is_failed_not_reclaimed(db, monkeypatch):
+    monkeypatch.setitem(JOB_CONFIG, "JOB_MAX_ATTEMPTS", 2)
+    job, _ = submit_job(db, 13)
+    for worker in ("crashed-worker-1", "crashed-worker-2"):
+        assert claim_job(db, worker).job_id == job.job_id
+        job.heartbeat_at = datetime.utcnow() - timedelta(hours=1)
+        db.commit()
+
+    assert claim_job(db, "worker-3") is None
+    db.refresh(job)
+    assert job.status == "failed" and job.attempts == 2 and "heartbeating" in job.error
+    # No longer active, so the interview can be submitted again
+    assert submit_job(db, 13)[1]
+
+def test_the_database_allows_one_active_job_per_interview(db):
+    submit_job(db, 14)
+    db.add(ProcessingJob(interview_id=14, status="running", attempts=1))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+    db.add(ProcessingJob(interview_id=14, status="completed", attempts=1))
+    db.commit()
+
+def test_urgent_jobs_are_claimed_first_and_resubmission_raises_priority(db):
+    bulk, _ = submit_job(db, 20, PRIORITY_CLASSES["bulk"])
+    normal, _ = submit_job(db, 21)
+    urgent, _ = submit_job(db, 22, PRIORITY_CLASSES["urgent"])
+
+    assert claim_job(db, "worker-1").job_id == urgent.job_id
+
+    # Asking again for the bulk interview as urgent moves it ahead of the normal one
+    again, created = submit_job(db, 20, PRIORITY_CLASSES["urgent"])
+    assert not created and again.job_id == bulk.job_id and again.priority == PRIORITY_CLASSES["urgent"]
+    assert claim_job(db, "worker-1").job_id == bulk.job_id
+    assert claim_job(db, "worker-1").job_id == normal.job_id
+
+def test_submit_jobs_queues_a_batch_in_one_go(db):
+    existing, _ = submit_job(db, 30)
+    submitted = submit_jobs(db, [30, 31, 32, 31], PRIORITY_CLASSES["bulk"])
+
+    assert list(submitted) == [30, 31, 32]
+    assert submitted[30] == (existing, False)
+    assert all(created for _, created in (submitted[31], submitted[32]))
+    assert existing.priority == PRIORITY_CLASSES["normal"]
+
+    claim_job(db, "worker-1")
+    stats = queue_stats(db)
+    assert stats["depth"] == {"running": {"normal": 1}, "queued": {"bulk": 2}}
+    assert stats["wait_seconds"]["normal"]["started"] == 1
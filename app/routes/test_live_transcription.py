@@ -0,0 +1,209 @@
+import os
+
+# Direct-connection settings, so anything that falls through to init_db() never tries an SSH tunnel
+os.environ.setdefault("ENVIRONMENT_TYPE", "ec2")
+
+import asyncio
+import json
+import numpy as np
+from app.services.audio import SAMPLE_RATE
+from app.services.live_transcription import LiveTranscription
+
+WORD_SECONDS, GAP_SECONDS, PAUSE_SECONDS = 0.4, 0.15, 0.6
+
+
+def _recording(count):
+    """Word k is WORD_SECONDS of constant amplitude k/100; every fifth word is followed by a pause."""
+    pieces = []
+    for k in range(1, count + 1):
+        pieces.append(np.full(int(WORD_SECONDS * SAMPLE_RATE), k / 100, np.float32))
+        pieces.append(np.zeros(int((PAUSE_SECONDS if k % 5 == 0 else GAP_SECONDS) * SAMPLE_RATE), np.float32))
+    return np.concatenate(pieces)
+
+
+def _decode(audio):
+    """Stands in for Whisper on _recording audio; a word cut by the window edge is misheard."""
+    level = np.round(audio * 100).astype(np.int64)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], level, [0]))))
+    words = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if level[start] == 0:
+            continue
+        heard = level[start] if end - start > 0.9 * WORD_SECONDS * SAMPLE_RATE else 0
+        words.append({"word": f" w{heard}", "start": start / SAMPLE_RATE, "end": end / SAMPLE_RATE})
+    text = "".join(w["word"] for w in words)
+    return {"text": text, "segments": [{"start": words[0]["start"], "end": words[-1]["end"], "text": text,
+                                        "words": words}] if words else []}
+
+
+class FakeEngine:
+    model_size = "base"
+
+    def __init__(self):
+        self.seconds = []
+
+    async def run(self, func, audio, model_size, wait=True):
+        self.seconds.append(len(audio) / SAMPLE_RATE)
+        await asyncio.sleep(0)
+        return _decode(audio)
+
+    async def transcribe_audio(self, audio, wait=True):
+        return await self.run(None, audio, self.model_size)
+
+
+class FakeDecoder:
+    async def feed(self, data):
+        return np.frombuffer(data, np.int16).astype(np.float32) / 32768.0
+
+    async def close(self):
+        return np.zeros(0, np.float32)
+
+    def kill(self):
+        pass
+
+
+def _frames(audio, seconds=0.1):
+    pcm = np.round(audio * 32768).astype(np.int16).tobytes()
+    size = int(seconds * SAMPLE_RATE) * 2
+    return [pcm[i:i + size] for i in range(0, len(pcm), size)]
+
+
+def test_live_answer_is_committed_at_pauses_and_only_the_tail_is_left_at_the_end():
+    engine, partials = FakeEngine(), []
+
+    async def on_partial(message):
+        partials.append(message)
+
+    async def run():
+        live = LiveTranscription(engine, FakeDecoder(), on_partial, window_seconds=6, step_seconds=1,
+                                 commit_lag_seconds=1, overlap_seconds=0.5)
+        for frame in _frames(_recording(40)):
+            await live.feed(frame)
+            await asyncio.sleep(0)
+        return live, await live.finish()
+
+    live, transcript = asyncio.run(run())
+
+    # Every word exactly once, in order, although windows were cut and overlapped many times
+    assert transcript["text"].split() == [f"w{k}" for k in range(1, 41)]
+    assert transcript["audio_seconds"] > 25
+    assert live.committed_seconds > 15
+    # No window, including the final tail, held more than the window length of audio
+    assert max(engine.seconds) <= 6 + 0.5 + 0.2
+    assert engine.seconds[-1] < transcript["audio_seconds"] / 2
+
+    assert len(partials) >= 10
+    assert all(p["type"] == "partial" for p in partials)
+    # Committed text only ever grows and stays a prefix of the final transcript
+    stable = [p["stable_text"] for p in partials]
+    assert all(b.startswith(a) for a, b in zip(stable, stable[1:]))
+    assert transcript["text"].startswith(stable[-1]) and stable[-1]
+
+
+def test_a_pause_at_the_committed_point_still_bounds_the_window(monkeypatch):
+    from app.services import live_transcription
+    monkeypatch.setattr(live_transcription, "find_pause", lambda audio, sample_rate: 0)
+    engine = FakeEngine()
+
+    async def run():
+        live = LiveTranscription(engine, FakeDecoder(), window_seconds=6, step_seconds=1,
+                                 commit_lag_seconds=1, overlap_seconds=0.5)
+        for frame in _frames(_recording(40)):
+            await live.feed(frame)
+            await asyncio.sleep(0)
+        return live, await live.finish()
+
+    live, transcript = asyncio.run(run())
+
+    assert live.committed_seconds > 15
+    assert max(engine.seconds) <= 6 + 0.5 + 0.2
+
+def test_websocket_streams_partials_and_stores_the_final_transcript(tmp_path, monkeypatch):
+    import boto3
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from moto import mock_aws
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from sqlalchemy.orm import sessionmaker
+    from app.config.db import Base, get_async_db
+    from app.config.settings import LIVE_TRANSCRIPTION_CONFIG, S3_CONFIG
+    from app.models.evaluation import Evaluation
+    from app.routes import websocket
+    from app.utils import s3_utils
+
+    db_path = tmp_path / "live.db"
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine, tables=[Evaluation.__table__])
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        db.add(Evaluation(evaluation_id=7, interview_id=3, question_id=30, videofile_s3key="s3://seekers3data/videos/q30.mp4"))
+        db.commit()
+    async_session_factory = async_sessionmaker(create_async_engine(f"sqlite+aiosqlite:///{db_path}"), expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with async_session_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(websocket.router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    monkeypatch.setattr(websocket, "transcription_engine", FakeEngine())
+    monkeypatch.setitem(LIVE_TRANSCRIPTION_CONFIG, "LIVE_WINDOW_SECONDS", 6)
+    monkeypatch.setitem(LIVE_TRANSCRIPTION_CONFIG, "LIVE_STEP_SECONDS", 1)
+    monkeypatch.setitem(LIVE_TRANSCRIPTION_CONFIG, "LIVE_COMMIT_LAG_SECONDS", 1)
+    monkeypatch.setitem(S3_CONFIG, "S3_BUCKET_NAME", "seekers3data")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+    with mock_aws():
+        client = boto3.client("s3", aws_access_key_id="test", aws_secret_access_key="test")
+        client.create_bucket(Bucket="seekers3data")
+        monkeypatch.setattr(s3_utils, "_s3_service", s3_utils.S3TransferService(client=client))
+        with TestClient(app).websocket_connect("/ws/3") as ws:
+            ws.send_text(json.dumps({"type": "start", "question_id": 30}))
+            assert ws.receive_json() == {"type": "started", "evaluation_id": 7}
+            for frame in _frames(_recording(15)):
+                ws.send_bytes(frame)
+            ws.send_text(json.dumps({"type": "end"}))
+            messages = []
+            while not messages or messages[-1]["type"] != "final":
+                messages.append(ws.receive_json())
+
+        final = messages[-1]
+        assert final["text"].split() == [f"w{k}" for k in range(1, 16)]
+        assert final["asrfile_s3key"] == "s3://seekers3data/ConvertedTextFile/q30.txt"
+        assert any(m["type"] == "partial" for m in messages)
+        stored = client.get_object(Bucket="seekers3data", Key="ConvertedTextFile/q30.txt")
+        assert stored["Body"].read().decode() == final["text"]
+
+    with session_factory() as db:
+        assert db.get(Evaluation, 7).asrfile_s3key == final["asrfile_s3key"]
+
+
+def test_api_only_nodes_refuse_live_audio(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from app.config.db import get_async_db
+    from app.config.settings import APP_CONFIG
+    from app.routes import websocket
+
+    class NeverStarted(FakeEngine):
+        async def run(self, func, *args, wait=True):
+            raise AssertionError("an API-only node must not start transcription workers")
+
+    async def no_db():
+        yield None
+
+    app = FastAPI()
+    app.include_router(websocket.router)
+    app.dependency_overrides[get_async_db] = no_db
+    monkeypatch.setattr(websocket, "transcription_engine", NeverStarted())
+    monkeypatch.setitem(APP_CONFIG, "API_ONLY", True)
+
+    with TestClient(app).websocket_connect("/ws/3") as ws:
+        ws.send_text(json.dumps({"type": "start", "question_id": 30}))
+        reply = ws.receive_json()
+        assert reply["type"] == "error" and "API-only" in reply["message"]
+        # Audio sent anyway is refused rather than transcribed
+        ws.send_bytes(b"\0\0" * 1600)
+        assert ws.receive_json()["type"] == "error"
@@ -0,0 +1,46 @@
+import os
+import numpy as np
+from app.services.media_cache import MediaCache
+
+def write(path, size, fill=b"v"):
+    with open(path, "wb") as f:
+        f.write(fill * size)
+    return str(path)
+
+def test_entries_are_shared_by_content_and_evicted_least_recently_used_first(tmp_path):
+    cache = MediaCache(tmp_path / "cache", max_bytes=250)
+    videos = tmp_path / "videos"
+    videos.mkdir()
+
+    assert not cache.fetch("video", "etag-a.mp4", str(videos / "1_a.mp4"))
+    for key, fill in (("etag-a.mp4", b"a"), ("etag-b.mp4", b"b")):
+        assert cache.store("video", key, write(videos / f"download_{key}", 100, fill))
+    # The same content under another interview's key is served from the cache
+    assert cache.fetch("video", "etag-a.mp4", str(videos / "2_a.mp4"))
+    assert open(videos / "2_a.mp4", "rb").read() == b"a" * 100
+
+    # "a" was just used, so "b" is the one evicted to make room
+    os.utime(cache._path("video", "etag-b.mp4"), (1, 1))
+    assert cache.store("video", "etag-c.mp4", write(videos / "download_c", 100, b"c"))
+    assert cache.has("video", "etag-a.mp4") and cache.has("video", "etag-c.mp4")
+    assert not cache.has("video", "etag-b.mp4")
+    # A reader holding a link to an evicted entry still has the whole file
+    assert open(videos / "download_etag-b.mp4", "rb").read() == b"b" * 100
+
+    # Too big for the budget on its own: not cached, nothing evicted
+    assert not cache.store("video", "etag-d.mp4", write(videos / "download_d", 300))
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["bytes"] == 200
+    assert stats["hits"] == {"video": 1} and stats["misses"] == {"video": 2}
+    assert stats["bytes_saved"] == {"video": 100}
+    # Only whole entries are ever visible; no temp files are left behind
+    assert not [name for name in os.listdir(tmp_path / "cache" / "video") if name.startswith(".")]
+
+def test_decoded_audio_round_trips_without_loss(tmp_path):
+    cache = MediaCache(tmp_path, max_bytes=10 ** 6)
+    audio = (np.random.default_rng(0).integers(-32768, 32767, 16000) / 32768.0).astype(np.float32)
+
+    assert cache.load_audio("etag.s16le") is None
+    assert cache.store_audio("etag.s16le", audio)
+    assert os.path.getsize(tmp_path / "audio" / "etag.s16le") == audio.nbytes // 2
+    assert np.array_equal(cache.load_audio("etag.s16le"), audio)
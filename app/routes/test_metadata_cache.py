@@ -0,0 +1,76 @@
+import os
+
+# Direct-connection settings, so anything that falls through to init_db() never tries an SSH tunnel
+os.environ.setdefault("ENVIRONMENT_TYPE", "ec2")
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.models.answers import Answers
+from app.models.evaluation import Evaluation
+from app.models.interview import Interview
+from app.models.questions import Questions
+from app.services.metadata_cache import MetadataCache, SharedCacheStore
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    for model in (Interview, Questions, Answers, Evaluation):
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Interview(interview_id=1, candidate_id=5, manager_id=6))
+    session.add_all([Questions(question_id=q, question_text=f"Question {q}") for q in (10, 11)])
+    session.add_all([Answers(answer_id=100, question_id=10, answer="Reference answer")])
+    session.add_all([Evaluation(evaluation_id=e, interview_id=1, question_id=q) for e, q in ((1, 10), (2, 11))])
+    session.commit()
+    session.close()
+    return engine
+
+def count_queries(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+def test_read_through_prefetch_and_invalidation(engine):
+    db = sessionmaker(bind=engine)()
+    cache = MetadataCache(max_entries=100, ttl_seconds=60)
+    statements = count_queries(engine)
+
+    # One query for the question ids, one for questions, one for answers
+    prefetched = cache.prefetch_interview(db, 1)
+    assert len(statements) == 3
+    assert prefetched[10]["question"].question_text == "Question 10"
+    assert [a.answer for a in prefetched[10]["answers"]] == ["Reference answer"]
+    assert prefetched[11]["answers"] == []
+
+    cache.get_questions(db, [10, 11])
+    cache.get_answers(db, [10, 11])
+    assert len(statements) == 3
+
+    assert cache.get_interview(db, 1).candidate_id == 5
+    assert cache.get_interview(db, 1).manager_id == 6
+    assert len(statements) == 4
+
+    cache.invalidate("interview", 1)
+    cache.get_interview(db, 1)
+    assert len(statements) == 5
+    assert cache.stats()["by_kind"]["question"] == {"hits": 2, "shared_hits": 0, "misses": 2, "hit_rate": 0.5}
+
+def test_ttl_lru_and_shared_store(engine, tmp_path):
+    db = sessionmaker(bind=engine)()
+    shared = SharedCacheStore(create_engine(f"sqlite:///{tmp_path / 'shared.db'}"), ttl_seconds=60)
+
+    first = MetadataCache(max_entries=1, ttl_seconds=60, shared=shared)
+    first.get_questions(db, [10, 11])
+    assert first.stats()["entries"] == 1 and first.stats()["evictions"] == 1
+
+    # Another worker reuses the warm entries without touching the database
+    second = MetadataCache(max_entries=100, ttl_seconds=0, shared=shared)
+    statements = count_queries(engine)
+    assert second.get_questions(db, [10, 11])[11].question_text == "Question 11"
+    assert statements == []
+    assert second.stats()["by_kind"]["question"]["shared_hits"] == 2
+
+    # A zero TTL expires local entries immediately
+    second.get_questions(db, [10])
+    assert second.stats()["expirations"] >= 1
@@ -0,0 +1,46 @@
+import asyncio
+import time
+import pytest
+from app.services.metrics import MetricsRegistry, monitor_event_loop, span, span_failures, span_in_flight, span_seconds, event_loop_lag_seconds
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("demo_seconds", "Demo latency", ("stage",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        latency.observe(value, stage="download")
+
+    text = registry.render()
+    assert 'demo_seconds_bucket{stage="download",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="download",le="1"} 2' in text
+    assert 'demo_seconds_bucket{stage="download",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{stage="download"} 3' in text
+
+def test_span_tracks_duration_in_flight_and_failures():
+    async def scenario():
+        with span("unit_test_ok"):
+            assert span_in_flight._values[("unit_test_ok",)] == 1
+            await asyncio.sleep(0.01)
+        with pytest.raises(RuntimeError):
+            with span("unit_test_error"):
+                raise RuntimeError("boom")
+
+    asyncio.run(scenario())
+
+    assert span_in_flight._values[("unit_test_ok",)] == 0
+    counts, total, observed = span_seconds._values[("unit_test_ok",)]
+    assert observed == 1 and total >= 0.01
+    assert span_failures._values[("unit_test_error",)] == 1
+
+def test_event_loop_monitor_sees_blocking_calls():
+    async def scenario():
+        stop = asyncio.Event()
+        monitor = asyncio.create_task(monitor_event_loop(stop, interval=0.01))
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)  # blocks the loop
+        await asyncio.sleep(0.02)
+        stop.set()
+        await monitor
+
+    asyncio.run(scenario())
+    _, total, observed = event_loop_lag_seconds._values[()]
+    assert observed >= 2 and total >= 0.08
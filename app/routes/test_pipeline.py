@@ -0,0 +1,31 @@
+import asyncio
+import time
+from app.services.pipeline import PipelineStage, run_pipeline
+
+def _sleeping_stage(name, seconds, concurrency=1):
+    async def handler(item):
+        await asyncio.sleep(seconds)
+        return item
+    return PipelineStage(name, handler, concurrency)
+
+def test_pipeline_overlaps_stages():
+    stages = [_sleeping_stage("download", 0.05), _sleeping_stage("transcribe", 0.05)]
+    started = time.perf_counter()
+    results, stats = asyncio.run(run_pipeline(range(6), stages))
+    elapsed = time.perf_counter() - started
+
+    assert sorted(results) == list(range(6))
+    # Serial processing would take 6 * 0.1s; overlapped it is close to 7 * 0.05s
+    assert elapsed < 0.5
+    assert stats["download"]["processed"] == 6
+
+def test_pipeline_drops_failed_items():
+    async def flaky(item):
+        if item == 2:
+            raise RuntimeError("boom")
+        return item
+
+    results, stats = asyncio.run(run_pipeline(range(4), [PipelineStage("flaky", flaky, 2)]))
+
+    assert sorted(results) == [0, 1, 3]
+    assert stats["flaky"]["failed"] == 1
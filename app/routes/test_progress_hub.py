@@ -0,0 +1,59 @@
+import asyncio
+import threading
+from app.services.progress_hub import ProgressHub
+
+class FakeWebSocket:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+
+    async def send_json(self, message):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+def test_many_subscribers_and_coalesced_progress():
+    async def scenario():
+        hub = ProgressHub(max_updates_per_second=10)
+        await hub.start()
+        first, second = FakeWebSocket(), FakeWebSocket()
+        hub.subscribe(7, first)
+        hub.subscribe(7, second)
+
+        # A burst of transfer callbacks from a boto3 thread
+        def transfer():
+            for percent in range(101):
+                hub.publish_progress_threadsafe(7, {"status": "in_progress", "progress": percent})
+        worker = threading.Thread(target=transfer)
+        worker.start()
+        worker.join()
+        await asyncio.sleep(0.3)
+        await hub.publish(7, {"status": "completed"})
+        await asyncio.sleep(0.05)
+        return hub, first, second
+
+    hub, first, second = asyncio.run(scenario())
+
+    assert first.sent == second.sent
+    assert first.sent[-1] == {"status": "completed"}
+    progress = [m["progress"] for m in first.sent if m["status"] == "in_progress"]
+    # 101 callbacks collapse into a handful of sends, ending on the latest value
+    assert len(progress) <= 3
+    assert progress[-1] == 100
+    assert hub.stats["coalesced"] > 90
+
+def test_slow_subscriber_drops_stale_messages():
+    async def scenario():
+        hub = ProgressHub(max_updates_per_second=0, subscriber_queue_size=2)
+        await hub.start()
+        slow = FakeWebSocket(delay=0.05)
+        subscriber = hub.subscribe(8, slow)
+        for percent in range(10):
+            await hub.publish(8, {"progress": percent})
+        await asyncio.sleep(0.3)
+        return subscriber, slow
+
+    subscriber, slow = asyncio.run(scenario())
+
+    assert subscriber.dropped > 0
+    assert slow.sent[-1] == {"progress": 9}
@@ -0,0 +1,120 @@
+import os
+import boto3
+import pytest
+from moto import mock_aws
+from app.utils.s3_utils import S3TransferService
+
+BUCKET = "test-bucket"
+
+@pytest.fixture
+def s3_service():
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    with mock_aws():
+        client = boto3.client("s3", aws_access_key_id="test", aws_secret_access_key="test")
+        client.create_bucket(Bucket=BUCKET)
+        service = S3TransferService(multipart_threshold_mb=1, multipart_chunksize_mb=1, max_concurrency=4, client=client)
+        yield service
+        service.close()
+
+def test_ranged_download_reassembles_large_object(s3_service, tmp_path):
+    payload = os.urandom(3 * 1024 * 1024 + 123)
+    s3_service.client.put_object(Bucket=BUCKET, Key="videos/large.mp4", Body=payload)
+    seen = []
+
+    local_path = tmp_path / "large.mp4"
+    size = s3_service.download_file(BUCKET, "videos/large.mp4", str(local_path), callback=seen.append)
+
+    assert size == len(payload)
+    assert local_path.read_bytes() == payload
+    assert sum(seen) == len(payload)
+    # Four 1 MB ranges plus the HEAD for the size
+    assert s3_service.stats()["get"]["requests"] == 4
+    assert s3_service.stats()["head"]["requests"] == 1
+
+def test_batched_text_uploads(s3_service):
+    items = [(f"ConvertedTextFile/{i}.txt", f"transcript {i}") for i in range(5)]
+
+    failed = s3_service.upload_texts(BUCKET, items)
+
+    assert failed == []
+    assert s3_service.read_text(BUCKET, "ConvertedTextFile/3.txt") == "transcript 3"
+    assert s3_service.stats()["put"]["requests"] == 5
+
+def test_key_listing_is_scoped_to_the_prefix(s3_service):
+    for key in ("ConvertedTextFile/a.txt", "ConvertedTextFile/b.txt", "ConvertedTextFile/c.json", "videos/a.mp4"):
+        s3_service.client.put_object(Bucket=BUCKET, Key=key, Body=b"x")
+
+    assert list(s3_service.list_keys(BUCKET, "ConvertedTextFile/")) == [
+        "ConvertedTextFile/a.txt", "ConvertedTextFile/b.txt", "ConvertedTextFile/c.json"]
+    assert list(s3_service.list_keys(BUCKET, "ConvertedTextFile/", "ConvertedTextFile/a.txt")) == [
+        "ConvertedTextFile/b.txt", "ConvertedTextFile/c.json"]
+
+def test_key_index_lists_once_refreshes_on_a_miss_and_persists(s3_service, tmp_path, monkeypatch):
+    from app.utils import s3_utils
+    monkeypatch.setattr(s3_utils, "_s3_service", s3_service)
+    s3_service.client.put_object(Bucket=BUCKET, Key="ConvertedTextFile/interview_1_q10.txt", Body=b"x")
+    s3_service.client.put_object(Bucket=BUCKET, Key="videos/interview_1_q11.txt", Body=b"x")
+
+    index = s3_utils.S3KeyIndex(BUCKET, "ConvertedTextFile/", str(tmp_path))
+    assert index.find("interview_1_q10") == "ConvertedTextFile/interview_1_q10.txt"
+    # Keys outside the prefix are never listed
+    assert index.find("interview_1_q11") is None
+    lists = s3_service.stats()["list"]["requests"]
+    assert index.find("interview_1_q10") == "ConvertedTextFile/interview_1_q10.txt"
+    assert s3_service.stats()["list"]["requests"] == lists
+
+    # A key written later is picked up by an incremental refresh on the first miss
+    s3_service.client.put_object(Bucket=BUCKET, Key="ConvertedTextFile/interview_2_q10.txt", Body=b"x")
+    assert index.find("interview_2_q10") == "ConvertedTextFile/interview_2_q10.txt"
+
+    # A key that sorts before the newest one is missed by incremental listing until a miss re-lists everything
+    s3_service.client.put_object(Bucket=BUCKET, Key="ConvertedTextFile/interview_0_q10.txt", Body=b"x")
+    assert index.find("interview_0_q10") is None
+    index._full_refreshed_at -= index.miss_refresh_seconds + 1
+    assert index.find("interview_0_q10") == "ConvertedTextFile/interview_0_q10.txt"
+
+    # A new process starts from the listing cached on disk
+    reloaded = s3_utils.S3KeyIndex(BUCKET, "ConvertedTextFile/", str(tmp_path))
+    lists = s3_service.stats()["list"]["requests"]
+    assert reloaded.find("interview_2_q10") == "ConvertedTextFile/interview_2_q10.txt"
+    assert s3_service.stats()["list"]["requests"] == lists
+
+def test_missing_transcript_key_falls_back_to_the_index(s3_service, tmp_path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from app.config.settings import S3_CONFIG
+    from app.routes import interview
+    from app.utils import s3_utils
+    monkeypatch.setattr(s3_utils, "_s3_service", s3_service)
+    monkeypatch.setitem(S3_CONFIG, "S3_KEY_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(interview, "_transcript_key_indexes", {})
+    s3_service.client.put_object(Bucket=BUCKET, Key="ConvertedTextFile/interview_1_q10.txt", Body=b"my answer")
+
+    # Exact key: a single GET, no listing
+    assert interview.read_s3_text_file(BUCKET, "ConvertedTextFile/interview_1_q10.txt") == "my answer"
+    assert "list" not in s3_service.stats()
+    # NoSuchKey: found through the prefix index
+    assert interview.read_s3_text_file(BUCKET, "interview_1_q10") == "my answer"
+    assert interview.read_s3_text_file(BUCKET, "interview_9_q10") == ""
+
+    # Concurrent lookups share one index per bucket
+    with ThreadPoolExecutor(8) as pool:
+        indexes = list(pool.map(lambda _: interview.get_transcript_key_index("other-bucket"), range(16)))
+    assert all(index is indexes[0] for index in indexes)
+
+def test_lookups_are_safe_while_the_index_refreshes(s3_service, tmp_path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from app.utils import s3_utils
+    monkeypatch.setattr(s3_utils, "_s3_service", s3_service)
+    for i in range(200):
+        s3_service.client.put_object(Bucket=BUCKET, Key=f"ConvertedTextFile/interview_{i}_q1.txt", Body=b"x")
+    index = s3_utils.S3KeyIndex(BUCKET, "ConvertedTextFile/", str(tmp_path), miss_refresh_seconds=0)
+    index.refresh(full=True)
+
+    def lookup(i):
+        # Every other call misses, so full refreshes replace the key set under the other lookups
+        return index.find(f"interview_{i}_q1" if i % 2 else "missing")
+
+    with ThreadPoolExecutor(8) as pool:
+        found = list(pool.map(lookup, range(64)))
+    assert found[1::2] == [f"ConvertedTextFile/interview_{i}_q1.txt" for i in range(1, 64, 2)]
+    assert found[::2] == [None] * 32
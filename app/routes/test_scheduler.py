@@ -0,0 +1,72 @@
+import os
+
+# Direct-connection settings, so anything that falls through to init_db() never tries an SSH tunnel
+os.environ.setdefault("ENVIRONMENT_TYPE", "ec2")
+
+import asyncio
+import pytest
+from app.services.jobs import PRIORITY_CLASSES
+from app.config.settings import SCHEDULER_CONFIG, JOB_CONFIG
+from app.services.scheduler import FairScheduler, default_slots, host_processes
+
+def test_freed_slots_go_to_urgent_work_then_to_the_interview_holding_fewest():
+    async def scenario():
+        scheduler = FairScheduler(max_slots=2)
+        order = []
+
+        async def work(interview_id, priority=PRIORITY_CLASSES["normal"]):
+            async with scheduler.slot(interview_id, priority):
+                order.append(interview_id)
+                await asyncio.sleep(0.01)
+
+        # A large interview fills both slots and queues more work before the others arrive
+        big = [asyncio.create_task(work(1)) for _ in range(6)]
+        await asyncio.sleep(0)
+        small = asyncio.create_task(work(2))
+        await asyncio.sleep(0)
+        urgent = asyncio.create_task(work(3, PRIORITY_CLASSES["urgent"]))
+        await asyncio.gather(*big, small, urgent)
+        return order, scheduler.stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order[:2] == [1, 1]
+    # The urgent interview goes next, then the small one, without waiting for the other four videos
+    assert order[2] == 3 and order.index(2) <= 4
+    assert stats["in_use"] == 0 and stats["waiting"] == {}
+    assert stats["wait_seconds"]["urgent"]["granted"] == 1
+
+def test_cancelled_waiter_gives_up_its_place():
+    async def scenario():
+        scheduler = FairScheduler(max_slots=1)
+        await scheduler.acquire(1)
+        waiter = asyncio.create_task(scheduler.acquire(2))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        scheduler.release(1)
+        # The slot is free again rather than leaked to the cancelled waiter
+        await asyncio.wait_for(scheduler.acquire(3), 1)
+        return scheduler.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["in_use"] == 1 and stats["waiting"] == {}
+
+def test_default_slots_fit_the_host():
+    assert 1 <= default_slots() <= (os.cpu_count() or 1)
+
+def test_processes_sharing_the_host_split_its_slots(monkeypatch):
+    monkeypatch.setitem(SCHEDULER_CONFIG, "SCHEDULER_CPUS_PER_SLOT", 1 / 64)
+    monkeypatch.setitem(SCHEDULER_CONFIG, "SCHEDULER_RESERVED_MEMORY_MB", 0)
+    monkeypatch.setitem(SCHEDULER_CONFIG, "SCHEDULER_MEMORY_PER_SLOT_MB", 1)
+    whole_host = default_slots(processes=1)
+    assert whole_host >= 8
+    assert default_slots(processes=4) == whole_host // 4
+
+    # The API process and the default two app.worker processes each take a third
+    monkeypatch.setitem(SCHEDULER_CONFIG, "SCHEDULER_HOST_PROCESSES", 0)
+    monkeypatch.setitem(JOB_CONFIG, "JOB_API_WORKERS", 4)
+    monkeypatch.setitem(JOB_CONFIG, "JOB_WORKER_PROCESSES", 2)
+    assert host_processes() == 3 and default_slots() == whole_host // 3
+    monkeypatch.setitem(JOB_CONFIG, "JOB_API_WORKERS", 0)
+    assert host_processes() == 2
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import create_engine, event, text
+from app.services import score_cache as score_cache_module
+from app.services.score_cache import ScoreCache, score_cache_key
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(score_cache_module.time, "time", lambda: now[0])
+    return now
+
+def test_hits_misses_and_ttl_expiry(clock):
+    cache = ScoreCache(create_engine("sqlite://"), ttl_seconds=60)
+    key = score_cache_key("an answer", 10, "gpt-4o-mini", "1")
+
+    assert cache.get(key) is None
+    cache.put(key, (80.0, 70.0, 60.0, 50.0))
+    clock[0] += 59
+    assert cache.get(key) == (80.0, 70.0, 60.0, 50.0)
+    clock[0] += 2
+    assert cache.get(key) is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "evictions": 0, "errors": 0, "hit_rate": 0.333}
+    # Any change to the inputs is a different entry
+    assert score_cache_key("an answer", 11, "gpt-4o-mini", "1") != key
+
+def test_least_recently_used_entries_are_evicted_over_the_limit(clock):
+    engine = create_engine("sqlite://")
+    cache = ScoreCache(engine, max_entries=3)
+    for name in "abc":
+        cache.put(name, (1, 2, 3, 4))
+        clock[0] += 1
+    assert cache.get("a") is not None  # "b" is now the least recently used
+    clock[0] += 1
+
+    cache.put("d", (1, 2, 3, 4))
+
+    assert cache.get("b") is None
+    assert all(cache.get(name) is not None for name in "acd")
+    assert cache.stats()["evictions"] == 1
+
+def test_puts_under_the_limit_do_not_count_the_table(clock):
+    engine = create_engine("sqlite://")
+    cache = ScoreCache(engine, max_entries=100, evict_every=50)
+    counts = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: counts.append(statement) if "count(" in statement else None)
+
+    for i in range(49):
+        cache.put(str(i), (1, 2, 3, 4))
+    # One count to seed the estimate, none per put
+    assert len(counts) == 1
+    cache.put("49", (1, 2, 3, 4))
+    assert len(counts) == 2
+
+def test_database_errors_are_a_miss_not_a_failure(clock):
+    engine = create_engine("sqlite://")
+    cache = ScoreCache(engine)
+    cache.put("a", (1, 2, 3, 4))
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE score_cache"))
+
+    assert cache.get("a") is None
+    cache.put("b", (1, 2, 3, 4))
+    assert cache.stats()["misses"] == 1 and cache.stats()["errors"] == 2
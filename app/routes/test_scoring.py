@@ -0,0 +1,97 @@
+import asyncio
+import time
+import pytest
+from app.services.scoring import FakeScoringBackend, ScoreParseError, ScoringBackend, ScoringEngine, parse_scores
+
+def test_parse_scores_plain_and_labelled():
+    assert parse_scores("80, 75, 90, 60") == (80.0, 75.0, 90.0, 60.0)
+    assert parse_scores("Semantic: 80%\nTopic: 75\nGrammar: 90.5\nDisfluency: 140.") == (80.0, 75.0, 90.5, 100.0)
+
+def test_parse_scores_rejects_short_reply():
+    with pytest.raises(ScoreParseError):
+        parse_scores("I cannot score this text.")
+
+def test_parse_scores_rejects_replies_in_another_shape():
+    # Taking the first four numbers would read these as 1, 80, 2, 75 and 0, 100, 80, 75
+    for reply in ("1. 80\n2. 75\n3. 90\n4. 60", "On a 0-100 scale: 80, 75, 90, 60", "80, 75, 90",
+                  "80, 75, 90, 60, 55", "80, 75, 90, 60. The grammar is mostly correct."):
+        with pytest.raises(ScoreParseError):
+            parse_scores(reply)
+    assert parse_scores("Semantic similarity: 80%, Broad topic: 75; Grammar: 90, Disfluency: 60.") == (80.0, 75.0, 90.0, 60.0)
+
+def test_engine_scores_concurrently():
+    backend = FakeScoringBackend(latency_seconds=0.1)
+    engine = ScoringEngine(backend, max_concurrency=10)
+    transcripts = {i: f"answer {i}" for i in range(10)}
+
+    started = time.perf_counter()
+    results = asyncio.run(engine.score_many(transcripts))
+    elapsed = time.perf_counter() - started
+
+    assert backend.calls == 10
+    assert all(len(scores) == 4 for scores in results.values())
+    # Ten round trips in parallel cost about one
+    assert elapsed < 0.5
+
+def test_engine_retries_unparseable_replies():
+    class FlakyBackend(ScoringBackend):
+        model = "flaky"
+
+        def __init__(self):
+            self.calls = 0
+
+        async def complete(self, prompt):
+            self.calls += 1
+            return "not sure" if self.calls == 1 else "1, 2, 3, 4"
+
+    backend = FlakyBackend()
+    engine = ScoringEngine(backend, max_retries=2, backoff_seconds=0.01)
+
+    assert asyncio.run(engine.score("hello")) == (1.0, 2.0, 3.0, 4.0)
+    assert engine.stats["retries"] == 1
+
+def test_engine_fails_fast_on_errors_a_retry_cannot_fix_and_honours_retry_after():
+    import httpx
+    import openai
+
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+    class FailingBackend(ScoringBackend):
+        model = "failing"
+
+        def __init__(self, errors):
+            self.errors = list(errors)
+            self.calls = 0
+
+        async def complete(self, prompt):
+            self.calls += 1
+            if self.errors:
+                raise self.errors.pop(0)
+            return "1, 2, 3, 4"
+
+    too_long = openai.BadRequestError(
+        "maximum context length exceeded", response=httpx.Response(400, request=request), body=None)
+    backend = FailingBackend([too_long])
+    engine = ScoringEngine(backend, max_retries=4, backoff_seconds=10)
+    started = time.perf_counter()
+    with pytest.raises(openai.BadRequestError):
+        asyncio.run(engine.score("hello"))
+    assert backend.calls == 1 and engine.stats["retries"] == 0 and engine.stats["failures"] == 1
+    assert time.perf_counter() - started < 0.5
+
+    # A 429 waits for the server's Retry-After instead of the (here very long) backoff
+    rate_limited = openai.RateLimitError(
+        "slow down", response=httpx.Response(429, headers={"retry-after": "0.05"}, request=request), body=None)
+    backend = FailingBackend([rate_limited])
+    engine = ScoringEngine(backend, max_retries=4, backoff_seconds=10)
+    started = time.perf_counter()
+    assert asyncio.run(engine.score("hello")) == (1.0, 2.0, 3.0, 4.0)
+    assert backend.calls == 2 and engine.stats["retries"] == 1
+    assert 0.05 <= time.perf_counter() - started < 1
+
+    # Timeouts and 5xx are retried with the usual backoff
+    server_error = openai.InternalServerError("oops", response=httpx.Response(503, request=request), body=None)
+    backend = FailingBackend([openai.APITimeoutError(request=request), server_error])
+    engine = ScoringEngine(backend, max_retries=4, backoff_seconds=0.01)
+    assert asyncio.run(engine.score("hello")) == (1.0, 2.0, 3.0, 4.0)
+    assert backend.calls == 3 and engine.stats["retries"] == 2
@@ -0,0 +1,40 @@
+from app.services.semantic_index import SemanticIndex
+
+DOCUMENTS = [
+    {"kind": "answer", "id": 1, "question_id": 10, "text": "A list is mutable while a tuple is immutable and hashable"},
+    {"kind": "topic", "id": 10, "question_id": 10, "text": "Difference between a list and a tuple in Python"},
+    {"kind": "answer", "id": 2, "question_id": 11, "text": "Indexes speed up lookups in a database using B-trees"},
+    {"kind": "topic", "id": 11, "question_id": 11, "text": "Explain database indexing SQL"},
+]
+
+def test_rebuild_only_revectorizes_changed_rows(tmp_path):
+    index = SemanticIndex(str(tmp_path), dimensions=1024)
+    assert index.rebuild(DOCUMENTS)["vectorized"] == 4
+
+    changed = [dict(doc) for doc in DOCUMENTS]
+    changed[2]["text"] = "Indexes avoid full table scans"
+    assert index.rebuild(changed) == {"rows": 4, "reused": 3, "vectorized": 1}
+
+    reloaded = SemanticIndex(str(tmp_path), dimensions=1024)
+    assert reloaded.load() and len(reloaded.rows) == 4
+
+def test_relevant_answers_score_higher(tmp_path):
+    index = SemanticIndex(str(tmp_path), dimensions=1024)
+    index.rebuild(DOCUMENTS)
+
+    relevant, off_topic = index.score([
+        (10, "a tuple is immutable so it is hashable but a list is mutable"),
+        (10, "I enjoy hiking on the weekends"),
+    ])
+
+    assert relevant[0] > 30 and relevant[1] > 0
+    assert off_topic == (0.0, 0.0)
+
+def test_questions_missing_from_the_index_use_fallback_texts(tmp_path):
+    index = SemanticIndex(str(tmp_path), dimensions=1024)
+    index.rebuild(DOCUMENTS)
+
+    fallback = {12: {"answer": ["Generators yield values lazily"], "topic": ["Python generators"]}}
+    [(semantic, topic)] = index.score([(12, "generators yield values lazily one at a time")], fallback)
+
+    assert semantic > 30 and topic > 0
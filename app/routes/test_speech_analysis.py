@@ -0,0 +1,52 @@
+from app.services.speech_analysis import analyze_interview
+
+def timed_answer(text, words_per_second=2.5, pause_after=()):
+    """Build a segment list with evenly spaced word timings and optional long pauses."""
+    words, clock = [], 0.0
+    for i, word in enumerate(text.split()):
+        words.append({"word": " " + word, "start": clock, "end": clock + 0.3})
+        clock += 1.0 / words_per_second + (2.0 if i in pause_after else 0.0)
+    return {"text": text, "segments": [{"start": 0.0, "end": clock, "text": text, "words": words}]}
+
+FLUENT = "A tuple is immutable so it can be used as a dictionary key while a list cannot"
+HESITANT = "Um a tuple is uh is immutable so um it can it can be used you know as a key"
+
+def test_fillers_repetitions_and_pauses_lower_the_score():
+    fluent, hesitant = analyze_interview([
+        timed_answer(FLUENT),
+        timed_answer(HESITANT, pause_after=(3, 8)),
+    ])
+
+    assert fluent["filler_rate"] == 0 and fluent["long_pauses"] == 0
+    assert hesitant["filler_rate"] > 0.15
+    assert hesitant["repetitions"] >= 1 and hesitant["restarts"] >= 1
+    assert hesitant["long_pauses"] == 2
+    assert 140 < fluent["speech_rate_wpm"] < 160
+    assert hesitant["disfluency_score"] < fluent["disfluency_score"]
+
+def test_grammar_rules_and_text_only_answers():
+    correct, incorrect = analyze_interview([
+        {"text": "They were right and an index is useful.", "segments": None},
+        {"text": "They was right and a index should of been used.", "segments": None},
+    ])
+
+    assert correct["grammar_errors"] == 0 and correct["grammar_score"] == 100.0
+    assert incorrect["grammar_errors"] == 3 and incorrect["grammar_score"] < correct["grammar_score"]
+    # Without word timings the timing features are unavailable rather than zero
+    assert incorrect["speech_rate_wpm"] is None and incorrect["p90_pause_seconds"] is None
+
+def test_correct_english_is_not_flagged():
+    answers = analyze_interview([
+        {"text": "I was there. I was happy. I was done.", "segments": None},
+        {"text": "I was working on a user service and it was more power efficient", "segments": None},
+        {"text": "A university, a European team and a one-off job, then an hour later an index.", "segments": None},
+        {"text": "If it were up to me. Does he have experience? Did she have access? What does it have to do with "
+                 "scaling? Would it have helped? Can he have two roles? It felt as if it were done.", "segments": None},
+        {"text": "We kept an S3 bucket, an LRU cache and an F1 score.", "segments": None},
+    ])
+
+    assert [a["grammar_errors"] for a in answers] == [0, 0, 0, 0, 0]
+    assert all(a["grammar_score"] == 100.0 for a in answers)
+    # The narrowed rules still catch the errors they were meant for
+    assert analyze_interview([{"text": "I is sure they is a ordinary team", "segments": None}])[0]["grammar_errors"] == 3
+    assert analyze_interview([{"text": "He have an big team and it were an lru", "segments": None}])[0]["grammar_errors"] == 4
@@ -0,0 +1,6 @@
+from benchmarks.bench_startup import probe
+
+def test_importing_main_does_not_load_the_ml_stack_or_connect():
+    # A fresh interpreter; importing main must not pull in torch/whisper/boto3 or open the DB tunnel
+    result = probe()
+    assert result["heavy_modules"] == []
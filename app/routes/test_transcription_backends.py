@@ -0,0 +1,117 @@
+from types import SimpleNamespace
+import numpy as np
+import logging
+import pytest
+from app.config.settings import WHISPER_CONFIG
+from app.services.transcription_backends import FasterWhisperBackend, WhisperBackend, get_backend
+from app.services.whisper_registry import WhisperModelRegistry
+from app.services.speech_analysis import compact_segments
+
+class FakeCTranslate2Model:
+    """Returns what faster_whisper.WhisperModel.transcribe does: a lazy segment generator and an info object."""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **options):
+        self.calls.append(options)
+        words = [SimpleNamespace(word=" we", start=0.0, end=0.2, probability=0.9),
+                 SimpleNamespace(word=" cache", start=0.3, end=0.6, probability=0.8)]
+        segments = (SimpleNamespace(start=0.0, end=0.6, text=" We cache.", no_speech_prob=0.01, avg_logprob=-0.2,
+                                    words=words if options["word_timestamps"] else None) for _ in range(2))
+        return segments, SimpleNamespace(language="en", duration=len(audio) / 16000)
+
+class FakeTorchModel:
+    def __init__(self):
+        self.calls = []
+
+    def parameters(self):
+        # Ten fp32 weights, shaped like a torch tensor as far as sizing goes
+        return [SimpleNamespace(numel=lambda: 10, element_size=lambda: 4)]
+
+    def buffers(self):
+        return []
+
+    def transcribe(self, audio, **options):
+        self.calls.append(options)
+        return {"text": " hello", "segments": [{"start": 0.0, "end": 1.0, "text": " hello", "words": []}]}
+
+def test_faster_whisper_results_have_the_whisper_shape():
+    backend = get_backend("faster-whisper", beam_size=3)
+    model = FakeCTranslate2Model()
+
+    result = backend.transcribe(model, np.zeros(16000, np.float32), word_timestamps=True)
+
+    assert model.calls == [{"beam_size": 3, "word_timestamps": True}]
+    assert result["text"] == " We cache. We cache."
+    segments = compact_segments(result)
+    assert [w["word"] for w in segments[0]["words"]] == [" we", " cache"]
+    assert backend.transcribe(model, np.zeros(16000, np.float32))["segments"][0]["words"] == []
+    assert backend.describe()["compute_type"] == "int8"
+
+def test_registry_routes_loading_and_transcription_through_the_backend():
+    loaded = []
+
+    class RecordingBackend(WhisperBackend):
+        def load(self, size, device=None):
+            loaded.append(size)
+            return FakeTorchModel()
+
+    registry = WhisperModelRegistry(["base"], "base", memory_budget_mb=100, backend=RecordingBackend(beam_size=5))
+
+    assert registry.transcribe(np.zeros(16000, np.float32), word_timestamps=True)["text"] == " hello"
+    model = registry.get()
+    assert loaded == ["base"]
+    assert model.calls == [{"word_timestamps": True, "fp16": False, "beam_size": 5}]
+    stats = registry.stats()
+    assert stats["backend"] == "whisper" and stats["compute_type"] == "float32"
+    assert stats["models"]["base"]["model_bytes"] == 40
+
+class SizedModel(FakeTorchModel):
+    def __init__(self, mb):
+        super().__init__()
+        self.mb = mb
+
+    def parameters(self):
+        return [SimpleNamespace(numel=lambda: self.mb * 1024 * 1024, element_size=lambda: 1)]
+
+def test_registry_evicts_least_recently_used_models_over_the_budget(caplog, monkeypatch):
+    monkeypatch.setitem(WHISPER_CONFIG, "WHISPER_WARMUP", True)
+    loaded = []
+
+    def loader(size, device=None):
+        loaded.append(size)
+        return SizedModel({"tiny": 40, "base": 70, "small": 250}[size])
+
+    registry = WhisperModelRegistry(["tiny", "base"], "base", memory_budget_mb=150,
+                                    backend=WhisperBackend(), loader=loader)
+    with caplog.at_level(logging.WARNING, logger="app.services.whisper_registry"):
+        registry.warm_up()
+    # Both configured sizes fit: loaded once, warmed once, nothing to warn about
+    assert loaded == ["tiny", "base"] and not caplog.records
+    assert [model.calls for model in map(registry.get, ["tiny", "base"])] == [[{"word_timestamps": False, "fp16": False}]] * 2
+    assert all(stats["warmup_seconds"] is not None for stats in registry.stats()["models"].values())
+
+    # "base" was used last, so "tiny" goes first; a model over the budget on its own is still served
+    registry.get("base")
+    registry.get("small")
+    assert list(registry.stats()["models"]) == ["small"]
+    registry.get("tiny")
+    assert list(registry.stats()["models"]) == ["tiny"]
+    assert loaded == ["tiny", "base", "small", "tiny"]
+
+def test_warm_up_warns_when_the_configured_sizes_exceed_the_budget(caplog, monkeypatch):
+    monkeypatch.setitem(WHISPER_CONFIG, "WHISPER_WARMUP", False)
+    registry = WhisperModelRegistry(["base", "small"], "base", memory_budget_mb=200, backend=WhisperBackend(),
+                                    loader=lambda size, device=None: SizedModel({"base": 70, "small": 250}[size]))
+
+    with caplog.at_level(logging.WARNING, logger="app.services.whisper_registry"):
+        registry.warm_up()
+
+    assert list(registry.stats()["models"]) == ["small"]
+    assert any("need 336 MB but the memory budget is 210 MB" in record.getMessage() for record in caplog.records)
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="faster-whisper"):
+        get_backend("whisper.cpp")
+    assert isinstance(get_backend("faster-whisper"), FasterWhisperBackend)
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import threading
+import numpy as np
+import pytest
+from app.services import transcription_engine as engine_module
+from app.services.transcription_backends import WhisperBackend
+from app.services.transcription_engine import TranscriptionEngine, TranscriptionEngineBusy
+from app.services.whisper_registry import WhisperModelRegistry
+
+_worker_initialized = False
+
+def _stub_worker_init():
+    # Stands in for _init_worker: spawned workers run it once, before their first job
+    global _worker_initialized
+    _worker_initialized = True
+
+def _worker_state():
+    return os.getpid(), _worker_initialized
+
+class StubModel:
+    def parameters(self):
+        return []
+
+    def buffers(self):
+        return []
+
+    def transcribe(self, audio, **options):
+        seconds = len(audio) / 16000
+        return {"text": " hello", "segments": [{"start": 0.0, "end": seconds, "text": " hello", "words": []}]}
+
+def test_a_saturated_engine_rejects_instead_of_queueing():
+    async def scenario():
+        engine = TranscriptionEngine(max_workers=0, queue_depth=1, initializer=lambda: None)
+        release = threading.Event()
+        # One job runs and one waits in the queue; that is the engine's whole capacity
+        held = [asyncio.create_task(engine.run(release.wait, 5)) for _ in range(engine.capacity)]
+        while engine.stats()["in_flight"] < engine.capacity:
+            await asyncio.sleep(0.01)
+        assert engine.is_busy
+        with pytest.raises(TranscriptionEngineBusy):
+            await engine.run(release.wait, 5, wait=False)
+
+        release.set()
+        await asyncio.gather(*held)
+        # Capacity is back, so a job that will not wait is accepted again
+        with pytest.raises(ZeroDivisionError):
+            await engine.run(divmod, 1, 0, wait=False)
+        engine.shutdown()
+        return engine.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["completed"] == 2 and stats["failed"] == 1
+    assert stats["in_flight"] == 0 and not stats["busy"]
+
+def test_worker_processes_are_initialized_once_and_restart_after_shutdown():
+    async def scenario():
+        engine = TranscriptionEngine(max_workers=1, queue_depth=0, initializer=_stub_worker_init)
+        engine.start()
+        first = [await engine.run(_worker_state) for _ in range(2)]
+        engine.shutdown()
+        assert engine._executor is None
+        # The next job starts a fresh pool on demand
+        second = await engine.run(_worker_state)
+        engine.shutdown()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first[0] == first[1] and first[0][0] != os.getpid() and first[0][1]
+    assert second[0] != first[0][0] and second[1]
+
+def test_in_process_mode_warms_the_registry_and_transcribes_with_it(monkeypatch):
+    loaded = []
+
+    def loader(size, device=None):
+        loaded.append(size)
+        return StubModel()
+
+    registry = WhisperModelRegistry(["base"], "base", memory_budget_mb=100, backend=WhisperBackend(), loader=loader)
+    monkeypatch.setattr(engine_module, "whisper_registry", registry)
+
+    async def scenario():
+        # max_workers=0 runs the initializer here and transcribes on a single thread
+        engine = TranscriptionEngine(max_workers=0, queue_depth=0, model_size="base")
+        engine.start()
+        assert loaded == ["base"]
+        result = await engine.transcribe_audio(np.zeros(16000, np.float32))
+        engine.shutdown()
+        return result
+
+    result = asyncio.run(scenario())
+    assert result["text"] == " hello" and result["segments"][0]["end"] == 1.0
+    # Warm-up ran a dummy inference, and the real one reused the same model
+    assert loaded == ["base"] and registry.stats()["models"]["base"]["hits"] >= 1
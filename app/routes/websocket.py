@@ -1,8 +1,26 @@
 import asyncio
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import json
+import logging
+import os
+from pathlib import Path
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config.db import get_async_db
+from app.config.settings import S3_CONFIG, APP_CONFIG
+from app.models.evaluation import Evaluation
+from app.routes.interview import segments_key
+from app.services.audio import live_audio_decoder
+from app.services.db_writes import EvaluationBatchWriter
+from app.services.live_transcription import LiveTranscription
+from app.services.progress_hub import progress_hub
+from app.services.transcription_engine import transcription_engine
+from app.utils.s3_utils import get_s3_service, head_s3_object, s3_key_from_uri
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
-connected_clients = {}
 
 @router.websocket("/ws/progress")
 async def interview_progress(websocket: WebSocket):
@@ -14,35 +32,146 @@ async def interview_progress(websocket: WebSocket):
         await websocket.close()
         return
 
-    connected_clients[interview_id] = websocket
+    # Any number of viewers can watch the same interview
+    subscriber = progress_hub.subscribe(interview_id, websocket)
+    await websocket.send_json({
+        "status": "connected",
+        "message": f"Successfully subscribed to updates for interview_id {interview_id}.",
+    })
 
     try:
-        for progress in range(0, 101, 10):  # Simulate progress updates
-            await websocket.send_json({
-                "status": "in_progress",
-                "interview_id": interview_id,
-                "progress": progress,
-                "message": f"Progress at {progress}%",
-            })
-            await asyncio.sleep(2)  # Simulate processing delay
-
-        await websocket.send_json({
-            "status": "completed",
-            "interview_id": interview_id,
-            "message": "Processing completed successfully."
-        })
+        while True:
+            await websocket.receive_text()
     except WebSocketDisconnect:
-        del connected_clients[interview_id]
+        pass
+    finally:
+        progress_hub.unsubscribe(subscriber)
+
+async def _find_evaluation(db: AsyncSession, interview_id, data):
+    query = select(Evaluation).where(Evaluation.interview_id == interview_id)
+    if data.get("evaluation_id") is not None:
+        query = query.where(Evaluation.evaluation_id == data["evaluation_id"])
+    elif data.get("question_id") is not None:
+        query = query.where(Evaluation.question_id == data["question_id"])
+    else:
+        return None
+    evaluation = await db.scalar(query)
+    # Release the pooled connection; an answer can stream for minutes
+    await db.commit()
+    return evaluation
+
+def _save_asr_key(db: Session, evaluation_id, asrfile_s3key, video_etag):
+    writer = EvaluationBatchWriter(db)
+    writer.add_asr_key(evaluation_id, asrfile_s3key, video_etag)
+    writer.flush()
+
+async def _save_transcript(db: AsyncSession, interview_id, evaluation, transcript):
+    """Upload a live transcript where process_files would put it and record its key on the evaluation.
+
+    When the video is already in S3 its ETag is recorded too, so a later batch run skips it.
+    """
+    bucket_name = S3_CONFIG["S3_BUCKET_NAME"]
+    if evaluation.videofile_s3key:
+        stem = Path(evaluation.videofile_s3key).stem
+    else:
+        stem = f"interview_{interview_id}_evaluation_{evaluation.evaluation_id}"
+    upload_file_path = os.path.join("ConvertedTextFile/", stem + ".txt")
+    failed = await asyncio.to_thread(get_s3_service().upload_texts, bucket_name, [
+        (upload_file_path, transcript["text"]),
+        (segments_key(upload_file_path), json.dumps(transcript["segments"])),
+    ])
+    if failed:
+        raise RuntimeError(f"Failed to upload {failed}")
+
+    video_etag = None
+    if evaluation.videofile_s3key:
+        try:
+            head = await asyncio.to_thread(head_s3_object, bucket_name, s3_key_from_uri(evaluation.videofile_s3key))
+            video_etag = head["ETag"].strip('"') if head else None
+        except Exception as e:
+            logger.warning(f"HEAD failed for {evaluation.videofile_s3key}: {e}")
+
+    asrfile_s3key = f"s3://{bucket_name}/{upload_file_path}"
+    await db.run_sync(_save_asr_key, evaluation.evaluation_id, asrfile_s3key, video_etag)
+    return asrfile_s3key
 
 @router.websocket("/ws/{interview_id}")
-async def websocket_endpoint(websocket: WebSocket, interview_id: int):
+async def websocket_endpoint(websocket: WebSocket, interview_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Progress updates for an interview, plus live transcription of answers while they are recorded.
+
+    Per answer the client sends {"type": "start", "question_id" or "evaluation_id",
+    "format", "sample_rate"}, then the recording as binary frames, then {"type": "end"}.
+    The server replies with "started", a "partial" every few seconds of audio and a
+    "final" once the transcript is stored in S3 and on the evaluation.
+    """
     await websocket.accept()
-    connected_clients[interview_id] = websocket
+    subscriber = progress_hub.subscribe(interview_id, websocket)
+    answer, evaluation = None, None
     try:
         while True:
-            data = await websocket.receive_text()
-            await websocket.send_text(f"Message text was: {data}")
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes") is not None:
+                if answer is None:
+                    await websocket.send_json({"type": "error", "message": "Send a start message before audio"})
+                else:
+                    await answer.feed(message["bytes"])
+                continue
+
+            try:
+                data = json.loads(message.get("text") or "")
+            except ValueError:
+                data = {}
+            kind = data.get("type") if isinstance(data, dict) else None
+
+            if kind == "start":
+                if answer is not None:
+                    await answer.abort()
+                    answer = None
+                if APP_CONFIG["API_ONLY"]:
+                    # Transcribing here would start Whisper workers in a process meant to stay light
+                    await websocket.send_json({"type": "error",
+                                               "message": "Live transcription is not available on API-only nodes"})
+                    continue
+                evaluation = await _find_evaluation(db, interview_id, data)
+                if evaluation is None:
+                    await websocket.send_json({"type": "error",
+                                               "message": f"No evaluation for this answer in interview {interview_id}"})
+                    continue
+                decoder = live_audio_decoder(data.get("format", "pcm_s16le"), int(data.get("sample_rate", 16000)))
+                evaluation_id = evaluation.evaluation_id
+
+                async def send_partial(partial, evaluation_id=evaluation_id):
+                    await websocket.send_json({**partial, "evaluation_id": evaluation_id})
+
+                answer = LiveTranscription.from_settings(transcription_engine, decoder, send_partial)
+                await websocket.send_json({"type": "started", "evaluation_id": evaluation_id})
+            elif kind == "end" and answer is not None:
+                finishing, answer = answer, None
+                try:
+                    transcript = await finishing.finish()
+                    asrfile_s3key = await _save_transcript(db, interview_id, evaluation, transcript)
+                except Exception as e:
+                    logger.exception(f"Live transcription failed for evaluation {evaluation.evaluation_id}: {e}")
+                    await websocket.send_json({"type": "error", "evaluation_id": evaluation.evaluation_id,
+                                               "message": f"Live transcription failed: {e}"})
+                    continue
+                await websocket.send_json({
+                    "type": "final",
+                    "evaluation_id": evaluation.evaluation_id,
+                    "text": transcript["text"],
+                    "asrfile_s3key": asrfile_s3key,
+                    "audio_seconds": transcript["audio_seconds"],
+                    "latency_seconds": transcript["latency_seconds"],
+                })
+            else:
+                await websocket.send_json({"type": "error", "message": "Expected a start or end message"})
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
-        print(f"WebSocket connection closed: {e}")
+        logger.exception(f"WebSocket connection closed: {e}")
     finally:
-        del connected_clients[interview_id]
\ No newline at end of file
+        if answer is not None:
+            await answer.abort()
+        progress_hub.unsubscribe(subscriber)
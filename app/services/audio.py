@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import os
+import resource
+import shutil
+import subprocess
+import threading
+import numpy as np
+from app.config.settings import AUDIO_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Whisper expects 16 kHz mono float32 audio
+SAMPLE_RATE = 16000
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+def _peak_rss_bytes():
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _ffmpeg_command(input_target, sample_rate, input_args=()):
+    return [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        *input_args, "-i", input_target,
+        "-vn", "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate),
+        "-loglevel", "error", "-",
+    ]
+
+
+def _pcm_to_float32(pcm_bytes):
+    return np.frombuffer(pcm_bytes, np.int16).astype(np.float32) / 32768.0
+
+
+def extract_audio_file(video_file_path):
+    """Write the audio track of a video next to it as a 16-bit PCM WAV and return its path."""
+    import moviepy.editor as mp
+    video = mp.VideoFileClip(video_file_path)
+    try:
+        audio_path = video_file_path.rsplit('.', 1)[0] + '.wav'  # Handles both .mp4 and .mov
+        video.audio.write_audiofile(audio_path, codec='pcm_s16le', logger=None)
+        return audio_path
+    finally:
+        video.close()
+
+
+def decode_audio_file(video_file_path, sample_rate=SAMPLE_RATE):
+    """Decode the audio track of a local video straight into a float32 buffer via an ffmpeg pipe."""
+    pcm = subprocess.run(
+        _ffmpeg_command(video_file_path, sample_rate), capture_output=True, check=True
+    ).stdout
+    audio = _pcm_to_float32(pcm)
+    stats = {
+        "mode": "pipe",
+        "disk_bytes_read": os.path.getsize(video_file_path),
+        "disk_bytes_written": 0,
+        "peak_buffer_bytes": len(pcm) + audio.nbytes,
+        "process_peak_rss_bytes": _peak_rss_bytes(),
+    }
+    return audio, stats
+
+
+def decode_audio_stream(stream, sample_rate=SAMPLE_RATE):
+    """Decode audio from a readable byte stream (e.g. an S3 object body) without touching disk.
+
+    The container must be readable front to back; MP4/MOV files whose index sits at the
+    end of the file ("moov" atom, no faststart) cannot be decoded from a pipe and raise
+    CalledProcessError, in which case callers should fall back to a local file.
+    """
+    process = subprocess.Popen(
+        _ffmpeg_command("pipe:0", sample_rate),
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    bytes_in = 0
+
+    def feed():
+        nonlocal bytes_in
+        try:
+            while True:
+                chunk = stream.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                bytes_in += len(chunk)
+                process.stdin.write(chunk)
+        except BrokenPipeError:
+            pass  # ffmpeg exited early; its return code tells us why
+        finally:
+            process.stdin.close()
+
+    # Feed stdin from a thread so ffmpeg's stdout pipe never fills up and deadlocks
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    pcm = process.stdout.read()
+    stderr = process.stderr.read()
+    process.wait()
+    feeder.join()
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, "ffmpeg", stderr=stderr)
+
+    audio = _pcm_to_float32(pcm)
+    stats = {
+        "mode": "stream",
+        "network_bytes_read": bytes_in,
+        "disk_bytes_read": 0,
+        "disk_bytes_written": 0,
+        "peak_buffer_bytes": STREAM_CHUNK_SIZE + len(pcm) + audio.nbytes,
+        "process_peak_rss_bytes": _peak_rss_bytes(),
+    }
+    return audio, stats
+
+
+def extract_audio_to_wav(video_file_path):
+    """File-based fallback: write a WAV and let Whisper read it back."""
+    audio_path = extract_audio_file(video_file_path)
+    wav_bytes = os.path.getsize(audio_path)
+    stats = {
+        "mode": "file",
+        # The video is read once by moviepy, the WAV once more by Whisper
+        "disk_bytes_read": os.path.getsize(video_file_path) + wav_bytes,
+        "disk_bytes_written": wav_bytes,
+        # Whisper decodes the whole WAV into int16 and then float32 buffers
+        "peak_buffer_bytes": wav_bytes * 3,
+        "process_peak_rss_bytes": _peak_rss_bytes(),
+    }
+    return audio_path, stats
+
+
+def extract_audio(video_file_path, mode=None):
+    """Return (audio, stats) for a local video.
+
+    In "pipe" mode `audio` is a 16 kHz mono float32 array; in "file" mode, or when
+    ffmpeg is unavailable, it is the path of a WAV file the caller must delete.
+    Both forms can be passed to Whisper's transcribe().
+    """
+    mode = mode or AUDIO_CONFIG["AUDIO_EXTRACTION_MODE"]
+    if mode == "pipe":
+        if shutil.which("ffmpeg"):
+            try:
+                return decode_audio_file(video_file_path)
+            except subprocess.CalledProcessError as e:
+                logger.warning(f"ffmpeg pipe decoding failed for {video_file_path}, falling back to WAV: {e.stderr[-500:]!r}")
+        else:
+            logger.warning("ffmpeg not found on PATH, falling back to WAV extraction")
+    return extract_audio_to_wav(video_file_path)
+
+
+class PcmStreamDecoder:
+    """Live audio sent as raw 16-bit little-endian mono PCM at 16 kHz; needs no decoding."""
+
+    def __init__(self):
+        self._remainder = b""
+
+    async def feed(self, data):
+        """Return the samples in `data`; a trailing odd byte waits for the next frame."""
+        data = self._remainder + data
+        usable = len(data) - len(data) % 2
+        self._remainder = data[usable:]
+        return _pcm_to_float32(data[:usable])
+
+    async def close(self):
+        return np.zeros(0, np.float32)
+
+    def kill(self):
+        pass
+
+
+class FfmpegStreamDecoder:
+    """Decodes live audio in any container ffmpeg can read from a pipe (WebM/Opus, Ogg, PCM at other rates).
+
+    Frames are written to ffmpeg's stdin as they arrive and whatever PCM it has produced
+    so far is handed back, so decoding keeps pace with the recording instead of starting
+    after it. Probing is kept short so the first samples come out within a frame or two.
+    """
+
+    LIVE_INPUT_ARGS = ("-probesize", "32768", "-analyzeduration", "0")
+
+    def __init__(self, input_args=(), sample_rate=SAMPLE_RATE):
+        self.command = _ffmpeg_command("pipe:0", sample_rate, (*self.LIVE_INPUT_ARGS, *input_args))
+        self._process = None
+        self._pcm = bytearray()
+        self._stderr = b""
+        self._readers = None
+
+    async def start(self):
+        self._process = await asyncio.create_subprocess_exec(
+            *self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        self._readers = asyncio.gather(self._read_stdout(), self._read_stderr())
+
+    async def _read_stdout(self):
+        while True:
+            chunk = await self._process.stdout.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                return
+            self._pcm.extend(chunk)
+
+    async def _read_stderr(self):
+        self._stderr = await self._process.stderr.read()
+
+    def _take(self):
+        usable = len(self._pcm) - len(self._pcm) % 2
+        samples = _pcm_to_float32(bytes(self._pcm[:usable]))
+        del self._pcm[:usable]
+        return samples
+
+    async def feed(self, data):
+        if self._process is None:
+            await self.start()
+        try:
+            self._process.stdin.write(data)
+            await self._process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # ffmpeg exited; close() reports why
+        return self._take()
+
+    async def close(self):
+        """Flush ffmpeg and return the remaining samples; raises CalledProcessError if decoding failed."""
+        if self._process is None:
+            return np.zeros(0, np.float32)
+        if not self._process.stdin.is_closing():
+            self._process.stdin.close()
+        await self._readers
+        await self._process.wait()
+        if self._process.returncode != 0:
+            raise subprocess.CalledProcessError(self._process.returncode, "ffmpeg", stderr=self._stderr)
+        return self._take()
+
+    def kill(self):
+        if self._process is not None and self._process.returncode is None:
+            self._process.kill()
+
+
+def live_audio_decoder(audio_format="pcm_s16le", sample_rate=SAMPLE_RATE):
+    """Decoder for a live stream: raw 16 kHz PCM is used as it is, anything else goes through ffmpeg."""
+    if audio_format == "pcm_s16le":
+        if sample_rate == SAMPLE_RATE:
+            return PcmStreamDecoder()
+        return FfmpegStreamDecoder(("-f", "s16le", "-ar", str(sample_rate), "-ac", "1"))
+    # Containers (webm, ogg, mp4 fragments, ...) are detected by ffmpeg itself
+    return FfmpegStreamDecoder()
@@ -0,0 +1,156 @@
+import re
+import numpy as np
+from app.services.audio import SAMPLE_RATE
+
+FRAME_SECONDS = 0.02
+_NORMALIZE = re.compile(r"[^a-z0-9']+")
+
+
+def frame_energy_db(audio, sample_rate=SAMPLE_RATE, frame_seconds=FRAME_SECONDS):
+    """RMS level of every `frame_seconds` frame, in dB relative to full scale."""
+    frame = max(int(sample_rate * frame_seconds), 1)
+    count = len(audio) // frame
+    frames = np.asarray(audio[:count * frame], dtype=np.float32).reshape(count, frame)
+    return 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-12)
+
+
+def _silent_runs(mask):
+    """(start, end) frame ranges where `mask` is True."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def find_split_points(audio, sample_rate=SAMPLE_RATE, chunk_seconds=60.0, search_seconds=10.0,
+                      min_silence_seconds=0.3, silence_db=35.0):
+    """Sample offsets at which to cut long audio, each in a pause near a multiple of `chunk_seconds`.
+
+    Frames more than `silence_db` below the loud (95th percentile) level count as silence.
+    Around every target cut, the longest pause within `search_seconds` wins, ties going to
+    the pause nearest the target; with no pause long enough, the quietest frame is used.
+    """
+    energy = frame_energy_db(audio, sample_rate)
+    if not len(energy):
+        return []
+    frame = int(sample_rate * FRAME_SECONDS)
+    silent = energy < np.percentile(energy, 95) - silence_db
+    chunk_frames = max(int(chunk_seconds / FRAME_SECONDS), 1)
+    search_frames = int(search_seconds / FRAME_SECONDS)
+    min_silence_frames = max(int(min_silence_seconds / FRAME_SECONDS), 1)
+
+    splits = []
+    position = 0
+    # Stop once what is left fits in a chunk plus the search window, so the last chunk is not tiny
+    while len(energy) - position > chunk_frames + search_frames:
+        target = position + chunk_frames
+        low, high = max(target - search_frames, position + 1), min(target + search_frames, len(energy) - 1)
+        runs = [(start + low, end + low) for start, end in _silent_runs(silent[low:high])
+                if end - start >= min_silence_frames]
+        if runs:
+            start, end = max(runs, key=lambda r: (r[1] - r[0], -abs((r[0] + r[1]) // 2 - target)))
+            split = (start + end) // 2
+        else:
+            split = low + int(np.argmin(energy[low:high]))
+        splits.append(int(split) * frame)
+        position = split
+    return splits
+
+
+def find_pause(audio, sample_rate=SAMPLE_RATE, min_silence_seconds=0.3, silence_db=35.0):
+    """Sample offset of the middle of the last pause in `audio`; without one, of its quietest frame."""
+    energy = frame_energy_db(audio, sample_rate)
+    if not len(energy):
+        return None
+    frame = int(sample_rate * FRAME_SECONDS)
+    silent = energy < np.percentile(energy, 95) - silence_db
+    min_silence_frames = max(int(min_silence_seconds / FRAME_SECONDS), 1)
+    runs = [(start, end) for start, end in _silent_runs(silent) if end - start >= min_silence_frames]
+    if runs:
+        start, end = runs[-1]
+        return int((start + end) // 2) * frame
+    return int(np.argmin(energy)) * frame
+
+
+def plan_chunks(audio, sample_rate=SAMPLE_RATE, chunk_seconds=60.0, overlap_seconds=1.0, **split_options):
+    """Split long audio into chunks that overlap by `overlap_seconds` on each side.
+
+    Returns (start, end, own_start, own_end) sample offsets per chunk. [start, end) is what
+    gets transcribed; [own_start, own_end) is the part of the timeline the chunk is
+    responsible for when the results are stitched back together.
+    """
+    bounds = [0, *find_split_points(audio, sample_rate, chunk_seconds, **split_options), len(audio)]
+    overlap = int(overlap_seconds * sample_rate)
+    return [
+        (max(own_start - overlap, 0), min(own_end + overlap, len(audio)), own_start, own_end)
+        for own_start, own_end in zip(bounds, bounds[1:])
+    ]
+
+
+def _normalize(word):
+    return _NORMALIZE.sub("", word.lower())
+
+
+def _shift(segment, offset):
+    return {
+        **segment,
+        "start": round(segment["start"] + offset, 3),
+        "end": round(segment["end"] + offset, 3),
+        "words": [{**w, "start": round(w["start"] + offset, 3), "end": round(w["end"] + offset, 3)}
+                  for w in segment.get("words", [])],
+    }
+
+
+def _keep_owned(segment, low, high):
+    """The part of a segment whose words (or, without word timings, whose midpoint) fall in [low, high)."""
+    words = segment["words"]
+    if not words:
+        return segment if low <= (segment["start"] + segment["end"]) / 2 < high else None
+    kept = [w for w in words if low <= (w["start"] + w["end"]) / 2 < high]
+    if not kept:
+        return None
+    if len(kept) == len(words):
+        return segment
+    return {**segment, "start": kept[0]["start"], "end": kept[-1]["end"],
+            "text": "".join(w["word"] for w in kept), "words": kept}
+
+
+def _drop_repeated_head(previous_words, segments, max_words=4, tolerance_seconds=0.3):
+    """Remove words at the start of a chunk that repeat the end of the previous chunk.
+
+    Midpoint ownership already settles most of the overlap; this catches a word that the
+    two chunks timed slightly differently on either side of the cut. Only words heard at
+    the same moment count as repeats, so a speaker actually repeating a word is kept.
+    """
+    head = [w for segment in segments for w in segment["words"]]
+    repeated = 0
+    for k in range(min(max_words, len(previous_words), len(head)), 0, -1):
+        tail = previous_words[-k:]
+        if ([_normalize(w["word"]) for w in tail] == [_normalize(w["word"]) for w in head[:k]]
+                and abs(head[0]["start"] - tail[0]["start"]) < tolerance_seconds):
+            repeated = k
+            break
+    if not repeated:
+        return segments
+    drop = {id(w) for w in head[:repeated]}
+    trimmed = []
+    for segment in segments:
+        words = [w for w in segment["words"] if id(w) not in drop]
+        if len(words) == len(segment["words"]):
+            trimmed.append(segment)
+        elif words:
+            trimmed.append({**segment, "start": words[0]["start"], "text": "".join(w["word"] for w in words),
+                            "words": words})
+    return trimmed
+
+
+def stitch(results, chunks, sample_rate=SAMPLE_RATE):
+    """Merge per-chunk {"text", "segments"} results into one result on the original timeline."""
+    segments = []
+    for result, (start, _, own_start, own_end) in zip(results, chunks):
+        offset = start / sample_rate
+        low, high = own_start / sample_rate, own_end / sample_rate
+        owned = [s for s in (_keep_owned(_shift(segment, offset), low, high) for segment in result["segments"]) if s]
+        previous_words = [w for segment in segments[-3:] for w in segment["words"]]
+        if previous_words:
+            owned = _drop_repeated_head(previous_words, owned)
+        segments.extend(owned)
+    return {"text": "".join(segment["text"] for segment in segments), "segments": segments}
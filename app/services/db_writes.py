@@ -0,0 +1,91 @@
+import logging
+import time
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+from app.services.metrics import span
+
+logger = logging.getLogger(__name__)
+
+SCORE_COLUMNS = ("semantic_similarity_score", "broad_topic_sim_score", "grammar_score", "disfluency_score")
+
+
+class EvaluationBatchWriter:
+    """Collects an interview's ASR keys and scores and writes them in one transaction.
+
+    On PostgreSQL each kind of update is a single `UPDATE ... FROM (VALUES ...)` keyed on
+    evaluation_id; other dialects fall back to one executemany per kind.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.asr_keys = {}
+        self.scores = {}
+
+    def add_asr_key(self, evaluation_id, asrfile_s3key, video_etag=None):
+        """Queue a transcript key together with the ETag of the video it was made from."""
+        self.asr_keys[evaluation_id] = (asrfile_s3key, video_etag)
+
+    def add_scores(self, evaluation_id, scores):
+        self.scores[evaluation_id] = tuple(scores)
+
+    def __len__(self):
+        return len(self.asr_keys) + len(self.scores)
+
+    def _is_postgres(self):
+        return self.db.get_bind().dialect.name == "postgresql"
+
+    def _update_from_values(self, columns, casts, rows):
+        """One UPDATE joining evaluation against an inline VALUES list."""
+        params = {}
+        values = []
+        for i, (evaluation_id, row) in enumerate(rows.items()):
+            params[f"id_{i}"] = evaluation_id
+            placeholders = [f"CAST(:id_{i} AS BIGINT)"]
+            for column, cast, value in zip(columns, casts, row):
+                params[f"{column}_{i}"] = value
+                placeholders.append(f"CAST(:{column}_{i} AS {cast})")
+            values.append(f"({', '.join(placeholders)})")
+
+        assignments = ", ".join(f'"{column}" = v."{column}"' for column in columns)
+        query = f"""
+        UPDATE public.evaluation AS e
+        SET {assignments}, "updated_at" = now()
+        FROM (VALUES {', '.join(values)}) AS v(evaluation_id, {', '.join(columns)})
+        WHERE e.evaluation_id = v.evaluation_id;
+        """
+        return self.db.execute(text(query), params).rowcount
+
+    def _executemany(self, columns, rows):
+        assignments = ", ".join(f"{column} = :{column}" for column in columns)
+        query = f"UPDATE evaluation SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE evaluation_id = :evaluation_id"
+        params = [
+            {"evaluation_id": evaluation_id, **dict(zip(columns, row))}
+            for evaluation_id, row in rows.items()
+        ]
+        return self.db.execute(text(query), params).rowcount
+
+    def _apply(self, columns, casts, rows):
+        if not rows:
+            return 0
+        if self._is_postgres():
+            return self._update_from_values(columns, casts, rows)
+        return self._executemany(columns, rows)
+
+    def flush(self):
+        """Apply every pending write in a single commit; returns the number of rows updated."""
+        if not len(self):
+            return 0
+        started = time.perf_counter()
+        try:
+            with span("db_write", rows=len(self)):
+                updated = self._apply(("asrfile_s3key", "video_etag"), ("TEXT", "TEXT"), self.asr_keys)
+                updated += self._apply(SCORE_COLUMNS, ("NUMERIC",) * len(SCORE_COLUMNS), self.scores)
+                self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        logger.info(f"Wrote {len(self.asr_keys)} ASR keys and {len(self.scores)} score rows "
+                    f"({updated} rows) in {time.perf_counter() - started:.3f}s")
+        self.asr_keys.clear()
+        self.scores.clear()
+        return updated
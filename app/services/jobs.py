@@ -0,0 +1,319 @@
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from sqlalchemy import or_, and_, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config.settings import JOB_CONFIG
+from app.models.job import ProcessingJob, ProcessingJobCheckpoint
+from app.services.metrics import job_queue_depth, job_wait_seconds
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# Lower values are claimed first
+PRIORITY_CLASSES = {"urgent": 0, "normal": 1, "bulk": 2}
+_PRIORITY_NAMES = {value: name for name, value in PRIORITY_CLASSES.items()}
+
+
+def priority_name(priority):
+    return _PRIORITY_NAMES.get(priority, str(priority))
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _raise_priority(job, priority):
+    # Re-submitting a queued interview as more urgent moves it up; it is never moved down
+    if job.status == "queued" and priority < job.priority:
+        job.priority = priority
+        return True
+    return False
+
+
+def _merge_request(job, priority, force):
+    """Fold a re-submission into a queued job; a running job is left as it is."""
+    changed = _raise_priority(job, priority)
+    if force and job.status == "queued" and not job.force:
+        job.force = True
+        changed = True
+    return changed
+
+
+def submit_job(db: Session, interview_id, priority=PRIORITY_CLASSES["normal"], force=False):
+    """Queue processing for an interview, or return the job already queued or running for it.
+
+    With `force`, the job re-transcribes every video even when its transcript is current.
+    """
+    existing = (
+        db.query(ProcessingJob)
+        .filter(ProcessingJob.interview_id == interview_id, ProcessingJob.status.in_(ACTIVE_STATUSES))
+        .first()
+    )
+    if existing:
+        if _merge_request(existing, priority, force):
+            db.commit()
+        return existing, False
+
+    job = ProcessingJob(interview_id=interview_id, status="queued", attempts=0, priority=priority, force=force,
+                        created_at=datetime.utcnow())
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another request queued the same interview first (unique active-job index)
+        db.rollback()
+        return submit_job(db, interview_id, priority, force)
+    db.refresh(job)
+    return job, True
+
+
+def submit_jobs(db: Session, interview_ids, priority=PRIORITY_CLASSES["normal"], force=False):
+    """Queue many interviews in one transaction; returns {interview_id: (job, created)}."""
+    interview_ids = list(dict.fromkeys(interview_ids))
+    existing = {
+        job.interview_id: job
+        for job in db.query(ProcessingJob).filter(
+            ProcessingJob.interview_id.in_(interview_ids), ProcessingJob.status.in_(ACTIVE_STATUSES)
+        )
+    }
+    for job in existing.values():
+        _merge_request(job, priority, force)
+
+    now = datetime.utcnow()
+    created = {
+        interview_id: ProcessingJob(interview_id=interview_id, status="queued", attempts=0, priority=priority,
+                                    force=force, created_at=now)
+        for interview_id in interview_ids if interview_id not in existing
+    }
+    db.add_all(created.values())
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent submission queued one of them first; fall back to one transaction per interview
+        db.rollback()
+        return {interview_id: submit_job(db, interview_id, priority, force) for interview_id in interview_ids}
+    return {
+        interview_id: (created[interview_id], True) if interview_id in created else (existing[interview_id], False)
+        for interview_id in interview_ids
+    }
+
+
+def get_job(db: Session, job_id):
+    return db.query(ProcessingJob).filter(ProcessingJob.job_id == job_id).first()
+
+
+def claim_job(db: Session, worker_id):
+    """Atomically take the most urgent, then oldest, runnable job.
+
+    Queued jobs and running jobs whose worker stopped heartbeating are both runnable;
+    a stale job that has used every attempt is marked failed instead.
+    FOR UPDATE SKIP LOCKED lets many workers on many nodes poll the same table
+    without blocking on, or double-claiming, each other's rows. The claim itself is a
+    compare-and-set on the attempt count, so databases without row locks (SQLite in
+    tests and benchmarks) cannot hand one job to two workers either.
+    """
+    stale_before = datetime.utcnow() - timedelta(seconds=JOB_CONFIG["JOB_STALE_SECONDS"])
+    max_attempts = JOB_CONFIG["JOB_MAX_ATTEMPTS"]
+    # A job whose worker died on every attempt (OOM, segfault) never reaches fail_job; fail it here
+    exhausted = (
+        db.query(ProcessingJob)
+        .filter(ProcessingJob.status == "running", ProcessingJob.heartbeat_at < stale_before,
+                ProcessingJob.attempts >= max_attempts)
+        .update({
+            "status": "failed",
+            "finished_at": datetime.utcnow(),
+            "error": f"Worker stopped heartbeating on each of {max_attempts} attempts",
+        }, synchronize_session=False)
+    )
+    if exhausted:
+        db.commit()
+        logger.warning(f"Failed {exhausted} job(s) whose worker died on every attempt")
+
+    job = (
+        db.query(ProcessingJob)
+        .filter(or_(
+            ProcessingJob.status == "queued",
+            and_(ProcessingJob.status == "running", ProcessingJob.heartbeat_at < stale_before,
+                 ProcessingJob.attempts < max_attempts),
+        ))
+        .order_by(ProcessingJob.priority, ProcessingJob.created_at)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if job is None:
+        db.rollback()
+        return None
+
+    now = datetime.utcnow()
+    claimed = (
+        db.query(ProcessingJob)
+        .filter(ProcessingJob.job_id == job.job_id, ProcessingJob.status == job.status,
+                ProcessingJob.attempts == job.attempts)
+        .update({
+            "status": "running",
+            "worker_id": worker_id,
+            "attempts": job.attempts + 1,
+            "started_at": now,
+            "heartbeat_at": now,
+            "error": None,
+        }, synchronize_session=False)
+    )
+    if not claimed:
+        # Another worker got there first
+        db.rollback()
+        return None
+    db.commit()
+    db.refresh(job)
+    if job.attempts == 1 and job.created_at:
+        job_wait_seconds.observe((now - job.created_at).total_seconds(), priority=priority_name(job.priority))
+    return job
+
+
+def heartbeat(db: Session, job_id):
+    db.query(ProcessingJob).filter(ProcessingJob.job_id == job_id).update({"heartbeat_at": datetime.utcnow()})
+    db.commit()
+
+
+def complete_job(db: Session, job_id):
+    db.query(ProcessingJob).filter(ProcessingJob.job_id == job_id).update(
+        {"status": "completed", "finished_at": datetime.utcnow()}
+    )
+    db.commit()
+
+
+def fail_job(db: Session, job_id, error):
+    """Put the job back in the queue, or mark it failed once it has used every attempt."""
+    db.rollback()
+    job = get_job(db, job_id)
+    if job is None:
+        return
+    job.error = error[-2000:]
+    if job.attempts >= JOB_CONFIG["JOB_MAX_ATTEMPTS"]:
+        job.status = "failed"
+        job.finished_at = datetime.utcnow()
+    else:
+        job.status = "queued"
+    db.commit()
+
+
+def record_checkpoint(db: Session, job_id, evaluation_id, asrfile_s3key, video_etag=None):
+    """Mark one evaluation as done for a job, so a restarted job skips it."""
+    db.merge(ProcessingJobCheckpoint(
+        job_id=job_id, evaluation_id=evaluation_id, asrfile_s3key=asrfile_s3key, video_etag=video_etag,
+        created_at=datetime.utcnow(),
+    ))
+    db.query(ProcessingJob).filter(ProcessingJob.job_id == job_id).update({"heartbeat_at": datetime.utcnow()})
+    db.commit()
+
+
+def queue_stats(db: Session, window_seconds=3600):
+    """Active jobs per status and priority class, the oldest queued job, and waits of recently started jobs."""
+    now = datetime.utcnow()
+    depth = {}
+    oldest_queued = None
+    rows = (
+        db.query(ProcessingJob.status, ProcessingJob.priority, func.count(), func.min(ProcessingJob.created_at))
+        .filter(ProcessingJob.status.in_(ACTIVE_STATUSES))
+        .group_by(ProcessingJob.status, ProcessingJob.priority)
+        .all()
+    )
+    for status in ACTIVE_STATUSES:
+        for name in PRIORITY_CLASSES:
+            job_queue_depth.set(0, status=status, priority=name)
+    for status, priority, count, created_at in rows:
+        depth.setdefault(status, {})[priority_name(priority)] = count
+        job_queue_depth.set(count, status=status, priority=priority_name(priority))
+        if status == "queued" and created_at and (oldest_queued is None or created_at < oldest_queued):
+            oldest_queued = created_at
+
+    waits = {}
+    started = (
+        db.query(ProcessingJob.priority, ProcessingJob.created_at, ProcessingJob.started_at)
+        .filter(ProcessingJob.started_at >= now - timedelta(seconds=window_seconds), ProcessingJob.attempts == 1)
+        .all()
+    )
+    for priority, created_at, started_at in started:
+        if created_at:
+            waits.setdefault(priority_name(priority), []).append((started_at - created_at).total_seconds())
+    return {
+        "depth": depth,
+        "oldest_queued_seconds": round((now - oldest_queued).total_seconds(), 3) if oldest_queued else 0.0,
+        "wait_seconds": {
+            name: {
+                "started": len(values),
+                "mean": round(sum(values) / len(values), 3),
+                "p90": round(sorted(values)[int(0.9 * (len(values) - 1))], 3),
+                "max": round(max(values), 3),
+            }
+            for name, values in waits.items()
+        },
+        "window_seconds": window_seconds,
+    }
+
+
+def get_checkpoints(db: Session, job_id, with_etags=False):
+    """{evaluation_id: asrfile_s3key} for every evaluation the job already finished.
+
+    With `with_etags`, values are (asrfile_s3key, video_etag) pairs.
+    """
+    rows = db.query(ProcessingJobCheckpoint).filter(ProcessingJobCheckpoint.job_id == job_id).all()
+    if with_etags:
+        return {row.evaluation_id: (row.asrfile_s3key, row.video_etag) for row in rows}
+    return {row.evaluation_id: row.asrfile_s3key for row in rows}
+
+
+async def run_job_worker(session_factory, process, worker_id=None, stop_event=None):
+    """Claim and run jobs until `stop_event` is set.
+
+    `process(interview_id, db, job_id)` does the actual work. A side task refreshes the
+    job's heartbeat so other workers do not mistake a long job for a crashed one.
+    """
+    worker_id = worker_id or default_worker_id()
+    stop_event = stop_event or asyncio.Event()
+    logger.info(f"Job worker {worker_id} started")
+
+    while not stop_event.is_set():
+        db = session_factory()
+        try:
+            job = await asyncio.to_thread(claim_job, db, worker_id)
+            if job is None:
+                try:
+                    await asyncio.wait_for(stop_event.wait(), JOB_CONFIG["JOB_POLL_SECONDS"])
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_id, interview_id = job.job_id, job.interview_id
+            logger.info(f"Worker {worker_id} claimed job {job_id} for interview {interview_id} (attempt {job.attempts})")
+            beat = asyncio.create_task(_heartbeat_loop(session_factory, job_id))
+            try:
+                await process(interview_id, db, job_id)
+                await asyncio.to_thread(complete_job, db, job_id)
+                logger.info(f"Job {job_id} completed")
+            except Exception as e:
+                logger.exception(f"Job {job_id} failed: {e}")
+                await asyncio.to_thread(fail_job, db, job_id, f"{type(e).__name__}: {e}")
+            finally:
+                beat.cancel()
+        except Exception as e:
+            logger.exception(f"Job worker {worker_id} error: {e}")
+            await asyncio.sleep(JOB_CONFIG["JOB_POLL_SECONDS"])
+        finally:
+            db.close()
+
+
+async def _heartbeat_loop(session_factory, job_id):
+    while True:
+        await asyncio.sleep(JOB_CONFIG["JOB_HEARTBEAT_SECONDS"])
+        db = session_factory()
+        try:
+            await asyncio.to_thread(heartbeat, db, job_id)
+        except Exception as e:
+            logger.warning(f"Heartbeat for job {job_id} failed: {e}")
+        finally:
+            db.close()
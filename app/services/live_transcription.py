@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import time
+import numpy as np
+from app.config.settings import LIVE_TRANSCRIPTION_CONFIG
+from app.services.audio import SAMPLE_RATE
+from app.services.chunking import find_pause, stitch
+from app.services.metrics import live_partial_transcripts, live_transcript_seconds
+from app.services.transcription_engine import TranscriptionEngineBusy, transcribe_audio
+
+logger = logging.getLogger(__name__)
+
+
+class LiveTranscription:
+    """Transcribes one answer while it is still being recorded.
+
+    Decoded audio accumulates after a committed point. Every `step_seconds` of new
+    audio, the uncommitted part (plus `overlap_seconds` of context) is transcribed again
+    and `on_partial(message)` is awaited with the text so far. Once the uncommitted part
+    would outgrow `window_seconds`, everything up to the last pause before the newest
+    `commit_lag_seconds` is committed and never transcribed again. When the answer ends
+    only the uncommitted tail is left to transcribe, which is what makes the final
+    transcript arrive seconds rather than minutes after the candidate stops talking.
+
+    Committed windows are merged with the same midpoint ownership as long-audio chunks.
+    """
+
+    def __init__(self, engine, decoder, on_partial=None, window_seconds=30.0, step_seconds=2.0,
+                 commit_lag_seconds=2.0, overlap_seconds=1.0, sample_rate=SAMPLE_RATE):
+        self.engine = engine
+        self.decoder = decoder
+        self.on_partial = on_partial
+        self.sample_rate = sample_rate
+        self.window = int(window_seconds * sample_rate)
+        self.step = max(int(step_seconds * sample_rate), 1)
+        self.commit_lag = int(commit_lag_seconds * sample_rate)
+        self.overlap = int(overlap_seconds * sample_rate)
+        self._audio = np.zeros(0, np.float32)
+        self._new = []
+        self._base = 0  # absolute sample offset of self._audio[0]
+        self._length = 0
+        self._committed = 0
+        self._window_end = 0
+        self._pieces = []
+        self._task = None
+        self.partials = 0
+        self.skipped = 0
+
+    @classmethod
+    def from_settings(cls, engine, decoder, on_partial=None):
+        return cls(
+            engine, decoder, on_partial,
+            window_seconds=LIVE_TRANSCRIPTION_CONFIG["LIVE_WINDOW_SECONDS"],
+            step_seconds=LIVE_TRANSCRIPTION_CONFIG["LIVE_STEP_SECONDS"],
+            commit_lag_seconds=LIVE_TRANSCRIPTION_CONFIG["LIVE_COMMIT_LAG_SECONDS"],
+            overlap_seconds=LIVE_TRANSCRIPTION_CONFIG["LIVE_OVERLAP_SECONDS"],
+        )
+
+    @property
+    def audio_seconds(self):
+        return self._length / self.sample_rate
+
+    @property
+    def committed_seconds(self):
+        return self._committed / self.sample_rate
+
+    def _between(self, start, end):
+        if self._new:
+            self._audio = np.concatenate([self._audio, *self._new])
+            self._new = []
+        return self._audio[start - self._base:end - self._base]
+
+    def _add(self, samples):
+        if len(samples):
+            self._new.append(samples)
+            self._length += len(samples)
+
+    async def feed(self, data):
+        """Decode one frame of the recording, and start a window transcription when enough audio is new."""
+        self._add(await self.decoder.feed(data))
+        if self._task is None and self._length - self._window_end >= self.step:
+            self._task = asyncio.create_task(self._run_window())
+
+    async def _run_window(self):
+        try:
+            message = await self.transcribe_window()
+            if message is not None and self.on_partial is not None:
+                await self.on_partial(message)
+        except Exception as e:
+            # A failed partial only delays the text; the final transcript is made from the audio regardless
+            logger.warning(f"Live window transcription failed: {e}")
+        finally:
+            self._task = None
+
+    async def transcribe_window(self):
+        """Transcribe the uncommitted audio and commit up to a pause once it grows too long for one window."""
+        start, end = max(self._committed - self.overlap, 0), self._length
+        audio = self._between(start, end)
+        self._window_end = end
+        try:
+            # Partials are best effort: a busy engine skips one rather than queueing behind batch jobs
+            result = await self.engine.run(transcribe_audio, audio, self.engine.model_size, wait=False)
+        except TranscriptionEngineBusy:
+            self.skipped += 1
+            live_partial_transcripts.inc(outcome="skipped")
+            return None
+        self.partials += 1
+        live_partial_transcripts.inc(outcome="sent")
+        text = stitch([*(r for r, _ in self._pieces), result],
+                      [*(c for _, c in self._pieces), (start, end, self._committed, end)], self.sample_rate)["text"]
+
+        if end - self._committed >= self.window - self.step:
+            # Cut in the last pause of the settled part, so no word is split between two windows
+            settled = audio[self._committed - start:end - self.commit_lag - start]
+            pause = find_pause(settled, self.sample_rate)
+            if pause is not None:
+                # A pause right at the committed point would commit nothing; cut at the end of the
+                # settled audio instead, so the window cannot keep growing
+                cut = self._committed + (pause or len(settled))
+                self._pieces.append((result, (start, end, self._committed, cut)))
+                self._committed = cut
+                keep_from = max(cut - self.overlap, 0)
+                self._between(keep_from, keep_from)  # fold in pending frames before trimming
+                self._audio = self._audio[keep_from - self._base:]
+                self._base = keep_from
+
+        return {
+            "type": "partial",
+            "text": text,
+            "stable_text": self._stitched()["text"],
+            "audio_seconds": round(end / self.sample_rate, 3),
+        }
+
+    def _stitched(self, tail=()):
+        pieces = [*self._pieces, *tail]
+        return stitch([r for r, _ in pieces], [c for _, c in pieces], self.sample_rate)
+
+    async def finish(self):
+        """The answer ended: flush the decoder, transcribe the uncommitted tail and return the whole transcript."""
+        ended = time.perf_counter()
+        self._add(await self.decoder.close())
+        if self._task is not None:
+            await self._task
+        start, end = max(self._committed - self.overlap, 0), self._length
+        tail = []
+        if end > self._committed:
+            # The final text waits its turn on a busy engine instead of being skipped
+            result = await self.engine.transcribe_audio(self._between(start, end))
+            tail = [(result, (start, end, self._committed, end))]
+        transcript = self._stitched(tail)
+        seconds = time.perf_counter() - ended
+        live_transcript_seconds.observe(seconds)
+        logger.info(f"Live answer of {self.audio_seconds:.1f}s transcribed {seconds:.2f}s after it ended "
+                    f"({self.partials} partials, {self.skipped} skipped, {len(self._pieces)} committed windows)")
+        return {**transcript, "audio_seconds": round(self.audio_seconds, 3), "latency_seconds": round(seconds, 3)}
+
+    async def abort(self):
+        """Drop an answer that will not be finished (client disconnected or started another answer)."""
+        if self._task is not None:
+            self._task.cancel()
+        self.decoder.kill()
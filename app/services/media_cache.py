@@ -0,0 +1,196 @@
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+import numpy as np
+from app.config.settings import MEDIA_CACHE_CONFIG
+from app.services.metrics import media_cache_bytes, media_cache_bytes_saved, media_cache_evictions, media_cache_requests
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+# Temp files this old were left by a writer that died
+STALE_TEMP_SECONDS = 3600
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def _link_or_copy(source, destination):
+    # A hard link shares the file without copying it; other filesystems fall back to a copy
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class MediaCache:
+    """Videos and decoded audio on local disk, keyed by content (the S3 ETag), under a byte budget.
+
+    Entries are written to a temp file and renamed into place, so concurrent workers and
+    processes only ever see whole files; two workers caching the same object both write
+    it and the last rename wins. Readers get a hard link to the entry rather than its
+    path, so an entry evicted while a video is being decoded stays readable until the
+    reader deletes its link. Recency is the file's mtime, refreshed on every hit, which
+    every process sharing the directory sees; eviction removes the oldest entries until
+    the cache is back under `max_bytes`.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._requests = Counter()
+        self._bytes_saved = Counter()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(MEDIA_CACHE_CONFIG["MEDIA_CACHE_DIR"], MEDIA_CACHE_CONFIG["MEDIA_CACHE_MAX_MB"] * MB)
+
+    def _path(self, kind, key):
+        return self.directory / kind / _UNSAFE.sub("_", key)
+
+    def _temp_path(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+
+    def _hit(self, kind, path, size):
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted since it was opened; the caller's copy is still whole
+        self._requests[(kind, "hit")] += 1
+        self._bytes_saved[kind] += size
+        media_cache_requests.inc(kind=kind, result="hit")
+        media_cache_bytes_saved.inc(size, kind=kind)
+
+    def _miss(self, kind):
+        self._requests[(kind, "miss")] += 1
+        media_cache_requests.inc(kind=kind, result="miss")
+
+    def has(self, kind, key):
+        """Whether an entry exists; an absent one counts as a miss, a present one as a hit once it is read."""
+        if self._path(kind, key).exists():
+            return True
+        self._miss(kind)
+        return False
+
+    def fetch(self, kind, key, destination):
+        """Make `destination` a copy of a cached entry; False on a miss."""
+        path = self._path(kind, key)
+        _remove(destination)
+        try:
+            _link_or_copy(path, destination)
+        except FileNotFoundError:
+            self._miss(kind)
+            return False
+        self._hit(kind, path, os.path.getsize(destination))
+        return True
+
+    def store(self, kind, key, source):
+        """Add a local file to the cache; False when it alone is over the budget."""
+        if os.path.getsize(source) > self.max_bytes:
+            return False
+        path = self._path(kind, key)
+        try:
+            temp = self._temp_path(path)
+            try:
+                _link_or_copy(source, temp)
+                os.replace(temp, path)
+            finally:
+                _remove(temp)
+        except OSError as e:
+            # Caching is best effort; a full disk must not fail the job
+            logger.warning(f"Could not cache {kind} {key}: {e}")
+            return False
+        self.evict()
+        return True
+
+    def load_audio(self, key):
+        """Decoded 16 kHz float32 audio, or None on a miss."""
+        path = self._path("audio", key)
+        try:
+            pcm = np.fromfile(path, dtype=np.int16)
+        except FileNotFoundError:
+            self._miss("audio")
+            return None
+        self._hit("audio", path, pcm.nbytes)
+        return pcm.astype(np.float32) / 32768.0
+
+    def store_audio(self, key, audio):
+        """Keep decoded audio as the 16-bit PCM it was decoded from, which loses nothing at half the size."""
+        pcm = np.clip(np.round(audio * 32768.0), -32768, 32767).astype(np.int16)
+        if pcm.nbytes > self.max_bytes:
+            return False
+        path = self._path("audio", key)
+        try:
+            temp = self._temp_path(path)
+            try:
+                pcm.tofile(temp)
+                os.replace(temp, path)
+            finally:
+                _remove(temp)
+        except OSError as e:
+            logger.warning(f"Could not cache audio {key}: {e}")
+            return False
+        self.evict()
+        return True
+
+    def _entries(self):
+        entries = []
+        now = time.time()
+        if not self.directory.exists():
+            return entries
+        for kind in self.directory.iterdir():
+            if not kind.is_dir():
+                continue
+            for entry in os.scandir(kind):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.startswith("."):
+                    if entry.name.endswith(".tmp") and now - stat.st_mtime > STALE_TEMP_SECONDS:
+                        _remove(entry.path)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits its budget; returns the bytes freed."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in sorted(entries):
+            if total - freed <= self.max_bytes:
+                break
+            _remove(path)
+            freed += size
+            media_cache_evictions.inc()
+        media_cache_bytes.set(total - freed)
+        if freed:
+            logger.info(f"Evicted {freed / MB:.1f} MB from the media cache")
+        return freed
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": {kind: count for (kind, result), count in self._requests.items() if result == "hit"},
+            "misses": {kind: count for (kind, result), count in self._requests.items() if result == "miss"},
+            "bytes_saved": dict(self._bytes_saved),
+        }
+
+
+# Process-wide cache; None when disabled
+media_cache = MediaCache.from_settings() if MEDIA_CACHE_CONFIG["MEDIA_CACHE_ENABLED"] else None
@@ -0,0 +1,264 @@
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+from sqlalchemy import Column, Float, LargeBinary, MetaData, String, Table, create_engine, delete, insert, select
+from app.config.settings import METADATA_CACHE_CONFIG
+
+metadata = MetaData()
+
+metadata_cache_table = Table(
+    "metadata_cache",
+    metadata,
+    Column("cache_key", String(64), primary_key=True),
+    Column("payload", LargeBinary, nullable=False),
+    Column("expires_at", Float, nullable=False, index=True),
+)
+
+
+class CachedRow(SimpleNamespace):
+    """Detached, read-only copy of a model row; attribute access like the ORM object."""
+
+
+def _snapshot(instance):
+    return CachedRow(**{column.key: getattr(instance, column.key) for column in instance.__table__.columns})
+
+
+def _key(kind, ident):
+    return f"{kind}:{ident}"
+
+
+class LocalTTLCache:
+    """In-process LRU with a per-entry TTL."""
+
+    def __init__(self, max_entries, ttl_seconds):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SharedCacheStore:
+    """Cache entries in a SQL table so worker processes on one host reuse each other's reads."""
+
+    def __init__(self, engine, ttl_seconds):
+        self.engine = engine
+        self.ttl_seconds = ttl_seconds
+        metadata.create_all(engine)
+
+    def get_many(self, keys):
+        if not keys:
+            return {}
+        with self.engine.begin() as conn:
+            rows = conn.execute(
+                select(metadata_cache_table.c.cache_key, metadata_cache_table.c.payload)
+                .where(metadata_cache_table.c.cache_key.in_(keys))
+                .where(metadata_cache_table.c.expires_at >= time.time())
+            ).all()
+        return {row.cache_key: pickle.loads(row.payload) for row in rows}
+
+    def set_many(self, items):
+        if not items:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        with self.engine.begin() as conn:
+            conn.execute(delete(metadata_cache_table).where(metadata_cache_table.c.cache_key.in_(list(items))))
+            conn.execute(insert(metadata_cache_table), [
+                {"cache_key": key, "payload": pickle.dumps(value), "expires_at": expires_at}
+                for key, value in items.items()
+            ])
+
+    def delete_many(self, keys=None):
+        with self.engine.begin() as conn:
+            statement = delete(metadata_cache_table)
+            if keys is not None:
+                statement = statement.where(metadata_cache_table.c.cache_key.in_(keys))
+            conn.execute(statement)
+
+
+class MetadataCache:
+    """Read-through cache for Interview, Questions and Answers rows.
+
+    Lookups go local cache -> shared store (if configured) -> database, and every
+    miss is loaded in a single query however many ids are requested. Rows are
+    returned as CachedRow snapshots, so they are safe to use after the session closes.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=600, shared=None):
+        self.local = LocalTTLCache(max_entries, ttl_seconds)
+        self.shared = shared
+        self.stats_by_kind = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        shared = None
+        if METADATA_CACHE_CONFIG["METADATA_CACHE_SHARED_BACKEND"] == "sqlite":
+            path = METADATA_CACHE_CONFIG["METADATA_CACHE_SHARED_PATH"]
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shared = SharedCacheStore(create_engine(f"sqlite:///{path}"), METADATA_CACHE_CONFIG["METADATA_CACHE_TTL_SECONDS"])
+        return cls(
+            max_entries=METADATA_CACHE_CONFIG["METADATA_CACHE_MAX_ENTRIES"],
+            ttl_seconds=METADATA_CACHE_CONFIG["METADATA_CACHE_TTL_SECONDS"],
+            shared=shared,
+        )
+
+    def _count(self, kind, field, n=1):
+        with self._lock:
+            counts = self.stats_by_kind.setdefault(kind, {"hits": 0, "shared_hits": 0, "misses": 0})
+            counts[field] += n
+
+    def _read_through(self, kind, ids, load):
+        """Return {id: value} for `ids`, calling load(missing_ids) -> {id: value} once for the rest."""
+        found, missing = {}, []
+        for ident in dict.fromkeys(ids):
+            entry = self.local.get(_key(kind, ident))
+            if entry is not None:
+                found[ident] = entry[0]
+            else:
+                missing.append(ident)
+        self._count(kind, "hits", len(found))
+
+        if missing and self.shared is not None:
+            shared = self.shared.get_many([_key(kind, ident) for ident in missing])
+            for ident in list(missing):
+                key = _key(kind, ident)
+                if key in shared:
+                    found[ident] = shared[key]
+                    self.local.set(key, shared[key])
+                    missing.remove(ident)
+            self._count(kind, "shared_hits", len(shared))
+
+        if missing:
+            self._count(kind, "misses", len(missing))
+            loaded = load(missing)
+            for ident, value in loaded.items():
+                self.local.set(_key(kind, ident), value)
+            if self.shared is not None:
+                self.shared.set_many({_key(kind, ident): value for ident, value in loaded.items()})
+            found.update(loaded)
+        return found
+
+    def get_interview(self, db, interview_id):
+        return self.get_interviews(db, [interview_id]).get(interview_id)
+
+    def get_interviews(self, db, interview_ids):
+        from app.models.interview import Interview
+
+        def load(ids):
+            return {row.interview_id: _snapshot(row)
+                    for row in db.query(Interview).filter(Interview.interview_id.in_(ids))}
+        return self._read_through("interview", interview_ids, load)
+
+    def get_questions(self, db, question_ids):
+        from app.models.questions import Questions
+
+        def load(ids):
+            return {row.question_id: _snapshot(row)
+                    for row in db.query(Questions).filter(Questions.question_id.in_(ids))}
+        return self._read_through("question", question_ids, load)
+
+    def get_answers(self, db, question_ids):
+        """Reference answers per question id; questions without answers map to an empty list."""
+        from app.models.answers import Answers
+
+        def load(ids):
+            answers = {ident: [] for ident in ids}
+            for row in db.query(Answers).filter(Answers.question_id.in_(ids)):
+                answers[row.question_id].append(_snapshot(row))
+            return answers
+        return self._read_through("answers", question_ids, load)
+
+    def prefetch_interview(self, db, interview_id):
+        """Warm every question of an interview and its reference answers.
+
+        Uncached questions are fetched in one query and uncached answers in one more.
+        Returns {question_id: {"question": CachedRow, "answers": [CachedRow]}}.
+        """
+        from app.models.evaluation import Evaluation
+
+        question_ids = [qid for (qid,) in db.query(Evaluation.question_id).filter(
+            Evaluation.interview_id == interview_id).distinct() if qid is not None]
+        questions = self.get_questions(db, question_ids)
+        answers = self.get_answers(db, question_ids)
+        return {qid: {"question": questions.get(qid), "answers": answers.get(qid, [])} for qid in question_ids}
+
+    def invalidate(self, kind=None, ident=None):
+        """Drop one entry, e.g. invalidate("question", 12), or everything when called without arguments."""
+        if kind is None:
+            self.local.clear()
+            if self.shared is not None:
+                self.shared.delete_many()
+            return
+        self.local.delete(_key(kind, ident))
+        if self.shared is not None:
+            self.shared.delete_many([_key(kind, ident)])
+
+    def stats(self):
+        with self._lock:
+            by_kind = {kind: dict(counts) for kind, counts in self.stats_by_kind.items()}
+        for counts in by_kind.values():
+            lookups = counts["hits"] + counts["shared_hits"] + counts["misses"]
+            counts["hit_rate"] = round((counts["hits"] + counts["shared_hits"]) / lookups, 3) if lookups else 0.0
+        return {
+            "entries": len(self.local),
+            "evictions": self.local.evictions,
+            "expirations": self.local.expirations,
+            "shared": self.shared is not None,
+            "by_kind": by_kind,
+        }
+
+
+metadata_cache = MetadataCache.from_settings()
+
+
+def get_interview(db, interview_id):
+    """Interview row by id through the cache, or straight from the database when caching is disabled."""
+    if not METADATA_CACHE_CONFIG["METADATA_CACHE_ENABLED"]:
+        from app.models.interview import Interview
+        return db.query(Interview).filter(Interview.interview_id == interview_id).first()
+    return metadata_cache.get_interview(db, interview_id)
+
+
+def get_interviews(db, interview_ids):
+    """{interview_id: row} for the ids that exist, through the cache when it is enabled."""
+    if not METADATA_CACHE_CONFIG["METADATA_CACHE_ENABLED"]:
+        from app.models.interview import Interview
+        return {row.interview_id: row for row in db.query(Interview).filter(Interview.interview_id.in_(interview_ids))}
+    return metadata_cache.get_interviews(db, interview_ids)
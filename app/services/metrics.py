@@ -0,0 +1,265 @@
+import asyncio
+import bisect
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from app.config.settings import METRICS_CONFIG
+
+span_logger = logging.getLogger("app.spans")
+
+# Seconds; covers fast DB writes through long transcriptions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _label_text(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{str(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(self.label_names, key)} {value}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total, observed = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                counts[index] += 1
+            self._values[key] = (counts, total + value, observed + 1)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, observed) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    labels = _label_text(self.label_names + ("le",), key + (bound,))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_bucket{_label_text(self.label_names + ('le',), key + ('+Inf',))} {observed}")
+                lines.append(f"{self.name}_sum{_label_text(self.label_names, key)} {round(total, 6)}")
+                lines.append(f"{self.name}_count{_label_text(self.label_names, key)} {observed}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide metrics rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, help_text, labels=()):
+        return self._add(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()):
+        return self._add(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._add(Histogram(name, help_text, labels, buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collect):
+        """Register a callable that refreshes gauges just before every scrape."""
+        self._collectors.append(collect)
+
+    def render(self):
+        for collect in self._collectors:
+            try:
+                collect()
+            except Exception as e:
+                span_logger.warning("Metrics collector failed: %s", e)
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+span_seconds = registry.histogram("interview_span_seconds", "Duration of timed work by span", ("span",))
+span_in_flight = registry.gauge("interview_span_in_flight", "Timed work currently running by span", ("span",))
+span_failures = registry.counter("interview_span_failures_total", "Timed work that raised, by span", ("span",))
+http_request_seconds = registry.histogram("http_request_seconds", "HTTP request latency", ("method", "route", "status"))
+http_requests_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests being served")
+event_loop_lag_seconds = registry.histogram(
+    "event_loop_lag_seconds", "How late a periodic event-loop timer fired",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+s3_operation_seconds = registry.histogram("s3_operation_seconds", "S3 transfer latency by operation", ("operation",))
+job_queue_depth = registry.gauge("job_queue_depth", "Processing jobs by status and priority class", ("status", "priority"))
+job_wait_seconds = registry.histogram("job_wait_seconds", "Time from submission to first claim", ("priority",))
+scheduler_wait_seconds = registry.histogram(
+    "scheduler_wait_seconds", "Time spent waiting for a decode/transcribe slot", ("priority",)
+)
+scheduler_slots = registry.gauge("scheduler_slots", "Decode/transcribe slots by state", ("state",))
+db_pool_connections = registry.gauge("db_pool_connections", "Database connection pool usage", ("engine", "state"))
+live_transcript_seconds = registry.histogram(
+    "live_transcript_seconds", "Time from the end of a live answer to its final transcript"
+)
+live_partial_transcripts = registry.counter(
+    "live_partial_transcripts_total", "Rolling-window transcriptions of live answers, by outcome", ("outcome",)
+)
+media_cache_requests = registry.counter(
+    "media_cache_requests_total", "Local media cache lookups by kind and result", ("kind", "result")
+)
+media_cache_bytes_saved = registry.counter(
+    "media_cache_bytes_saved_total", "Bytes served from the local media cache instead of S3 or ffmpeg", ("kind",)
+)
+media_cache_bytes = registry.gauge("media_cache_bytes", "Size of the local media cache on disk")
+media_cache_evictions = registry.counter("media_cache_evictions_total", "Entries evicted from the local media cache")
+
+_parent_span = contextvars.ContextVar("parent_span", default=None)
+
+
+@contextmanager
+def span(name, **fields):
+    """Time a block of work: histogram, in-flight gauge and one structured DEBUG log line.
+
+    Works in sync and async code alike; nested spans record their parent.
+    """
+    parent = _parent_span.get()
+    token = _parent_span.set(name)
+    span_in_flight.inc(span=name)
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = type(e).__name__
+        span_failures.inc(span=name)
+        raise
+    finally:
+        seconds = time.perf_counter() - started
+        span_in_flight.dec(span=name)
+        span_seconds.observe(seconds, span=name)
+        _parent_span.reset(token)
+        if span_logger.isEnabledFor(logging.DEBUG):
+            span_logger.debug(json.dumps({"span": name, "parent": parent, "seconds": round(seconds, 6),
+                                          "error": error, **fields}, default=str))
+
+
+def observe_db_pool(engine, name="sync"):
+    """Export pool usage of a SQLAlchemy engine with a QueuePool (pass `async_engine.sync_engine` for async)."""
+    def collect():
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):
+            db_pool_connections.set(pool.size(), engine=name, state="size")
+            db_pool_connections.set(pool.checkedout(), engine=name, state="checked_out")
+            db_pool_connections.set(pool.checkedin(), engine=name, state="checked_in")
+            db_pool_connections.set(max(pool.overflow(), 0), engine=name, state="overflow")
+    registry.add_collector(collect)
+
+
+async def monitor_event_loop(stop_event, interval=None):
+    """Record event-loop lag until `stop_event` is set; long blocking calls show up as lag."""
+    interval = interval or METRICS_CONFIG["LOOP_LAG_INTERVAL_SECONDS"]
+    while not stop_event.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        event_loop_lag_seconds.observe(max(time.perf_counter() - started - interval, 0.0))
+
+
+class RequestProfiler:
+    """Profile one request when asked to, writing the report under PROFILER_DIR.
+
+    Uses pyinstrument (a sampling profiler that follows async tasks) when installed,
+    otherwise cProfile, which also captures anything else the loop runs meanwhile.
+    """
+
+    def __init__(self, label):
+        self.label = label.strip("/").replace("/", "_") or "root"
+        self.path = None
+        self._profiler = None
+
+    def __enter__(self):
+        try:
+            from pyinstrument import Profiler
+            self._profiler = Profiler(async_mode="enabled")
+            self._profiler.start()
+        except ImportError:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        os.makedirs(METRICS_CONFIG["PROFILER_DIR"], exist_ok=True)
+        stem = os.path.join(METRICS_CONFIG["PROFILER_DIR"], f"{time.strftime('%Y%m%d-%H%M%S')}-{self.label}")
+        if hasattr(self._profiler, "output_html"):
+            self._profiler.stop()
+            self.path = stem + ".html"
+            with open(self.path, "w") as f:
+                f.write(self._profiler.output_html())
+        else:
+            self._profiler.disable()
+            self.path = stem + ".prof"
+            self._profiler.dump_stats(self.path)
+        return False
+
+
+def wants_profile(request):
+    """Profiling is opt-in per request (X-Profile: 1 or ?profile=1) and only when enabled."""
+    if not METRICS_CONFIG["PROFILER_ENABLED"]:
+        return False
+    return request.headers.get("x-profile") == "1" or request.query_params.get("profile") == "1"
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import time
+from app.services.metrics import span
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the stream on a stage's input queue
+_DONE = object()
+
+
+class PipelineStage:
+    """One step of a pipeline: an async handler run by `concurrency` workers.
+
+    The handler receives an item and returns the item to pass on, or None to drop it.
+    """
+
+    def __init__(self, name, handler, concurrency=1):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(int(concurrency), 1)
+        self.busy_seconds = 0.0
+        self.processed = 0
+        self.failed = 0
+
+    def stats(self):
+        return {
+            "concurrency": self.concurrency,
+            "processed": self.processed,
+            "failed": self.failed,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
+
+
+async def _run_stage(stage, inbox, outbox):
+    async def worker():
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                # Hand the marker back so sibling workers also stop
+                await inbox.put(_DONE)
+                return
+            started = time.perf_counter()
+            try:
+                with span(stage.name):
+                    result = await stage.handler(item)
+            except Exception as e:
+                stage.failed += 1
+                logger.warning(f"Pipeline stage '{stage.name}' failed: {e}", exc_info=True)
+                result = None
+            finally:
+                stage.busy_seconds += time.perf_counter() - started
+            if result is not None:
+                stage.processed += 1
+                await outbox.put(result)
+
+    await asyncio.gather(*(worker() for _ in range(stage.concurrency)))
+    await outbox.put(_DONE)
+
+
+async def run_pipeline(items, stages, queue_size=2):
+    """Push `items` through `stages`, overlapping work across stages.
+
+    Queues between stages are bounded by `queue_size`, so a fast stage can only run
+    a few items ahead of a slow one. Returns the items that made it through every
+    stage, in completion order, plus per-stage stats.
+    """
+    queues = [asyncio.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    # The final queue collects results and must never block the last stage
+    queues[-1] = asyncio.Queue()
+    started = time.perf_counter()
+
+    async def feed():
+        for item in items:
+            await queues[0].put(item)
+        await queues[0].put(_DONE)
+
+    await asyncio.gather(
+        feed(),
+        *(_run_stage(stage, queues[i], queues[i + 1]) for i, stage in enumerate(stages)),
+    )
+
+    results = []
+    while True:
+        item = queues[-1].get_nowait()
+        if item is _DONE:
+            break
+        results.append(item)
+
+    stats = {stage.name: stage.stats() for stage in stages}
+    stats["wall_seconds"] = round(time.perf_counter() - started, 3)
+    return results, stats
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from app.config.settings import PROGRESS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressBackend:
+    """Carries messages from publishers to every process that has subscribers."""
+
+    async def start(self, deliver):
+        """`deliver(interview_id, message)` is called on the hub's loop for every message."""
+        self._deliver = deliver
+
+    async def publish(self, interview_id, message):
+        raise NotImplementedError
+
+    async def stop(self):
+        pass
+
+
+class InMemoryProgressBackend(ProgressBackend):
+    """Single-process backend: publishing delivers straight to local subscribers."""
+
+    async def publish(self, interview_id, message):
+        self._deliver(interview_id, message)
+
+
+class PostgresProgressBackend(ProgressBackend):
+    """Cross-process fan-out over PostgreSQL LISTEN/NOTIFY using asyncpg."""
+
+    def __init__(self, dsn, channel):
+        # None means the application database, resolved when the hub starts
+        self.dsn = dsn
+        self.channel = channel
+        self._listen_conn = None
+        self._publish_conn = None
+        self._publish_lock = asyncio.Lock()
+
+    async def start(self, deliver):
+        import asyncpg
+
+        await super().start(deliver)
+        if self.dsn is None:
+            from app.config.db import get_db_url
+            self.dsn = get_db_url()
+        self._listen_conn = await asyncpg.connect(self.dsn)
+        self._publish_conn = await asyncpg.connect(self.dsn)
+        await self._listen_conn.add_listener(self.channel, self._on_notify)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        data = json.loads(payload)
+        self._deliver(data["interview_id"], data["message"])
+
+    async def publish(self, interview_id, message):
+        payload = json.dumps({"interview_id": interview_id, "message": message})
+        async with self._publish_lock:
+            await self._publish_conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+    async def stop(self):
+        for conn in (self._listen_conn, self._publish_conn):
+            if conn is not None:
+                await conn.close()
+
+
+class Subscriber:
+    """One WebSocket watching one interview, fed through its own bounded queue."""
+
+    def __init__(self, interview_id, websocket, queue_size):
+        self.interview_id = interview_id
+        self.websocket = websocket
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.task = None
+
+    def offer(self, message):
+        # A slow client never blocks producers: the oldest buffered message makes room
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+
+class ProgressHub:
+    """Pub/sub for interview progress with many subscribers per interview.
+
+    In-progress updates are coalesced per interview: only the latest percentage is kept
+    and it is published at most `max_updates_per_second` times a second. Final messages
+    ("completed", "error", ...) go out immediately and supersede any pending update.
+    """
+
+    def __init__(self, backend=None, max_updates_per_second=2.0, subscriber_queue_size=16):
+        self.backend = backend or InMemoryProgressBackend()
+        self.min_interval = 1.0 / max_updates_per_second if max_updates_per_second > 0 else 0.0
+        self.subscriber_queue_size = subscriber_queue_size
+        self._subscribers = {}
+        self._pending = {}
+        self._scheduled = set()
+        self._last_sent = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self.stats = {"published": 0, "coalesced": 0, "delivered": 0}
+
+    @classmethod
+    def from_settings(cls):
+        if PROGRESS_CONFIG["PROGRESS_BACKEND"] == "postgres":
+            backend = PostgresProgressBackend(None, PROGRESS_CONFIG["PROGRESS_CHANNEL"])
+        else:
+            backend = InMemoryProgressBackend()
+        return cls(
+            backend,
+            max_updates_per_second=PROGRESS_CONFIG["PROGRESS_MAX_UPDATES_PER_SECOND"],
+            subscriber_queue_size=PROGRESS_CONFIG["PROGRESS_SUBSCRIBER_QUEUE_SIZE"],
+        )
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        await self.backend.start(self._deliver)
+
+    async def stop(self):
+        await self.backend.stop()
+
+    # Subscribers
+
+    def subscribe(self, interview_id, websocket):
+        subscriber = Subscriber(interview_id, websocket, self.subscriber_queue_size)
+        self._subscribers.setdefault(interview_id, set()).add(subscriber)
+        subscriber.task = asyncio.create_task(self._send_loop(subscriber))
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        subscribers = self._subscribers.get(subscriber.interview_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.interview_id]
+        if subscriber.task is not None and subscriber.task is not asyncio.current_task():
+            subscriber.task.cancel()
+
+    def subscriber_count(self, interview_id):
+        return len(self._subscribers.get(interview_id, ()))
+
+    async def _send_loop(self, subscriber):
+        try:
+            while True:
+                message = await subscriber.queue.get()
+                await subscriber.websocket.send_json(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Dropping progress subscriber for interview {subscriber.interview_id}: {e}")
+            self.unsubscribe(subscriber)
+
+    def _deliver(self, interview_id, message):
+        for subscriber in list(self._subscribers.get(interview_id, ())):
+            subscriber.offer(message)
+            self.stats["delivered"] += 1
+
+    # Publishers
+
+    async def publish(self, interview_id, message):
+        """Publish a message right away, discarding any progress update still pending."""
+        with self._lock:
+            self._pending.pop(interview_id, None)
+        self.stats["published"] += 1
+        await self.backend.publish(interview_id, message)
+
+    def publish_progress(self, interview_id, message):
+        """Queue a coalesced progress update. Must be called on the hub's event loop."""
+        if self._queue_pending(interview_id, message):
+            self._schedule_flush(interview_id)
+
+    def publish_progress_threadsafe(self, interview_id, message):
+        """Same as publish_progress, callable from any thread (e.g. boto3 transfer callbacks)."""
+        if self._loop is None:
+            return
+        if self._queue_pending(interview_id, message):
+            self._loop.call_soon_threadsafe(self._schedule_flush, interview_id)
+
+    def _queue_pending(self, interview_id, message):
+        """Store the latest update; True when a flush still has to be scheduled."""
+        with self._lock:
+            if interview_id in self._pending:
+                self.stats["coalesced"] += 1
+            self._pending[interview_id] = message
+            if interview_id in self._scheduled:
+                return False
+            self._scheduled.add(interview_id)
+            return True
+
+    def _schedule_flush(self, interview_id):
+        delay = self._last_sent.get(interview_id, 0.0) + self.min_interval - time.monotonic()
+        self._loop.call_later(max(delay, 0.0), self._flush, interview_id)
+
+    def _flush(self, interview_id):
+        with self._lock:
+            self._scheduled.discard(interview_id)
+            message = self._pending.pop(interview_id, None)
+        if message is None:
+            return
+        self._last_sent[interview_id] = time.monotonic()
+        self.stats["published"] += 1
+        task = asyncio.ensure_future(self.backend.publish(interview_id, message))
+        task.add_done_callback(_log_publish_error)
+
+
+def _log_publish_error(task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Error publishing progress update: {task.exception()}", exc_info=task.exception())
+
+
+# Process-wide hub; started from the FastAPI startup hook or the worker entry point
+progress_hub = ProgressHub.from_settings()
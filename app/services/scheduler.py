@@ -0,0 +1,171 @@
+import asyncio
+import itertools
+import logging
+import os
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from app.config.settings import SCHEDULER_CONFIG, JOB_CONFIG
+from app.services.jobs import PRIORITY_CLASSES, priority_name
+from app.services.metrics import scheduler_slots, scheduler_wait_seconds
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def _memory_limit_bytes():
+    """The container's cgroup memory limit when there is one, else physical memory; None if unknown."""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+            # cgroup v1 reports "no limit" as a huge number
+            if value != "max" and int(value) < 1 << 60:
+                return int(value)
+        except (OSError, ValueError):
+            pass
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def host_processes():
+    """Processes on this host that run job loops, each with its own scheduler."""
+    if SCHEDULER_CONFIG["SCHEDULER_HOST_PROCESSES"]:
+        return SCHEDULER_CONFIG["SCHEDULER_HOST_PROCESSES"]
+    api = 1 if JOB_CONFIG["JOB_API_WORKERS"] > 0 else 0
+    return max(JOB_CONFIG["JOB_WORKER_PROCESSES"] + api, 1)
+
+
+def default_slots(processes=None):
+    """This process's share of the decode+transcribe slots that fit the host's CPU cores and memory.
+
+    Schedulers do not talk to each other, so the host's budget is divided evenly between
+    the `processes` (default: host_processes()) that run jobs on it.
+    """
+    processes = processes or host_processes()
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    by_cpu = int(cpus / SCHEDULER_CONFIG["SCHEDULER_CPUS_PER_SLOT"])
+    memory = _memory_limit_bytes()
+    if memory is None:
+        return max(by_cpu // processes, 1)
+    free_mb = memory // MB - SCHEDULER_CONFIG["SCHEDULER_RESERVED_MEMORY_MB"]
+    by_memory = int(free_mb // SCHEDULER_CONFIG["SCHEDULER_MEMORY_PER_SLOT_MB"])
+    return max(min(by_cpu, by_memory) // processes, 1)
+
+
+class FairScheduler:
+    """Admits the heavy part of every job in this process, at most `max_slots` items at a time.
+
+    The limit is per process: the API process and every app.worker process each have
+    their own scheduler, and default_slots() gives each an equal share of the host.
+    Nothing coordinates slots across processes or nodes, so a host running more job
+    processes than SCHEDULER_HOST_PROCESSES says can still be overcommitted.
+
+    A freed slot goes to the most urgent priority class that is waiting, then to the
+    interview currently holding the fewest slots, then to whoever has waited longest.
+    A 30-question interview therefore shares the slots with a 1-question interview
+    submitted after it, instead of running all of its videos first.
+    """
+
+    def __init__(self, max_slots):
+        self.max_slots = max(int(max_slots), 1)
+        self._in_use = 0
+        self._held = Counter()
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._granted = Counter()
+        self._wait_seconds = Counter()
+        self._max_wait_seconds = {}
+        scheduler_slots.set(self.max_slots, state="total")
+
+    @classmethod
+    def from_settings(cls):
+        return cls(SCHEDULER_CONFIG["SCHEDULER_SLOTS"] or default_slots())
+
+    def _grant(self, interview_id):
+        self._in_use += 1
+        self._held[interview_id] += 1
+        scheduler_slots.set(self._in_use, state="in_use")
+
+    def _record_wait(self, priority, seconds):
+        name = priority_name(priority)
+        self._granted[name] += 1
+        self._wait_seconds[name] += seconds
+        self._max_wait_seconds[name] = max(self._max_wait_seconds.get(name, 0.0), seconds)
+        scheduler_wait_seconds.observe(seconds, priority=name)
+
+    def _wake(self):
+        while self._in_use < self.max_slots and self._waiters:
+            waiter = min(self._waiters, key=lambda w: (w[0], self._held[w[2]], w[1]))
+            self._waiters.remove(waiter)
+            priority, _, interview_id, future, _ = waiter
+            if future.done():
+                continue
+            self._grant(interview_id)
+            future.set_result(None)
+        scheduler_slots.set(len(self._waiters), state="waiting")
+
+    async def acquire(self, interview_id, priority=PRIORITY_CLASSES["normal"]):
+        if self._in_use < self.max_slots and not self._waiters:
+            self._grant(interview_id)
+            self._record_wait(priority, 0.0)
+            return
+
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        waiter = (priority, next(self._sequence), interview_id, future, started)
+        self._waiters.append(waiter)
+        scheduler_slots.set(len(self._waiters), state="waiting")
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted just as the waiter was cancelled
+                self.release(interview_id)
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+                scheduler_slots.set(len(self._waiters), state="waiting")
+            raise
+        self._record_wait(priority, time.perf_counter() - started)
+
+    def release(self, interview_id):
+        self._in_use -= 1
+        self._held[interview_id] -= 1
+        if self._held[interview_id] <= 0:
+            del self._held[interview_id]
+        scheduler_slots.set(self._in_use, state="in_use")
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, interview_id, priority=PRIORITY_CLASSES["normal"]):
+        await self.acquire(interview_id, priority)
+        try:
+            yield
+        finally:
+            self.release(interview_id)
+
+    def stats(self):
+        waiting = Counter(priority_name(w[0]) for w in self._waiters)
+        now = time.perf_counter()
+        return {
+            "slots": self.max_slots,
+            "in_use": self._in_use,
+            "interviews_running": len(self._held),
+            "waiting": dict(waiting),
+            "oldest_wait_seconds": round(max((now - w[4] for w in self._waiters), default=0.0), 3),
+            "wait_seconds": {
+                name: {
+                    "granted": granted,
+                    "mean": round(self._wait_seconds[name] / granted, 3),
+                    "max": round(self._max_wait_seconds[name], 3),
+                }
+                for name, granted in self._granted.items()
+            },
+        }
+
+
+# Process-wide scheduler shared by every job loop in the process
+scheduler = FairScheduler.from_settings()
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from sqlalchemy import Column, Float, MetaData, String, Table, Text, create_engine, delete, func, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from app.config.settings import SCORE_CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+score_cache_table = Table(
+    "score_cache",
+    metadata,
+    Column("cache_key", String(64), primary_key=True),
+    Column("scores", Text, nullable=False),
+    Column("created_at", Float, nullable=False),
+    Column("accessed_at", Float, nullable=False, index=True),
+)
+
+
+def score_cache_key(transcribed_text, question_id, model, prompt_version):
+    """Content address of a scoring request: same inputs, same scores."""
+    payload = json.dumps([transcribed_text, question_id, model, prompt_version])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """Persistent score cache on any SQLAlchemy engine, with TTL and LRU size eviction.
+
+    Eviction is not run on every put: an approximate entry count is kept in memory, and
+    the table is only cleaned up when that count passes `max_entries` or every
+    `evict_every` puts, which also catches expired entries and writes by other processes.
+    The cache is an optimisation, so database errors (e.g. a locked SQLite file) are
+    logged and treated as a miss rather than failing the scoring request.
+    """
+
+    def __init__(self, engine, max_entries=100000, ttl_seconds=30 * 24 * 3600, evict_every=1000):
+        self.engine = engine
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evict_every = evict_every
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._count = None
+        self._puts_since_evict = 0
+        metadata.create_all(engine)
+
+    def _error(self, action, e):
+        with self._lock:
+            self.errors += 1
+        logger.warning(f"Score cache {action} failed, scoring without the cache: {e}")
+
+    def get(self, cache_key):
+        try:
+            return self._get(cache_key)
+        except SQLAlchemyError as e:
+            self._error("lookup", e)
+            with self._lock:
+                self.misses += 1
+            return None
+
+    def _get(self, cache_key):
+        now = time.time()
+        with self.engine.begin() as conn:
+            row = conn.execute(
+                select(score_cache_table.c.scores, score_cache_table.c.created_at)
+                .where(score_cache_table.c.cache_key == cache_key)
+            ).first()
+            if row is None or now - row.created_at > self.ttl_seconds:
+                with self._lock:
+                    self.misses += 1
+                return None
+            conn.execute(
+                update(score_cache_table)
+                .where(score_cache_table.c.cache_key == cache_key)
+                .values(accessed_at=now)
+            )
+        with self._lock:
+            self.hits += 1
+        return tuple(json.loads(row.scores))
+
+    def put(self, cache_key, scores):
+        try:
+            self._put(cache_key, scores)
+        except SQLAlchemyError as e:
+            self._error("write", e)
+
+    def _put(self, cache_key, scores):
+        now = time.time()
+        values = {"scores": json.dumps(list(scores)), "created_at": now, "accessed_at": now}
+        with self.engine.begin() as conn:
+            if self._count is None:
+                self._count = conn.execute(select(func.count()).select_from(score_cache_table)).scalar()
+            updated = conn.execute(
+                update(score_cache_table).where(score_cache_table.c.cache_key == cache_key).values(**values)
+            ).rowcount
+            if not updated:
+                conn.execute(insert(score_cache_table).values(cache_key=cache_key, **values))
+        with self._lock:
+            if not updated:
+                self._count += 1
+            self._puts_since_evict += 1
+            due = self._count > self.max_entries or self._puts_since_evict >= self.evict_every
+        if due:
+            self._evict()
+
+    def _evict(self):
+        with self.engine.begin() as conn:
+            expired = conn.execute(
+                delete(score_cache_table).where(score_cache_table.c.created_at < time.time() - self.ttl_seconds)
+            ).rowcount
+            count = conn.execute(select(func.count()).select_from(score_cache_table)).scalar()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                # Drop the least recently used entries
+                oldest = select(score_cache_table.c.cache_key).order_by(score_cache_table.c.accessed_at).limit(overflow)
+                overflow = conn.execute(
+                    delete(score_cache_table).where(score_cache_table.c.cache_key.in_(oldest))
+                ).rowcount
+            with self._lock:
+                self.evictions += max(expired, 0) + max(overflow, 0)
+                self._count = count - max(overflow, 0)
+                self._puts_since_evict = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+_score_cache = None
+
+
+def get_score_cache():
+    """Return the configured process-wide cache, or None when caching is disabled."""
+    global _score_cache
+    if not SCORE_CACHE_CONFIG["SCORE_CACHE_ENABLED"]:
+        return None
+    if _score_cache is None:
+        if SCORE_CACHE_CONFIG["SCORE_CACHE_BACKEND"] == "postgres":
+            from app.config.db import get_engine
+            engine = get_engine()
+        else:
+            os.makedirs(os.path.dirname(SCORE_CACHE_CONFIG["SCORE_CACHE_PATH"]), exist_ok=True)
+            engine = create_engine(f"sqlite:///{SCORE_CACHE_CONFIG['SCORE_CACHE_PATH']}")
+        _score_cache = ScoreCache(
+            engine,
+            max_entries=SCORE_CACHE_CONFIG["SCORE_CACHE_MAX_ENTRIES"],
+            ttl_seconds=SCORE_CACHE_CONFIG["SCORE_CACHE_TTL_SECONDS"],
+        )
+    return _score_cache
@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import os
+import random
+import re
+import time
+import zlib
+from app.config.settings import SCORING_CONFIG
+from app.services.metrics import span
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever build_scoring_prompt changes so cached scores are not reused across prompts
+PROMPT_VERSION = "1"
+SCORE_NAMES = ("semantic_similarity_score", "broad_topic_sim_score", "grammar_score", "disfluency_score")
+# One score per comma-, semicolon- or line-separated field, optionally labelled: "Grammar: 90%"
+_SCORE_SEPARATOR = re.compile(r"[,;\n]")
+_SCORE_FIELD = re.compile(r"(?:[A-Za-z][A-Za-z _/()-]*:\s*)?(-?\d+(?:\.\d+)?)\s*%?")
+
+
+class ScoreParseError(ValueError):
+    """Raised when a model reply does not contain four scores."""
+
+
+def build_scoring_prompt(transcribed_text):
+    return f"Calculate the following scores for the given text: semantic similarity, broad topic similarity, grammar, and disfluency. Each score should be on a scale of 0 to 100. Output only the scores separated by commas.\n\nText: {transcribed_text} \n\n Output only the scores separated by commas. I don't want any other text or explanation."
+
+
+def parse_scores(generated_text):
+    """Pull the four scores out of a model reply, clamped to 0-100.
+
+    Tolerates labels, percent signs, newlines and a closing period, e.g.
+    "Semantic: 80%, Topic: 75, Grammar: 90, Disfluency: 60." Anything else, such as a
+    numbered list or a preamble with numbers of its own, raises ScoreParseError rather
+    than being read as scores.
+    """
+    fields = [field.strip().rstrip(".").strip() for field in _SCORE_SEPARATOR.split(generated_text or "")]
+    matches = [_SCORE_FIELD.fullmatch(field) for field in fields if field]
+    if len(matches) != len(SCORE_NAMES) or not all(matches):
+        raise ScoreParseError(f"Expected {len(SCORE_NAMES)} scores, got: {generated_text!r}")
+    return tuple(min(max(float(match.group(1)), 0.0), 100.0) for match in matches)
+
+
+def is_retryable(error):
+    """Rate limits, timeouts, dropped connections, 5xx and unparseable replies can succeed on a retry.
+
+    Anything else (bad key, 400 such as a context-length error, 404 model) fails the same way every time.
+    """
+    if isinstance(error, (ScoreParseError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    try:
+        import openai
+    except ImportError:
+        openai = None
+    if openai is not None and isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    return status is not None and (status in (408, 409, 429) or status >= 500)
+
+
+def retry_after_seconds(error):
+    """The server's Retry-After (or retry-after-ms) hint in seconds, or None."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after") is not None:
+            # HTTP-date values are rare from the API; they fall back to the engine's backoff
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English text
+    return max(len(text) // 4, 1)
+
+
+class ScoringBackend:
+    """Sends a prompt to a model and returns its raw text reply."""
+
+    model = None
+
+    async def complete(self, prompt):
+        raise NotImplementedError
+
+
+class OpenAIScoringBackend(ScoringBackend):
+    """Chat completions through one shared AsyncOpenAI client."""
+
+    def __init__(self, model, api_key=None):
+        from openai import AsyncOpenAI
+
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY is not set in the .env file")
+        self.model = model
+        # Retries are handled by the engine so they respect the rate limiter
+        self.client = AsyncOpenAI(api_key=api_key, max_retries=0)
+
+    async def complete(self, prompt):
+        chat_completion = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        return chat_completion.choices[0].message.content
+
+
+class FakeScoringBackend(ScoringBackend):
+    """Local stand-in that returns deterministic scores after a configurable delay."""
+
+    def __init__(self, latency_seconds=0.0, model="fake-scorer"):
+        self.latency_seconds = latency_seconds
+        self.model = model
+        self.calls = 0
+
+    async def complete(self, prompt):
+        self.calls += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        seed = zlib.crc32(prompt.encode("utf-8"))
+        return ", ".join(str(50 + (seed >> shift) % 50) for shift in (0, 8, 16, 24))
+
+
+class RateLimiter:
+    """Token-bucket limiter for requests per minute and tokens per minute."""
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    async def acquire(self, tokens=1):
+        # A single request larger than the whole budget still goes through once the bucket is full
+        tokens = min(tokens, self.tokens_per_minute)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self._requests) * 60 / self.requests_per_minute,
+                    (tokens - self._tokens) * 60 / self.tokens_per_minute,
+                )
+                await asyncio.sleep(max(wait, 0.01))
+
+
+class ScoringEngine:
+    """Scores transcripts concurrently through one backend, within rate limits, with retries.
+
+    Only failures that can succeed on a retry are retried (see is_retryable), after the
+    server's Retry-After when it sends one and an exponential backoff otherwise.
+    """
+
+    def __init__(self, backend, requests_per_minute=500, tokens_per_minute=200000,
+                 max_concurrency=8, max_retries=4, backoff_seconds=0.5):
+        self.backend = backend
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self._semaphore = None
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+
+    @classmethod
+    def from_settings(cls):
+        if SCORING_CONFIG["SCORING_BACKEND"] == "fake":
+            backend = FakeScoringBackend(SCORING_CONFIG["SCORING_FAKE_LATENCY_SECONDS"])
+        else:
+            backend = OpenAIScoringBackend(SCORING_CONFIG["SCORING_MODEL"])
+        return cls(
+            backend,
+            requests_per_minute=SCORING_CONFIG["SCORING_REQUESTS_PER_MINUTE"],
+            tokens_per_minute=SCORING_CONFIG["SCORING_TOKENS_PER_MINUTE"],
+            max_concurrency=SCORING_CONFIG["SCORING_MAX_CONCURRENCY"],
+            max_retries=SCORING_CONFIG["SCORING_MAX_RETRIES"],
+            backoff_seconds=SCORING_CONFIG["SCORING_BACKOFF_SECONDS"],
+        )
+
+    async def score(self, transcribed_text):
+        """Return (semantic, broad_topic, grammar, disfluency) for one transcript."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        prompt = build_scoring_prompt(transcribed_text)
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    await self.rate_limiter.acquire(estimate_tokens(prompt))
+                    self.stats["requests"] += 1
+                    with span("llm_score", model=self.backend.model, attempt=attempt):
+                        generated_text = await self.backend.complete(prompt)
+                return parse_scores(generated_text)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    self.stats["failures"] += 1
+                    raise
+                self.stats["retries"] += 1
+                delay = retry_after_seconds(e)
+                if delay is None:
+                    delay = self.backoff_seconds * (2 ** attempt) * (1 + random.random())
+                logger.warning(f"Scoring attempt {attempt + 1} failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def score_many(self, transcripts):
+        """Score a {key: text} mapping concurrently; failed keys map to their exception."""
+        keys = list(transcripts)
+        results = await asyncio.gather(*(self.score(transcripts[key]) for key in keys), return_exceptions=True)
+        return dict(zip(keys, results))
+
+
+# Built on first use so importing the routes does not require an API key
+_scoring_engine = None
+
+
+def get_scoring_engine():
+    global _scoring_engine
+    if _scoring_engine is None:
+        _scoring_engine = ScoringEngine.from_settings()
+    return _scoring_engine
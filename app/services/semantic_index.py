@@ -0,0 +1,229 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+import numpy as np
+from app.config.settings import SEMANTIC_INDEX_CONFIG
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have i if in into is it its of on or so that the "
+    "their then there these this to was were will with you your we our they um uh like".split()
+)
+
+
+def tokenize(text):
+    return [token for token in _TOKEN.findall((text or "").lower()) if token not in _STOP_WORDS]
+
+
+def _text_fingerprint(text):
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+class HashedTfidfVectorizer:
+    """Stateless TF-IDF features: unigrams and bigrams hashed into a fixed number of columns.
+
+    Hashing keeps the column space fixed, so rows can be added or rebuilt one at a time
+    without refitting a vocabulary. IDF weights come from the index's document frequencies.
+    """
+
+    def __init__(self, dimensions):
+        self.dimensions = dimensions
+
+    def _features(self, text):
+        tokens = tokenize(text)
+        terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return np.fromiter((zlib.crc32(term.encode("utf-8")) % self.dimensions for term in terms),
+                           dtype=np.int64, count=len(terms))
+
+    def term_frequencies(self, texts):
+        """Sublinear (1 + log tf) term weights, one row per text."""
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            columns = self._features(text)
+            if columns.size:
+                np.add.at(matrix[row], columns, 1.0)
+        np.log1p(matrix, out=matrix, where=matrix > 0)
+        return matrix
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+class SemanticIndex:
+    """On-disk matrix of reference-answer and question-topic vectors.
+
+    Layout of `index_dir`:
+      vectors.npy  float32 (rows x dimensions) term weights, memory-mapped when loaded
+      rows.json    one entry per matrix row: kind ("answer"/"topic"), id, question_id, fingerprint
+    Rebuilds are incremental: rows whose text fingerprint is unchanged keep their vectors.
+    """
+
+    def __init__(self, index_dir, dimensions=4096):
+        self.index_dir = index_dir
+        self.vectorizer = HashedTfidfVectorizer(dimensions)
+        self.vectors = None
+        self.rows = []
+        self._idf = None
+        self._rows_by_question = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(SEMANTIC_INDEX_CONFIG["SEMANTIC_INDEX_DIR"], SEMANTIC_INDEX_CONFIG["SEMANTIC_INDEX_DIMENSIONS"])
+
+    @property
+    def _vectors_path(self):
+        return os.path.join(self.index_dir, "vectors.npy")
+
+    @property
+    def _rows_path(self):
+        return os.path.join(self.index_dir, "rows.json")
+
+    def load(self):
+        """Memory-map the index from disk; returns False if it has not been built yet."""
+        try:
+            with open(self._rows_path) as f:
+                meta = json.load(f)
+            vectors = np.load(self._vectors_path, mmap_mode="r")
+        except (OSError, ValueError):
+            return False
+        if meta["dimensions"] != self.vectorizer.dimensions or vectors.shape[0] != len(meta["rows"]):
+            return False
+        with self._lock:
+            self._set(vectors, meta["rows"])
+        return True
+
+    def _set(self, vectors, rows):
+        self.vectors = vectors
+        self.rows = rows
+        doc_freq = np.count_nonzero(vectors, axis=0).astype(np.float32) if len(rows) else np.zeros(self.vectorizer.dimensions, np.float32)
+        self._idf = np.log((1 + len(rows)) / (1 + doc_freq)) + 1
+        self._rows_by_question = {}
+        for i, row in enumerate(rows):
+            self._rows_by_question.setdefault(row["question_id"], {"answer": [], "topic": []})[row["kind"]].append(i)
+
+    def rebuild(self, documents):
+        """Bring the index in line with `documents`: dicts of kind, id, question_id, text.
+
+        Returns counts of reused and re-vectorized rows.
+        """
+        if self.vectors is None:
+            self.load()
+        previous = {(row["kind"], row["id"]): (i, row["fingerprint"]) for i, row in enumerate(self.rows)}
+
+        rows, reuse, fresh_texts, fresh_positions = [], [], [], []
+        for position, doc in enumerate(documents):
+            fingerprint = _text_fingerprint(doc["text"])
+            rows.append({"kind": doc["kind"], "id": doc["id"], "question_id": doc["question_id"], "fingerprint": fingerprint})
+            old = previous.get((doc["kind"], doc["id"]))
+            if old is not None and old[1] == fingerprint:
+                reuse.append((position, old[0]))
+            else:
+                fresh_texts.append(doc["text"])
+                fresh_positions.append(position)
+
+        vectors = np.zeros((len(rows), self.vectorizer.dimensions), dtype=np.float32)
+        if reuse:
+            new_positions, old_positions = zip(*reuse)
+            vectors[list(new_positions)] = self.vectors[list(old_positions)]
+        if fresh_texts:
+            vectors[fresh_positions] = self.vectorizer.term_frequencies(fresh_texts)
+
+        # Write next to the live files, then swap them in atomically
+        os.makedirs(self.index_dir, exist_ok=True)
+        tmp_vectors = self._vectors_path + ".tmp.npy"
+        tmp_rows = self._rows_path + ".tmp"
+        np.save(tmp_vectors, vectors)
+        with open(tmp_rows, "w") as f:
+            json.dump({"dimensions": self.vectorizer.dimensions, "built_at": time.time(), "rows": rows}, f)
+        os.replace(tmp_vectors, self._vectors_path)
+        os.replace(tmp_rows, self._rows_path)
+
+        self.load()
+        return {"rows": len(rows), "reused": len(reuse), "vectorized": len(fresh_texts)}
+
+    def score(self, pairs, fallback=None):
+        """Score (question_id, transcript) pairs in one batch.
+
+        Returns (semantic_similarity, broad_topic_similarity) per pair on a 0-100 scale:
+        the best cosine similarity against the question's reference answers, and the
+        cosine similarity against the question's text and sub-technology.
+        `fallback` maps question_id -> {"answer": [texts], "topic": [texts]} and is used
+        for questions added since the last rebuild.
+        """
+        with self._lock:
+            vectors, idf, by_question = self.vectors, self._idf, self._rows_by_question
+        if vectors is None:
+            raise RuntimeError("Semantic index has not been built")
+
+        queries = _normalize(self.vectorizer.term_frequencies([text for _, text in pairs]) * idf)
+
+        # Only the rows for the interview's questions are touched, in one gather
+        wanted = sorted({i for question_id, _ in pairs
+                         for kind in ("answer", "topic") for i in by_question.get(question_id, {}).get(kind, [])})
+        column = {row: c for c, row in enumerate(wanted)}
+        columns_by_question = {
+            question_id: {kind: [column[i] for i in rows[kind]] for kind in ("answer", "topic")}
+            for question_id, rows in by_question.items() if any(i in column for i in rows["answer"] + rows["topic"])
+        }
+
+        # Questions missing from the index are vectorized on the fly from the fallback texts
+        extra_texts = []
+        for question_id in sorted({q for q, _ in pairs if q not in by_question and fallback and q in fallback}):
+            columns_by_question[question_id] = {"answer": [], "topic": []}
+            for kind in ("answer", "topic"):
+                for text in fallback[question_id].get(kind, []):
+                    columns_by_question[question_id][kind].append(len(wanted) + len(extra_texts))
+                    extra_texts.append(text)
+
+        if not wanted and not extra_texts:
+            return [(0.0, 0.0)] * len(pairs)
+        parts = [np.asarray(vectors[wanted])] if wanted else []
+        if extra_texts:
+            parts.append(self.vectorizer.term_frequencies(extra_texts))
+        references = _normalize(np.vstack(parts) * idf)
+        similarities = queries @ references.T
+
+        results = []
+        for q, (question_id, _) in enumerate(pairs):
+            rows = columns_by_question.get(question_id, {"answer": [], "topic": []})
+            topic_columns = rows["topic"]
+            # Without reference answers the question itself is the best reference we have
+            answer_columns = rows["answer"] or topic_columns
+            semantic = similarities[q, answer_columns].max() if answer_columns else 0.0
+            topic = similarities[q, topic_columns].max() if topic_columns else 0.0
+            results.append((round(float(np.clip(semantic, 0, 1)) * 100, 1), round(float(np.clip(topic, 0, 1)) * 100, 1)))
+        return results
+
+
+def load_reference_documents(db):
+    """Reference answers and question topics from the database, ready for SemanticIndex.rebuild()."""
+    from app.models.answers import Answers
+    from app.models.questions import Questions
+
+    documents = []
+    for answer_id, question_id, answer in db.query(Answers.answer_id, Answers.question_id, Answers.answer):
+        documents.append({"kind": "answer", "id": answer_id, "question_id": question_id, "text": answer or ""})
+    for question_id, question_text, sub_tech in db.query(Questions.question_id, Questions.question_text, Questions.sub_tech):
+        documents.append({"kind": "topic", "id": question_id, "question_id": question_id,
+                          "text": f"{question_text or ''} {sub_tech or ''}"})
+    return documents
+
+
+semantic_index = SemanticIndex.from_settings()
+
+
+def refresh_semantic_index(db):
+    started = time.perf_counter()
+    result = semantic_index.rebuild(load_reference_documents(db))
+    logger.info(f"Semantic index refreshed in {time.perf_counter() - started:.2f}s: {result}")
+    return result
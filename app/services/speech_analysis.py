@@ -0,0 +1,175 @@
+import re
+import numpy as np
+from app.config.settings import SPEECH_ANALYSIS_CONFIG
+
+_WORD = re.compile(r"[a-z']+")
+FILLER_WORDS = frozenset(["um", "umm", "uh", "uhh", "er", "erm", "ah", "hmm", "mm"])
+FILLER_PHRASES = frozenset([("you", "know"), ("i", "mean"), ("kind", "of"), ("sort", "of")])
+# Comfortable conversational range in words per minute
+SPEECH_RATE_RANGE = (110.0, 170.0)
+
+# "does he have", "would it have", "if it were": the verb after an auxiliary or "if" is not a finite one
+_AFTER_AUXILIARY = "".join(rf"(?<!\b{word} )" for word in (
+    "do", "does", "did", "will", "would", "can", "could", "should", "might", "must", "to", "if"))
+
+# Simple agreement and article errors that survive speech-to-text
+_GRAMMAR_RULES = [
+    # Only letters that are always vowel sounds: "a user", "a one-off" and "a European" are correct
+    re.compile(r"\ba (?!one\b|once\b|eu)[aeio]\w+", re.I),
+    # Acronyms are read out letter by letter: "an S3 bucket", "an LRU cache"
+    re.compile(r"\ban (?!(?-i:[A-Z][A-Z0-9]*)\b)[bcdfgjklmnpqrstvwxz]\w+", re.I),
+    re.compile(_AFTER_AUXILIARY + r"\b(he|she|it) (don't|have|were|are)\b", re.I),
+    re.compile(r"\b(you|we|they) (doesn't|has|was|is)\b", re.I),
+    re.compile(r"\bi (doesn't|has|is)\b", re.I),
+    re.compile(r"\b(don't|doesn't|didn't|can't|won't) (no|nothing|nobody|never)\b", re.I),
+    re.compile(r"\b(could|should|would|must) of\b", re.I),
+]
+
+
+def compact_segments(result):
+    """Keep the parts of a Whisper result that the local analysis needs, JSON-friendly."""
+    segments = []
+    for segment in result.get("segments", []):
+        segments.append({
+            "start": round(float(segment["start"]), 3),
+            "end": round(float(segment["end"]), 3),
+            "text": segment["text"],
+            "no_speech_prob": round(float(segment.get("no_speech_prob", 0.0)), 4),
+            "avg_logprob": round(float(segment.get("avg_logprob", 0.0)), 4),
+            "words": [
+                {"word": w["word"], "start": round(float(w["start"]), 3), "end": round(float(w["end"]), 3)}
+                for w in segment.get("words", [])
+            ],
+        })
+    return segments
+
+
+def _flatten(answers):
+    """One flat array per feature across the whole interview, tagged with the answer index.
+
+    Answers without word timings (e.g. transcripts from before timings were stored) get
+    NaN times, which drops them out of the pause and speech-rate features only.
+    """
+    words, starts, ends, owners = [], [], [], []
+    for index, answer in enumerate(answers):
+        segments = answer.get("segments") or []
+        timed = [w for s in segments for w in s.get("words", [])]
+        if timed:
+            for w in timed:
+                for token in _WORD.findall(w["word"].lower()):
+                    words.append(token)
+                    starts.append(w["start"])
+                    ends.append(w["end"])
+                    owners.append(index)
+        else:
+            for token in _WORD.findall((answer.get("text") or "").lower()):
+                words.append(token)
+                starts.append(np.nan)
+                ends.append(np.nan)
+                owners.append(index)
+    return (np.array(words, dtype=object), np.array(starts, dtype=np.float64),
+            np.array(ends, dtype=np.float64), np.array(owners, dtype=np.int64))
+
+
+def _grammar_errors(text):
+    if SPEECH_ANALYSIS_CONFIG["GRAMMAR_CHECKER"] == "languagetool":
+        return len(_language_tool().check(text))
+    return sum(len(rule.findall(text)) for rule in _GRAMMAR_RULES)
+
+
+_tool = None
+
+
+def _language_tool():
+    global _tool
+    if _tool is None:
+        import language_tool_python
+        _tool = language_tool_python.LanguageTool("en-US")
+    return _tool
+
+
+def analyze_interview(answers):
+    """Compute disfluency features and local grammar/disfluency scores for a whole interview.
+
+    `answers` is a list of {"text": ..., "segments": [...]} dicts, one per evaluation.
+    Every feature is computed over the flattened interview in one vectorized pass.
+    Returns one dict per answer with the features plus "grammar_score" and
+    "disfluency_score" on 0-100, where higher means more fluent / more correct.
+    """
+    n = len(answers)
+    words, starts, ends, owners = _flatten(answers)
+    word_counts = np.bincount(owners, minlength=n).astype(np.float64)
+    safe_counts = np.maximum(word_counts, 1.0)
+
+    # Fillers: single tokens plus two-word phrases
+    is_filler = np.isin(words, list(FILLER_WORDS)) if words.size else np.zeros(0, dtype=bool)
+    same_answer = owners[1:] == owners[:-1]
+    pairs = list(zip(words[:-1], words[1:]))
+    phrase = np.array([p in FILLER_PHRASES for p in pairs], dtype=bool) & same_answer if pairs else np.zeros(0, dtype=bool)
+    fillers = np.bincount(owners[is_filler], minlength=n) + np.bincount(owners[1:][phrase], minlength=n)
+
+    # Repetitions ("the the", "is uh is") and restarts ("i think i think"), ignoring fillers
+    content, content_owners = words[~is_filler], owners[~is_filler]
+    if content.size > 1:
+        repeated = (content[1:] == content[:-1]) & (content_owners[1:] == content_owners[:-1])
+        repetitions = np.bincount(content_owners[1:][repeated], minlength=n)
+    else:
+        repetitions = np.zeros(n, dtype=np.int64)
+    if content.size > 3:
+        restart = ((content[2:-1] == content[:-3]) & (content[3:] == content[1:-2])
+                   & (content_owners[3:] == content_owners[:-3]))
+        restarts = np.bincount(content_owners[3:][restart], minlength=n)
+    else:
+        restarts = np.zeros(n, dtype=np.int64)
+
+    # Pauses between consecutive words of the same answer
+    gaps = starts[1:] - ends[:-1]
+    timed_gap = same_answer & ~np.isnan(gaps)
+    gap_owner = owners[1:][timed_gap]
+    gap_values = np.clip(gaps[timed_gap], 0.0, None)
+    long_pause = gap_values > SPEECH_ANALYSIS_CONFIG["LONG_PAUSE_SECONDS"]
+    long_pauses = np.bincount(gap_owner[long_pause], minlength=n)
+    gap_counts = np.bincount(gap_owner, minlength=n)
+    mean_pause = np.bincount(gap_owner, weights=gap_values, minlength=n) / np.maximum(gap_counts, 1)
+
+    # Speaking time per answer from first word start to last word end
+    timed_word = ~np.isnan(starts)
+    first = np.full(n, np.inf)
+    last = np.full(n, -np.inf)
+    np.minimum.at(first, owners[timed_word], starts[timed_word])
+    np.maximum.at(last, owners[timed_word], ends[timed_word])
+    duration = np.where(np.isfinite(first), last - first, np.nan)
+    minutes = np.where(duration > 0, duration / 60.0, np.nan)
+    speech_rate = word_counts / minutes
+
+    filler_rate = fillers / safe_counts
+    repetition_rate = repetitions / safe_counts
+    restart_rate = restarts / safe_counts
+    long_pauses_per_minute = np.nan_to_num(long_pauses / minutes)
+    low, high = SPEECH_RATE_RANGE
+    rate_penalty = np.nan_to_num(np.clip(low - speech_rate, 0, None) + np.clip(speech_rate - high, 0, None)) * 0.3
+
+    penalty = (250 * filler_rate + 150 * repetition_rate + 200 * restart_rate
+               + 8 * long_pauses_per_minute + rate_penalty)
+    disfluency_scores = np.clip(100 - penalty, 0, 100)
+
+    results = []
+    for i, answer in enumerate(answers):
+        grammar_errors = _grammar_errors(answer.get("text") or "")
+        errors_per_100 = 100.0 * grammar_errors / safe_counts[i]
+        p90_pause = float(np.percentile(gap_values[gap_owner == i], 90)) if gap_counts[i] else None
+        results.append({
+            "word_count": int(word_counts[i]),
+            "duration_seconds": None if np.isnan(duration[i]) else round(float(duration[i]), 2),
+            "speech_rate_wpm": None if np.isnan(speech_rate[i]) else round(float(speech_rate[i]), 1),
+            "filler_rate": round(float(filler_rate[i]), 4),
+            "repetitions": int(repetitions[i]),
+            "restarts": int(restarts[i]),
+            "long_pauses": int(long_pauses[i]),
+            "mean_pause_seconds": round(float(mean_pause[i]), 3),
+            "p90_pause_seconds": None if p90_pause is None else round(p90_pause, 3),
+            "grammar_errors": grammar_errors,
+            "grammar_score": round(float(np.clip(100 - 10 * errors_per_100, 0, 100)), 1),
+            "disfluency_score": round(float(disfluency_scores[i]), 1) if word_counts[i] else 0.0,
+        })
+    return results
@@ -0,0 +1,189 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from app.config.settings import TRANSCRIPTION_CONFIG, WHISPER_CONFIG, SPEECH_ANALYSIS_CONFIG, LOGGING_CONFIG
+from app.services.audio import extract_audio, SAMPLE_RATE
+from app.services.chunking import plan_chunks, stitch
+from app.services.speech_analysis import compact_segments
+from app.services.whisper_registry import whisper_registry
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionEngineBusy(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+def _init_worker():
+    # Spawned workers never import app.config.db, which configures logging everywhere else
+    logging.basicConfig(level=LOGGING_CONFIG["LOG_LEVEL"], format="%(asctime)s | %(levelname)s | %(message)s")
+    # Each worker process preloads (and warms) its own copy of the models
+    whisper_registry.warm_up()
+
+
+def transcribe_audio(audio, model_size=None):
+    """Transcribe a WAV path or a 16 kHz float32 array with the worker's preloaded model and backend.
+
+    Returns {"text": ..., "segments": [...]}; segments carry word timings for speech analysis.
+    """
+    result = whisper_registry.transcribe(
+        audio, model_size, word_timestamps=SPEECH_ANALYSIS_CONFIG["WHISPER_WORD_TIMESTAMPS"]
+    )
+    return {"text": result['text'], "segments": compact_segments(result)}
+
+
+def transcribe_video_file(video_file_path, model_size=None):
+    """Extract the audio track of a video and transcribe it. Runs inside a worker."""
+    audio, stats = extract_audio(video_file_path)
+    try:
+        return transcribe_audio(audio, model_size)
+    finally:
+        if isinstance(audio, str) and os.path.exists(audio):
+            os.remove(audio)
+
+
+def worker_model_stats():
+    return whisper_registry.stats()
+
+
+class TranscriptionEngine:
+    """Bounded pool of transcription workers that async code can await without blocking the loop."""
+
+    def __init__(self, max_workers, queue_depth, model_size=None, long_audio_seconds=0, chunk_seconds=60,
+                 chunk_overlap_seconds=1.0, chunk_workers=0, initializer=_init_worker):
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self.model_size = model_size
+        # Long-audio mode: answers over long_audio_seconds are cut at pauses and the chunks run in parallel
+        self.long_audio_seconds = long_audio_seconds
+        self.chunk_seconds = chunk_seconds
+        self.chunk_overlap_seconds = chunk_overlap_seconds
+        self.chunk_workers = chunk_workers or max(max_workers, 1)
+        self.initializer = initializer
+        self._executor = None
+        self._slots = None
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._chunked = 0
+        self._chunks = 0
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            max_workers=TRANSCRIPTION_CONFIG["TRANSCRIPTION_WORKERS"],
+            queue_depth=TRANSCRIPTION_CONFIG["TRANSCRIPTION_QUEUE_DEPTH"],
+            model_size=WHISPER_CONFIG["WHISPER_DEFAULT_MODEL"],
+            long_audio_seconds=TRANSCRIPTION_CONFIG["TRANSCRIPTION_LONG_AUDIO_SECONDS"],
+            chunk_seconds=TRANSCRIPTION_CONFIG["TRANSCRIPTION_CHUNK_SECONDS"],
+            chunk_overlap_seconds=TRANSCRIPTION_CONFIG["TRANSCRIPTION_CHUNK_OVERLAP_SECONDS"],
+            chunk_workers=TRANSCRIPTION_CONFIG["TRANSCRIPTION_CHUNK_WORKERS"],
+        )
+
+    @property
+    def capacity(self):
+        return max(self.max_workers, 1) + self.queue_depth
+
+    @property
+    def is_busy(self):
+        """True when no new job can be accepted without waiting."""
+        return self._in_flight >= self.capacity
+
+    def start(self):
+        if self._executor is not None:
+            return
+        if self.max_workers > 0:
+            # spawn keeps torch state out of the children and works the same on every platform
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer,
+            )
+        else:
+            self.initializer()
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="transcription")
+        logger.info(f"Transcription engine started with {self.max_workers} worker(s), queue depth {self.queue_depth}")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, func, *args, wait=True):
+        """Run `func(*args)` on a worker.
+
+        With wait=False a saturated engine raises TranscriptionEngineBusy instead of queueing.
+        """
+        if self._executor is None:
+            self.start()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.capacity)
+        if not wait and self._slots.locked():
+            raise TranscriptionEngineBusy("Transcription engine is busy, retry later")
+
+        async with self._slots:
+            self._in_flight += 1
+            try:
+                result = await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+                self._completed += 1
+                return result
+            except Exception:
+                self._failed += 1
+                raise
+            finally:
+                self._in_flight -= 1
+
+    async def transcribe_video(self, video_file_path, wait=True):
+        return await self.run(transcribe_video_file, video_file_path, self.model_size, wait=wait)
+
+    async def transcribe_audio(self, audio, wait=True):
+        if (self.long_audio_seconds and not isinstance(audio, str)
+                and len(audio) > self.long_audio_seconds * SAMPLE_RATE):
+            return await self.transcribe_long_audio(audio, wait=wait)
+        return await self.run(transcribe_audio, audio, self.model_size, wait=wait)
+
+    async def transcribe_long_audio(self, audio, wait=True):
+        """Cut a decoded answer at pauses, transcribe the chunks in parallel and stitch the results.
+
+        Whisper already works in 30 s windows, but one after another on one worker; here
+        up to `chunk_workers` workers share a single answer. WAV paths (file mode) are
+        transcribed in one pass.
+        """
+        chunks = await asyncio.to_thread(
+            plan_chunks, audio, SAMPLE_RATE, self.chunk_seconds, self.chunk_overlap_seconds
+        )
+        if len(chunks) == 1:
+            return await self.run(transcribe_audio, audio, self.model_size, wait=wait)
+
+        limit = asyncio.Semaphore(self.chunk_workers)
+
+        async def transcribe_chunk(start, end):
+            async with limit:
+                return await self.run(transcribe_audio, audio[start:end], self.model_size, wait=wait)
+
+        results = await asyncio.gather(*(transcribe_chunk(start, end) for start, end, _, _ in chunks))
+        self._chunked += 1
+        self._chunks += len(chunks)
+        return stitch(results, chunks)
+
+    async def model_stats(self):
+        """Whisper load time and memory as seen by a worker, where the models actually live."""
+        return await self.run(worker_model_stats)
+
+    def stats(self):
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.queue_depth,
+            "in_flight": self._in_flight,
+            "busy": self.is_busy,
+            "completed": self._completed,
+            "failed": self._failed,
+            "long_audio_chunked": self._chunked,
+            "long_audio_chunks": self._chunks,
+        }
+
+
+# Process-wide engine; started from the FastAPI startup hook
+transcription_engine = TranscriptionEngine.from_settings()
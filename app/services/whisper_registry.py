@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from app.config.settings import WHISPER_CONFIG
+from app.services.transcription_backends import backend_from_settings
+
+logger = logging.getLogger(__name__)
+
+# Whisper's own rate; the backend's libraries are imported on the first model load
+SAMPLE_RATE = 16000
+
+
+def process_rss_bytes():
+    """Current resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    # ru_maxrss is the peak, in KB on Linux; best effort on other platforms
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class WhisperModelRegistry:
+    """Loads each Whisper model size once per process and hands out the same instance.
+
+    Models are kept in LRU order. When loading a new size would push the total
+    resident model memory over the budget, the least recently used sizes are evicted.
+    """
+
+    def __init__(self, model_sizes, default_size, memory_budget_mb, device=None, backend=None, loader=None):
+        self.model_sizes = list(model_sizes)
+        self.default_size = default_size
+        self.memory_budget_bytes = memory_budget_mb * 1024 * 1024
+        self.device = device
+        self.backend = backend or backend_from_settings()
+        # Swappable so benchmarks can stand in a stub model
+        self.loader = loader or self.backend.load
+        self._models = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            model_sizes=WHISPER_CONFIG["WHISPER_MODEL_SIZES"],
+            default_size=WHISPER_CONFIG["WHISPER_DEFAULT_MODEL"],
+            memory_budget_mb=WHISPER_CONFIG["WHISPER_MEMORY_BUDGET_MB"],
+            device=WHISPER_CONFIG["WHISPER_DEVICE"],
+        )
+
+    def get(self, size=None):
+        """Return the loaded model for `size`, loading it on first use."""
+        size = size or self.default_size
+        with self._lock:
+            if size in self._models:
+                self._models.move_to_end(size)
+                self._stats[size]["hits"] += 1
+                return self._models[size]
+            return self._load(size)
+
+    def _load(self, size):
+        logger.info(f"Loading Whisper model '{size}' with the {self.backend.name} backend...")
+        rss_before = process_rss_bytes()
+        started = time.perf_counter()
+        model = self.loader(size, device=self.device)
+        load_seconds = time.perf_counter() - started
+        rss_delta = max(process_rss_bytes() - rss_before, 0)
+        # CTranslate2 does not expose its weights, so the growth of the process stands in for them
+        model_bytes = self.backend.model_bytes(model) or rss_delta
+
+        self._models[size] = model
+        self._stats[size] = {
+            "load_seconds": round(load_seconds, 3),
+            "model_bytes": model_bytes,
+            "rss_delta_bytes": rss_delta,
+            "warmup_seconds": None,
+            "hits": 0,
+        }
+        logger.info(f"Whisper model '{size}' loaded in {load_seconds:.2f}s ({model_bytes / 1e6:.0f} MB)")
+        self._evict_over_budget(keep=size)
+        return model
+
+    def _evict_over_budget(self, keep):
+        while self._resident_bytes() > self.memory_budget_bytes and len(self._models) > 1:
+            size = next(iter(self._models))
+            if size == keep:
+                break
+            del self._models[size]
+            self._stats.pop(size, None)
+            logger.warning(f"Evicted Whisper model '{size}' to stay within the memory budget")
+
+    def _resident_bytes(self):
+        return sum(self._stats[size]["model_bytes"] for size in self._models)
+
+    def transcribe(self, audio, size=None, word_timestamps=False):
+        """Transcribe with the model for `size`; returns a Whisper-style result whatever the backend."""
+        return self.backend.transcribe(self.get(size), audio, word_timestamps=word_timestamps)
+
+    def warm_up(self):
+        """Load every configured size and run one dummy inference on each."""
+        configured_bytes = 0
+        for size in self.model_sizes:
+            try:
+                self.get(size)
+                with self._lock:
+                    configured_bytes += self._stats[size]["model_bytes"] if size in self._stats else 0
+                if not WHISPER_CONFIG["WHISPER_WARMUP"]:
+                    continue
+                started = time.perf_counter()
+                # One second of silence is enough to build the graph and allocate buffers
+                self.transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32), size)
+                with self._lock:
+                    if size in self._stats:
+                        self._stats[size]["warmup_seconds"] = round(time.perf_counter() - started, 3)
+            except Exception as e:
+                logger.exception(f"Error warming up Whisper model '{size}': {e}")
+        if configured_bytes > self.memory_budget_bytes:
+            # Every request for an evicted size then pays a full model load
+            logger.warning(
+                f"Whisper models {', '.join(self.model_sizes)} need {configured_bytes / 1e6:.0f} MB but the memory "
+                f"budget is {self.memory_budget_bytes / 1e6:.0f} MB; least recently used sizes will be evicted and "
+                f"reloaded on demand. Raise WHISPER_MEMORY_BUDGET_MB or trim WHISPER_MODEL_SIZES."
+            )
+
+    def stats(self):
+        """Load time and memory footprint of the resident models."""
+        with self._lock:
+            return {
+                **self.backend.describe(),
+                "default_model": self.default_size,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "resident_model_bytes": self._resident_bytes(),
+                "process_rss_bytes": process_rss_bytes(),
+                "models": {size: dict(self._stats[size]) for size in self._models},
+            }
+
+
+# Process-wide registry shared by every transcription call
+whisper_registry = WhisperModelRegistry.from_settings()
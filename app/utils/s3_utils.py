@@ -1,48 +1,331 @@
-import boto3
+import os
+import json
+import time
+import logging
 import threading
-import asyncio
-from botocore.exceptions import NoCredentialsError
-from app.config.settings import S3_CONFIG
+from concurrent.futures import ThreadPoolExecutor
+from app.config.settings import S3_CONFIG, S3_TRANSFER_CONFIG
+from app.services.metrics import s3_operation_seconds
 
-def download_file_from_s3(bucket_name, s3_key, local_path, progress_callback=None):
-    s3 = boto3.client(
-        's3',
-        aws_access_key_id=S3_CONFIG["AWS_ACCESS_KEY_ID"],
-        aws_secret_access_key=S3_CONFIG["AWS_SECRET_ACCESS_KEY"]
-    )
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+READ_CHUNK_SIZE = 256 * 1024
+
+class S3TransferService:
+    """Long-lived S3 client with a tuned connection pool, shared by every transfer.
+
+    Large objects are downloaded with parallel ranged GETs, and small transcripts
+    can be uploaded in batches. Request counts, bytes and time are tracked per operation.
+    """
+
+    def __init__(self, max_pool_connections=32, max_attempts=5, multipart_threshold_mb=16,
+                 multipart_chunksize_mb=8, max_concurrency=10, endpoint_url=None, client=None):
+        # boto3 is only imported once S3 is actually used
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.config import Config
+
+        self.client = client or boto3.client(
+            's3',
+            aws_access_key_id=S3_CONFIG["AWS_ACCESS_KEY_ID"],
+            aws_secret_access_key=S3_CONFIG["AWS_SECRET_ACCESS_KEY"],
+            endpoint_url=endpoint_url,
+            config=Config(
+                max_pool_connections=max_pool_connections,
+                retries={"max_attempts": max_attempts, "mode": "adaptive"},
+            ),
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold_mb * MB,
+            multipart_chunksize=multipart_chunksize_mb * MB,
+            max_concurrency=max_concurrency,
+            use_threads=True,
+        )
+        # Ranged GETs and batched uploads share one pool sized to the connection pool
+        self._executor = ThreadPoolExecutor(max_workers=max(max_concurrency, 1), thread_name_prefix="s3")
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            max_pool_connections=S3_TRANSFER_CONFIG["MAX_POOL_CONNECTIONS"],
+            max_attempts=S3_TRANSFER_CONFIG["MAX_ATTEMPTS"],
+            multipart_threshold_mb=S3_TRANSFER_CONFIG["MULTIPART_THRESHOLD_MB"],
+            multipart_chunksize_mb=S3_TRANSFER_CONFIG["MULTIPART_CHUNKSIZE_MB"],
+            max_concurrency=S3_TRANSFER_CONFIG["MAX_CONCURRENCY"],
+            endpoint_url=S3_CONFIG["S3_ENDPOINT_URL"],
+        )
+
+    def _record(self, operation, requests, nbytes, seconds):
+        s3_operation_seconds.observe(seconds, operation=operation)
+        with self._stats_lock:
+            stats = self._stats.setdefault(operation, {"requests": 0, "bytes": 0, "seconds": 0.0})
+            stats["requests"] += requests
+            stats["bytes"] += nbytes
+            stats["seconds"] += seconds
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                operation: {
+                    **stats,
+                    "seconds": round(stats["seconds"], 3),
+                    "bytes_per_sec": round(stats["bytes"] / stats["seconds"]) if stats["seconds"] else 0,
+                }
+                for operation, stats in self._stats.items()
+            }
+
+    def head(self, bucket_name, s3_key):
+        started = time.perf_counter()
+        response = self.client.head_object(Bucket=bucket_name, Key=s3_key)
+        self._record("head", 1, 0, time.perf_counter() - started)
+        return response
+
+    def _get_range(self, bucket_name, s3_key, local_path, start, end, callback):
+        started = time.perf_counter()
+        params = {"Bucket": bucket_name, "Key": s3_key}
+        if end is not None:
+            params["Range"] = f"bytes={start}-{end}"
+        body = self.client.get_object(**params)['Body']
+        received = 0
+        # Each range writes at its own offset, so the parts can land in any order
+        fd = os.open(local_path, os.O_WRONLY)
+        try:
+            for chunk in iter(lambda: body.read(READ_CHUNK_SIZE), b""):
+                os.pwrite(fd, chunk, start + received)
+                received += len(chunk)
+                if callback:
+                    callback(len(chunk))
+        finally:
+            os.close(fd)
+        self._record("get", 1, received, time.perf_counter() - started)
+        return received
+
+    def download_file(self, bucket_name, s3_key, local_path, callback=None, size=None):
+        """Download an object to `local_path` and return its size.
+
+        Objects above the multipart threshold are split into ranged GETs that run in
+        parallel. `callback(bytes_amount)` is called from worker threads as data arrives.
+        """
+        if size is None:
+            size = self.head(bucket_name, s3_key)['ContentLength']
+        with open(local_path, "wb") as f:
+            f.truncate(size)
+
+        chunk_size = self.transfer_config.multipart_chunksize
+        if size < self.transfer_config.multipart_threshold:
+            self._get_range(bucket_name, s3_key, local_path, 0, None, callback)
+            return size
+
+        ranges = [(start, min(start + chunk_size, size) - 1) for start in range(0, size, chunk_size)]
+        futures = [
+            self._executor.submit(self._get_range, bucket_name, s3_key, local_path, start, end, callback)
+            for start, end in ranges
+        ]
+        for future in futures:
+            future.result()
+        return size
+
+    def open_stream(self, bucket_name, s3_key):
+        started = time.perf_counter()
+        body = self.client.get_object(Bucket=bucket_name, Key=s3_key)['Body']
+        self._record("get_stream", 1, 0, time.perf_counter() - started)
+        return body
+
+    def read_text(self, bucket_name, s3_key):
+        started = time.perf_counter()
+        content = self.client.get_object(Bucket=bucket_name, Key=s3_key)['Body'].read()
+        self._record("get", 1, len(content), time.perf_counter() - started)
+        return content.decode('utf-8')
+
+    def upload_text(self, bucket_name, s3_key, content):
+        started = time.perf_counter()
+        body = content.encode('utf-8') if isinstance(content, str) else content
+        self.client.put_object(Bucket=bucket_name, Key=s3_key, Body=body, ContentType='text/plain')
+        self._record("put", 1, len(body), time.perf_counter() - started)
+
+    def upload_texts(self, bucket_name, items):
+        """Upload many (s3_key, content) pairs concurrently; returns the keys that failed."""
+        futures = {
+            self._executor.submit(self.upload_text, bucket_name, s3_key, content): s3_key
+            for s3_key, content in items
+        }
+        failed = []
+        for future, s3_key in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Error uploading {s3_key} to {bucket_name}: {e}")
+                failed.append(s3_key)
+        return failed
+
+    def upload_file(self, bucket_name, s3_key, local_path):
+        """Upload a local file, using multipart upload above the threshold."""
+        started = time.perf_counter()
+        self.client.upload_file(local_path, bucket_name, s3_key, Config=self.transfer_config)
+        self._record("upload_file", 1, os.path.getsize(local_path), time.perf_counter() - started)
+
+    def list_keys(self, bucket_name, prefix, start_after=""):
+        paginator = self.client.get_paginator('list_objects_v2')
+        params = {"Bucket": bucket_name, "Prefix": prefix}
+        if start_after:
+            params["StartAfter"] = start_after
+        for page in paginator.paginate(**params):
+            self._record("list", 1, 0, 0.0)
+            for obj in page.get('Contents', []):
+                yield obj['Key']
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+# Process-wide transfer service, created at startup (or on first use in scripts and workers)
+_s3_service = None
+_s3_service_lock = threading.Lock()
+
+def init_s3_service(service=None):
+    global _s3_service
+    with _s3_service_lock:
+        _s3_service = service or S3TransferService.from_settings()
+    return _s3_service
+
+def get_s3_service():
+    if _s3_service is None:
+        return init_s3_service()
+    return _s3_service
+
+def download_file_from_s3(bucket_name, s3_key, local_path, progress_callback=None, size=None):
+    """Download an object; `progress_callback(bytes_seen, total_size)` runs on transfer threads.
+
+    The callback only fires when the whole-number percentage changes, not for every chunk.
+    Pass `size` when the object was already HEADed to skip another HEAD.
+    """
+    s3 = get_s3_service()
 
     class ProgressPercentage:
-        def __init__(self, filename, loop):
-            self._filename = filename
-            self._size = float(s3.head_object(Bucket=bucket_name, Key=s3_key)['ContentLength'])
+        def __init__(self, size):
+            self._size = float(size) or 1.0
             self._seen_so_far = 0
+            self._last_percent = -1
             self._lock = threading.Lock()
-            self._loop = loop
 
         def __call__(self, bytes_amount):
             with self._lock:
                 self._seen_so_far += bytes_amount
-                percentage = (self._seen_so_far / self._size) * 100
-                if progress_callback:
-                    asyncio.run_coroutine_threadsafe(
-                        progress_callback(self._seen_so_far, self._size),
-                        self._loop
-                    )
+                percent = int(self._seen_so_far * 100 / self._size)
+                if percent == self._last_percent:
+                    return
+                self._last_percent = percent
+                seen = self._seen_so_far
+            progress_callback(seen, self._size)
 
+    from botocore.exceptions import NoCredentialsError
     try:
-        s3.download_file(bucket_name, s3_key, local_path, Callback=ProgressPercentage(s3_key, asyncio.get_event_loop()))
-        print(f"Downloaded {s3_key} to {local_path}")
+        # One HEAD gives the size for both the progress callback and the range split
+        if size is None:
+            size = s3.head(bucket_name, s3_key)['ContentLength']
+        callback = ProgressPercentage(size) if progress_callback else None
+        s3.download_file(bucket_name, s3_key, local_path, callback=callback, size=size)
+        logger.debug(f"Downloaded {s3_key} to {local_path}")
     except NoCredentialsError:
-        print("Credentials not available")
+        logger.error("Credentials not available")
 
 def upload_file_to_s3(bucket_name, s3_key, content):
-    s3 = boto3.client(
-        's3',
-        aws_access_key_id=S3_CONFIG["AWS_ACCESS_KEY_ID"],
-        aws_secret_access_key=S3_CONFIG["AWS_SECRET_ACCESS_KEY"]
-    )
+    from botocore.exceptions import NoCredentialsError
     try:
-        s3.put_object(Bucket=bucket_name, Key=s3_key, Body=content, ContentType='text/plain')
-        print(f"Uploaded {s3_key} to {bucket_name}")
+        get_s3_service().upload_text(bucket_name, s3_key, content)
+        logger.debug(f"Uploaded {s3_key} to {bucket_name}")
     except NoCredentialsError:
-        print("Credentials not available")
\ No newline at end of file
+        logger.error("Credentials not available")
+
+def head_s3_object(bucket_name, s3_key):
+    """HEAD an object; returns None when it does not exist."""
+    from botocore.exceptions import ClientError
+    try:
+        return get_s3_service().head(bucket_name, s3_key)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+
+def open_s3_object_stream(bucket_name, s3_key):
+    """Return the streaming body of an S3 object for incremental reads."""
+    return get_s3_service().open_stream(bucket_name, s3_key)
+
+def s3_key_from_uri(uri):
+    """Strip an optional s3://bucket/ prefix and return the bare object key."""
+    if uri.startswith("s3://"):
+        return uri[len("s3://"):].split("/", 1)[1]
+    return uri
+
+class S3KeyIndex:
+    """Prefix-scoped listing of S3 keys, cached on local disk and refreshed incrementally.
+
+    Used for the rare fuzzy lookups where the exact key is not known. An incremental
+    refresh only lists keys sorted after the newest key already seen; a full, paginated
+    re-list runs every `full_refresh_seconds` to pick up everything else, and on a lookup
+    miss at most every `miss_refresh_seconds`, since a new key can sort before the newest.
+    """
+
+    def __init__(self, bucket_name, prefix, cache_dir, full_refresh_seconds=3600, miss_refresh_seconds=60):
+        self.bucket_name = bucket_name
+        self.prefix = prefix
+        self.full_refresh_seconds = full_refresh_seconds
+        self.miss_refresh_seconds = miss_refresh_seconds
+        safe_name = f"{bucket_name}_{prefix}".replace("/", "_")
+        self.cache_path = os.path.join(cache_dir, f"{safe_name}.json")
+        self._keys = set()
+        self._last_key = ""
+        self._full_refreshed_at = 0.0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+            self._keys = set(cached["keys"])
+            self._last_key = cached["last_key"]
+            self._full_refreshed_at = cached["full_refreshed_at"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = self.cache_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "keys": sorted(self._keys),
+                "last_key": self._last_key,
+                "full_refreshed_at": self._full_refreshed_at,
+            }, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def refresh(self, full=False):
+        with self._lock:
+            full = full or time.time() - self._full_refreshed_at > self.full_refresh_seconds
+            keys = list(get_s3_service().list_keys(self.bucket_name, self.prefix, "" if full else self._last_key))
+            if full:
+                self._keys = set(keys)
+                self._full_refreshed_at = time.time()
+            else:
+                self._keys.update(keys)
+            if self._keys:
+                self._last_key = max(self._keys)
+            self._save()
+            logger.info(f"S3 key index for {self.bucket_name}/{self.prefix}: {len(self._keys)} keys ({'full' if full else 'incremental'} refresh)")
+
+    def _match(self, name, suffix):
+        # refresh() may be updating the set on another thread
+        with self._lock:
+            keys = list(self._keys)
+        return sorted(key for key in keys if name in key and key.endswith(suffix))
+
+    def find(self, name, suffix=".txt"):
+        """Return the first key containing `name` and ending with `suffix`, or None."""
+        matches = self._match(name, suffix)
+        if not matches:
+            self.refresh(full=time.time() - self._full_refreshed_at > self.miss_refresh_seconds)
+            matches = self._match(name, suffix)
+        return matches[0] if matches else None
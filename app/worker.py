@@ -0,0 +1,68 @@
+"""Standalone interview processing workers.
+
+Run one or more of these per node to scale processing horizontally:
+
+    python -m app.worker --processes 4
+
+Each process claims jobs from the shared processing_job table with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of nodes can poll the same database.
+Within a process, JOB_LOOPS_PER_WORKER jobs run at once and share the fair
+scheduler's decode/transcribe slots.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+from app.config.settings import JOB_CONFIG
+
+
+def run_worker_process(worker_index):
+    # Imported here so the spawned child builds its own engine, tunnel and model pool
+    from app.config.db import SessionLocal, init_db, close_db
+    from app.routes.interview import process_files
+    from app.services.jobs import default_worker_id, run_job_worker
+    from app.services.progress_hub import progress_hub
+    from app.services.transcription_engine import transcription_engine
+
+    async def work():
+        # With PROGRESS_BACKEND=postgres, progress reaches WebSocket clients on the API nodes
+        await progress_hub.start()
+        try:
+            await asyncio.gather(*(
+                run_job_worker(SessionLocal, process_files, f"{default_worker_id()}/{worker_index}-{loop}")
+                for loop in range(max(JOB_CONFIG["JOB_LOOPS_PER_WORKER"], 1))
+            ))
+        finally:
+            await progress_hub.stop()
+
+    init_db()
+    transcription_engine.start()
+    try:
+        asyncio.run(work())
+    finally:
+        transcription_engine.shutdown()
+        close_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run interview processing job workers")
+    parser.add_argument("--processes", type=int, default=JOB_CONFIG["JOB_WORKER_PROCESSES"])
+    args = parser.parse_args()
+    # The schedulers size their share of the host from the process count, in this process and in spawned children
+    JOB_CONFIG["JOB_WORKER_PROCESSES"] = args.processes
+    os.environ["JOB_WORKER_PROCESSES"] = str(args.processes)
+
+    if args.processes <= 1:
+        run_worker_process(0)
+        return
+
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=run_worker_process, args=(i,)) for i in range(args.processes)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Compare single-pass and chunked (long-audio mode) transcription on long inputs.
+
+    python -m benchmarks.bench_chunked_transcription --minutes 10 --workers 4 --chunk-seconds 60
+    python -m benchmarks.bench_chunked_transcription --audio answer.wav --reference answer.txt --model base
+
+Without --audio, the input is synthetic "speech": every vocabulary word is a tone burst
+at its own pitch, with short gaps between words and longer pauses between sentences.
+A stub model decodes the tones back into words and burns CPU in proportion to the audio
+length, so the wall-clock comparison reflects real parallelism across worker processes
+and the word error rate shows what cutting and stitching cost. With --audio, the real
+Whisper model transcribes a recording and is scored against a reference transcript.
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+import numpy as np
+from app.services.audio import SAMPLE_RATE
+from app.services.transcription_engine import TranscriptionEngine
+
+VOCABULARY = ("we use a cache because the database query is slow so every request reads "
+              "the index first then falls back to disk when keys expire after an hour").split()
+BASE_HZ, STEP_HZ = 250.0, 45.0
+
+
+def synthetic_speech(minutes, seed=0):
+    """Tone-coded words; returns (audio, reference words)."""
+    rng = random.Random(seed)
+    vocabulary = sorted(set(VOCABULARY))
+    pieces, reference = [], []
+    total = 0.0
+    while total < minutes * 60:
+        for _ in range(rng.randint(8, 15)):
+            word = rng.choice(vocabulary)
+            duration = rng.uniform(0.25, 0.4)
+            t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+            envelope = np.minimum(1.0, np.minimum(t, duration - t) / 0.02)
+            pieces.append(0.3 * envelope * np.sin(2 * np.pi * (BASE_HZ + STEP_HZ * vocabulary.index(word)) * t))
+            pieces.append(np.zeros(int(rng.uniform(0.06, 0.2) * SAMPLE_RATE)))
+            reference.append(word)
+            total += duration
+        pause = rng.uniform(0.6, 1.5)
+        pieces.append(np.zeros(int(pause * SAMPLE_RATE)))
+        total += pause
+    audio = np.concatenate(pieces).astype(np.float32)
+    audio += np.random.default_rng(seed).normal(0, 0.002, len(audio)).astype(np.float32)
+    return audio, reference
+
+
+class ToneModel:
+    """Stands in for Whisper: decodes tone-coded words, spending CPU time proportional to the audio."""
+
+    def __init__(self, realtime_factor):
+        self.realtime_factor = realtime_factor
+        self.vocabulary = sorted(set(VOCABULARY))
+
+    def parameters(self):
+        return []
+
+    def buffers(self):
+        return []
+
+    def transcribe(self, audio, word_timestamps=False, **kwargs):
+        # CPU time rather than wall time, so workers contending for the same cores slow down as Whisper would
+        deadline = time.process_time() + len(audio) / SAMPLE_RATE * self.realtime_factor
+        while time.process_time() < deadline:
+            pass
+
+        frame = SAMPLE_RATE // 100
+        count = len(audio) // frame
+        energy = np.sqrt(np.mean(audio[:count * frame].reshape(count, frame) ** 2, axis=1))
+        voiced = np.concatenate(([0], (energy > 0.05).astype(np.int8), [0]))
+        edges = np.diff(voiced)
+        segments, words = [], []
+        for start, end in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+            if end - start < 5:
+                continue
+            samples = audio[start * frame:end * frame]
+            spectrum = np.abs(np.fft.rfft(samples))
+            pitch = np.argmax(spectrum) * SAMPLE_RATE / len(samples)
+            index = min(max(int(round((pitch - BASE_HZ) / STEP_HZ)), 0), len(self.vocabulary) - 1)
+            word = {"word": " " + self.vocabulary[index], "start": start / 100, "end": end / 100}
+            # A sentence pause ends a segment, as Whisper's segments roughly follow phrases
+            if words and word["start"] - words[-1]["end"] > 0.5:
+                segments.append(words)
+                words = []
+            words.append(word)
+        if words:
+            segments.append(words)
+        return {
+            "text": "".join(w["word"] for segment in segments for w in segment),
+            "segments": [
+                {"start": segment[0]["start"], "end": segment[-1]["end"], "text": "".join(w["word"] for w in segment),
+                 "words": segment if word_timestamps else []}
+                for segment in segments
+            ],
+        }
+
+
+def _tone_model_loader(size, device=None):
+    return ToneModel(float(os.environ.get("BENCH_REALTIME_FACTOR", "0.05")))
+
+
+def _init_tone_worker():
+    # Runs in each spawned worker process in place of the Whisper warm-up
+    from app.services.whisper_registry import whisper_registry
+    whisper_registry.loader = _tone_model_loader
+    whisper_registry.get()
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level edit distance divided by the reference length."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / max(len(reference), 1)
+
+
+def _words(text):
+    return [w.strip(".,?!").lower() for w in text.split() if w.strip(".,?!")]
+
+
+async def _transcribe(engine, audio, repeat):
+    await engine.run(len, [])  # start every worker before timing
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await engine.transcribe_audio(audio)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=10.0, help="length of the synthetic answer")
+    parser.add_argument("--workers", type=int, default=min(os.cpu_count() or 1, 8))
+    parser.add_argument("--chunk-seconds", type=float, default=60.0)
+    parser.add_argument("--overlap-seconds", type=float, default=1.0)
+    parser.add_argument("--realtime-factor", type=float, default=0.05, help="stub CPU seconds per audio second")
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--audio", help="16 kHz mono WAV to transcribe with real Whisper instead")
+    parser.add_argument("--reference", help="reference transcript for --audio")
+    parser.add_argument("--model", default="base", help="Whisper size for --audio")
+    args = parser.parse_args()
+
+    if args.audio:
+        import whisper
+        audio = whisper.load_audio(args.audio)
+        with open(args.reference) as f:
+            reference = _words(f.read())
+        initializer_options = {}
+        os.environ["WHISPER_MODEL_SIZES"] = os.environ["WHISPER_DEFAULT_MODEL"] = args.model
+    else:
+        os.environ["BENCH_REALTIME_FACTOR"] = str(args.realtime_factor)
+        audio, reference = synthetic_speech(args.minutes, args.seed)
+        initializer_options = {"initializer": _init_tone_worker}
+
+    print(f"Input: {len(audio) / SAMPLE_RATE:.0f}s of audio, {len(reference)} reference words, {args.workers} workers")
+    rows = []
+    for name, long_audio_seconds in (("single-pass", 0), ("chunked", 1)):
+        engine = TranscriptionEngine(
+            max_workers=args.workers, queue_depth=args.workers, model_size=args.model,
+            long_audio_seconds=long_audio_seconds, chunk_seconds=args.chunk_seconds,
+            chunk_overlap_seconds=args.overlap_seconds, **initializer_options,
+        )
+        try:
+            seconds, result = asyncio.run(_transcribe(engine, audio, args.repeat))
+        finally:
+            engine.shutdown()
+        chunks = engine.stats()["long_audio_chunks"] // max(engine.stats()["long_audio_chunked"], 1) or 1
+        rows.append((name, seconds, chunks, word_error_rate(reference, _words(result["text"]))))
+
+    baseline = rows[0][1]
+    print(f"{'mode':<14}{'wall s':>10}{'speedup':>10}{'chunks':>8}{'WER':>8}")
+    for name, seconds, chunks, wer in rows:
+        print(f"{name:<14}{seconds:>10.2f}{baseline / seconds:>9.1f}x{chunks:>8}{wer:>8.2%}")
+
+
+if __name__ == "__main__":
+    main()
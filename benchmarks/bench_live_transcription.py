@@ -0,0 +1,84 @@
+"""Time from the end of an answer to its transcript: batch transcription vs. live streaming.
+
+    python -m benchmarks.bench_live_transcription --minutes 3 --speed 4 --workers 2
+
+The answer is tone-coded synthetic speech (see bench_chunked_transcription), decoded by
+the same stub model, which spends --realtime-factor CPU seconds per audio second. In
+batch mode the whole answer is transcribed once it has ended, as process_files does
+after the upload. In live mode it is fed to LiveTranscription as 100 ms PCM frames at
+--speed times real time, so the rolling windows run while the "candidate" is talking
+and only the tail is left when the answer ends. Word error rates show what the rolling
+windows cost in accuracy.
+"""
+import argparse
+import asyncio
+import os
+import time
+import numpy as np
+from app.services.audio import SAMPLE_RATE, PcmStreamDecoder
+from app.services.live_transcription import LiveTranscription
+from app.services.transcription_engine import TranscriptionEngine
+from benchmarks.bench_chunked_transcription import synthetic_speech, word_error_rate, _init_tone_worker, _words
+
+FRAME_SECONDS = 0.1
+
+
+async def _batch(engine, audio):
+    await engine.run(len, [])  # start every worker before timing
+    ended = time.perf_counter()
+    result = await engine.transcribe_audio(audio)
+    return time.perf_counter() - ended, result, 0
+
+
+async def _live(engine, audio, speed, window_seconds, step_seconds):
+    await engine.run(len, [])
+    live = LiveTranscription(engine, PcmStreamDecoder(), window_seconds=window_seconds, step_seconds=step_seconds)
+    pcm = (np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes()
+    frame = int(FRAME_SECONDS * SAMPLE_RATE) * 2
+    started = time.perf_counter()
+    for i, offset in enumerate(range(0, len(pcm), frame)):
+        await live.feed(pcm[offset:offset + frame])
+        # Pace the frames as a recording client would send them
+        await asyncio.sleep(max(started + (i + 1) * FRAME_SECONDS / speed - time.perf_counter(), 0))
+    ended = time.perf_counter()
+    result = await live.finish()
+    return time.perf_counter() - ended, result, live.partials
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=3.0, help="length of the synthetic answer")
+    parser.add_argument("--speed", type=float, default=4.0, help="feed the live answer this many times faster than real time")
+    parser.add_argument("--workers", type=int, default=min(os.cpu_count() or 1, 2))
+    parser.add_argument("--window-seconds", type=float, default=30.0)
+    parser.add_argument("--step-seconds", type=float, default=2.0)
+    parser.add_argument("--realtime-factor", type=float, default=0.05, help="stub CPU seconds per audio second")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ["BENCH_REALTIME_FACTOR"] = str(args.realtime_factor)
+    audio, reference = synthetic_speech(args.minutes, args.seed)
+    print(f"Input: {len(audio) / SAMPLE_RATE:.0f}s answer, {len(reference)} words, {args.workers} workers, "
+          f"live feed at {args.speed:g}x real time")
+
+    rows = []
+    for name in ("batch", "live"):
+        engine = TranscriptionEngine(max_workers=args.workers, queue_depth=args.workers, initializer=_init_tone_worker)
+        try:
+            if name == "batch":
+                seconds, result, partials = asyncio.run(_batch(engine, audio))
+            else:
+                seconds, result, partials = asyncio.run(
+                    _live(engine, audio, args.speed, args.window_seconds, args.step_seconds)
+                )
+        finally:
+            engine.shutdown()
+        rows.append((name, seconds, partials, word_error_rate(reference, _words(result["text"]))))
+
+    print(f"{'mode':<8}{'end->transcript s':>20}{'partials':>10}{'WER':>8}")
+    for name, seconds, partials, wer in rows:
+        print(f"{name:<8}{seconds:>20.2f}{partials:>10}{wer:>8.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Time local grammar/disfluency analysis of synthetic interviews.
+
+    python -m benchmarks.bench_speech_analysis --interviews 50 --answers 10 --words 300
+
+The LLM path needs one request per answer; this measures the local replacement.
+"""
+import argparse
+import random
+import statistics
+import time
+from app.services.speech_analysis import analyze_interview
+
+VOCABULARY = ("the a tuple list is immutable index database query we use it because so and "
+              "of to in for data key value cache um uh you know like").split()
+
+
+def synthetic_answer(rng, word_count):
+    words, clock = [], 0.0
+    for _ in range(word_count):
+        word = rng.choice(VOCABULARY)
+        duration = rng.uniform(0.15, 0.45)
+        words.append({"word": " " + word, "start": round(clock, 3), "end": round(clock + duration, 3)})
+        clock += duration + (rng.uniform(1.0, 2.5) if rng.random() < 0.03 else rng.uniform(0.02, 0.2))
+    text = " ".join(w["word"].strip() for w in words)
+    return {"text": text, "segments": [{"start": 0.0, "end": clock, "text": text, "words": words}]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interviews", type=int, default=50)
+    parser.add_argument("--answers", type=int, default=10)
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    interviews = [[synthetic_answer(rng, args.words) for _ in range(args.answers)] for _ in range(args.interviews)]
+
+    analyze_interview(interviews[0])
+    timings = []
+    for answers in interviews:
+        started = time.perf_counter()
+        analyze_interview(answers)
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    total_answers = args.interviews * args.answers
+    print(f"{args.interviews} interviews x {args.answers} answers x {args.words} words")
+    print(f"per interview: mean {statistics.mean(timings) * 1000:.2f} ms, "
+          f"p50 {timings[len(timings) // 2] * 1000:.2f} ms, p95 {timings[int(len(timings) * 0.95) - 1] * 1000:.2f} ms")
+    print(f"throughput: {total_answers / sum(timings):.0f} answers/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Guard API worker startup: import time of `main`, resident memory, and which heavy modules load.
+
+    python -m benchmarks.bench_startup --runs 5 --max-import-seconds 1.5 --max-rss-mb 150
+
+Each run imports `main` in a fresh interpreter. Exits with status 1 when the median
+import time or peak RSS is over budget, or when a heavy ML/cloud module is imported
+eagerly (they must load on first use).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("torch", "whisper", "moviepy", "openai", "boto3", "botocore", "sshtunnel", "paramiko", "asyncpg")
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import main
+seconds = time.perf_counter() - started
+print(json.dumps({
+    "import_seconds": seconds,
+    "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    "heavy_modules": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def probe():
+    # Direct DB settings so the import never needs the SSH key
+    env = dict(os.environ, ENVIRONMENT_TYPE=os.environ.get("ENVIRONMENT_TYPE", "ec2"), LOG_LEVEL="WARNING")
+    output = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True, env=env).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-seconds", type=float, default=1.5)
+    parser.add_argument("--max-rss-mb", type=float, default=150)
+    args = parser.parse_args()
+
+    results = [probe() for _ in range(args.runs)]
+    import_seconds = statistics.median(r["import_seconds"] for r in results)
+    rss_mb = max(r["peak_rss_bytes"] for r in results) / (1024 * 1024)
+    heavy = sorted({m for r in results for m in r["heavy_modules"]})
+
+    print(f"import main: median {import_seconds:.3f}s over {args.runs} runs (budget {args.max_import_seconds}s)")
+    print(f"peak RSS: {rss_mb:.0f} MB (budget {args.max_rss_mb:.0f} MB)")
+    print(f"heavy modules imported eagerly: {heavy or 'none'}")
+
+    failed = import_seconds > args.max_import_seconds or rss_mb > args.max_rss_mb or heavy
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
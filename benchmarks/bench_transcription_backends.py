@@ -0,0 +1,124 @@
+"""Compare transcription backends, model sizes and thread counts on a local sample set.
+
+    python -m benchmarks.bench_transcription_backends --samples samples/ \\
+        --config whisper:base --config faster-whisper:base:int8 --config faster-whisper:small:int8 --threads 2 4
+
+The sample set is a directory of recordings (any format ffmpeg reads: wav, mp3, mp4,
+webm, ...) with the reference transcript of each in a .txt file of the same name;
+recordings without one are timed but not scored. A config is BACKEND:SIZE[:COMPUTE_TYPE],
+and every config runs once per --threads value, each in a fresh process so load time
+and memory are not skewed by models loaded before it. Reported per run:
+
+  load s     model load time (weights download on first use is not excluded)
+  RTF        transcription seconds per second of audio, after a warm-up; < 1 is faster than real time
+  model MB   memory the weights take (process growth for backends that do not expose it)
+  peak MB    the process's peak resident memory, which is what sizes a worker on a host
+  WER        word error rate against the references, over all scored samples
+
+Run it on the host class being sized, with --threads set to the cores each
+transcription worker will get (cores / TRANSCRIPTION_WORKERS).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+from app.services.audio import SAMPLE_RATE, decode_audio_file
+from app.services.transcription_backends import get_backend
+from app.services.whisper_registry import process_rss_bytes
+from benchmarks.bench_chunked_transcription import word_error_rate, _words
+
+MB = 1024 * 1024
+
+
+def load_samples(directory):
+    """[(name, audio, reference words or None)] for every recording in `directory`."""
+    samples = []
+    for path in sorted(Path(directory).iterdir()):
+        if path.suffix == ".txt" or path.name.startswith(".") or not path.is_file():
+            continue
+        audio, _ = decode_audio_file(str(path))
+        reference_path = path.with_suffix(".txt")
+        reference = _words(reference_path.read_text()) if reference_path.exists() else None
+        samples.append((path.name, audio, reference))
+    return samples
+
+
+def measure(config, threads, beam_size, samples):
+    """Load one model and transcribe every sample with it; meant to run in its own process."""
+    name, size, compute_type = (config.split(":") + [None])[:3]
+    backend = get_backend(name, cpu_threads=threads, beam_size=beam_size, compute_type=compute_type)
+    rss_before = process_rss_bytes()
+    started = time.perf_counter()
+    model = backend.load(size)
+    load_seconds = time.perf_counter() - started
+    model_bytes = backend.model_bytes(model) or max(process_rss_bytes() - rss_before, 0)
+    backend.transcribe(model, np.zeros(SAMPLE_RATE, dtype=np.float32))
+
+    audio_seconds = transcribe_seconds = errors = reference_words = 0
+    for _, audio, reference in samples:
+        started = time.perf_counter()
+        result = backend.transcribe(model, audio)
+        transcribe_seconds += time.perf_counter() - started
+        audio_seconds += len(audio) / SAMPLE_RATE
+        if reference is not None:
+            errors += word_error_rate(reference, _words(result["text"])) * len(reference)
+            reference_words += len(reference)
+    return {
+        "config": config,
+        **backend.describe(),
+        "load_seconds": round(load_seconds, 2),
+        "audio_seconds": round(audio_seconds, 1),
+        "realtime_factor": round(transcribe_seconds / max(audio_seconds, 1e-9), 4),
+        "model_bytes": model_bytes,
+        # ru_maxrss is reported in KB on Linux
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "wer": round(errors / reference_words, 4) if reference_words else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", required=True, help="directory of recordings and their .txt references")
+    parser.add_argument("--config", action="append", help="BACKEND:SIZE[:COMPUTE_TYPE], repeatable "
+                                                          "(default: whisper:base and faster-whisper:base:int8)")
+    parser.add_argument("--threads", type=int, nargs="+", default=[0], help="threads per model (0 = library default)")
+    parser.add_argument("--beam-size", type=int, default=1)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    configs = args.config or ["whisper:base", "faster-whisper:base:int8"]
+
+    samples = load_samples(args.samples)
+    if not samples:
+        parser.error(f"no recordings found in {args.samples}")
+    total = sum(len(audio) for _, audio, _ in samples) / SAMPLE_RATE
+    scored = sum(reference is not None for _, _, reference in samples)
+    print(f"Samples: {len(samples)} recordings, {total:.0f}s of audio, {scored} with references, "
+          f"{os.cpu_count()} cores, beam size {args.beam_size}")
+
+    rows = []
+    for config in configs:
+        for threads in args.threads:
+            # spawn, as the transcription engine does, so each run starts from a clean process
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                try:
+                    rows.append(pool.submit(measure, config, threads, args.beam_size, samples).result())
+                except Exception as e:
+                    print(f"{config} with {threads} threads failed: {e!r}")
+
+    print(f"{'config':<28}{'threads':>8}{'load s':>8}{'RTF':>8}{'model MB':>10}{'peak MB':>9}{'WER':>8}")
+    for row in rows:
+        wer = f"{row['wer']:.2%}" if row["wer"] is not None else "-"
+        print(f"{row['config']:<28}{row['cpu_threads'] or 'auto':>8}{row['load_seconds']:>8.2f}"
+              f"{row['realtime_factor']:>8.3f}{row['model_bytes'] / MB:>10.0f}{row['peak_rss_bytes'] / MB:>9.0f}{wer:>8}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+"""End-to-end benchmark of /process-interview and /score-interview-gpt-4o-mini/stream.
+
+Runs the real FastAPI app, job workers, pipeline and scoring code in one process
+against local stand-ins: moto for S3, a SQLite database, a stub Whisper model whose
+latency scales with the audio length, and the fake scoring backend.
+
+    python -m benchmarks.e2e --interviews 4 --questions 5 --video-seconds 20 --output run.json
+    python -m benchmarks.e2e --interviews 4 --questions 5 --video-seconds 20 --compare run.json
+
+--compare prints the change against a saved run and exits with status 1 when a
+latency percentile or the throughput regresses by more than --threshold.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BUCKET = "seekers3data"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interviews", type=int, default=4)
+    parser.add_argument("--questions", type=int, default=5, help="evaluations (videos) per interview")
+    parser.add_argument("--video-seconds", type=float, default=20.0)
+    parser.add_argument("--whisper-realtime-factor", type=float, default=0.05,
+                        help="stub transcription time per second of audio")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="stub scoring latency in seconds")
+    parser.add_argument("--job-workers", type=int, default=2)
+    parser.add_argument("--audio-mode", choices=["pipe", "file"], default="pipe")
+    parser.add_argument("--workdir", help="keep generated videos and the database here instead of a temp dir")
+    parser.add_argument("--output", help="write the report as JSON")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative regression")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                        help="latency increases smaller than this many seconds are treated as noise")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args, workdir):
+    """Point every setting at the local stand-ins; must run before any app module is imported."""
+    os.environ.update({
+        "ENVIRONMENT_TYPE": "ec2",
+        "AWS_ACCESS_KEY_ID": "benchmark",
+        "AWS_SECRET_ACCESS_KEY": "benchmark",
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "S3_BUCKET_NAME": BUCKET,
+        "S3_KEY_INDEX_DIR": os.path.join(workdir, "s3_key_index"),
+        "MEDIA_CACHE_DIR": os.path.join(workdir, "media_cache"),
+        "SCORING_BACKEND": "fake",
+        "SCORING_FAKE_LATENCY_SECONDS": str(args.llm_latency),
+        "SCORE_CACHE_PATH": os.path.join(workdir, "score_cache.db"),
+        "TRANSCRIPTION_WORKERS": "0",
+        "WHISPER_MODEL_SIZES": "base",
+        "WHISPER_DEFAULT_MODEL": "base",
+        "AUDIO_EXTRACTION_MODE": args.audio_mode,
+        "JOB_API_WORKERS": str(args.job_workers),
+        "JOB_POLL_SECONDS": "0.05",
+    })
+    # The container image ships ffmpeg; locally fall back to the imageio-ffmpeg binary
+    if not shutil.which("ffmpeg"):
+        try:
+            import imageio_ffmpeg
+        except ImportError:
+            sys.exit("ffmpeg is required to generate the synthetic videos")
+        bin_dir = os.path.join(workdir, "bin")
+        os.makedirs(bin_dir, exist_ok=True)
+        link = os.path.join(bin_dir, "ffmpeg")
+        if not os.path.exists(link):
+            os.symlink(imageio_ffmpeg.get_ffmpeg_exe(), link)
+        os.environ["PATH"] = bin_dir + os.pathsep + os.environ["PATH"]
+
+
+def make_video(path, seconds):
+    """A small test-pattern video with a tone, so the audio path does real decoding."""
+    if os.path.exists(path):
+        return
+    subprocess.run([
+        "ffmpeg", "-nostdin", "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc=size=160x120:rate=10:duration={seconds}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+        "-c:v", "mpeg4", "-c:a", "aac", "-shortest", path,
+    ], check=True)
+
+
+class StubWhisperModel:
+    """Sleeps in proportion to the audio length and returns plausible segments with word timings."""
+
+    def __init__(self, realtime_factor):
+        self.realtime_factor = realtime_factor
+
+    def parameters(self):
+        return []
+
+    def buffers(self):
+        return []
+
+    def transcribe(self, audio, word_timestamps=False, **kwargs):
+        from app.services.audio import SAMPLE_RATE
+        if isinstance(audio, str):
+            seconds = os.path.getsize(audio) / (2 * SAMPLE_RATE)
+        else:
+            seconds = len(audio) / SAMPLE_RATE
+        time.sleep(seconds * self.realtime_factor)
+        words = [{"word": f" word{i % 50}", "start": i * 0.4, "end": i * 0.4 + 0.3} for i in range(int(seconds * 2.5))]
+        text = "".join(w["word"] for w in words)
+        return {"text": text, "segments": [{"start": 0.0, "end": seconds, "text": text, "no_speech_prob": 0.0,
+                                            "avg_logprob": -0.2, "words": words if word_timestamps else []}]}
+
+
+def percentiles(values):
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pick(q):
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.mean(ordered), 4),
+        "p50": round(pick(0.50), 4),
+        "p90": round(pick(0.90), 4),
+        "p99": round(pick(0.99), 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+class LoopMonitor:
+    """Measures event-loop lag: how late a periodic sleep wakes up."""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.lags = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(time.perf_counter() - started - self.interval, 0.0))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+def seed(args, workdir, session_factory, s3_client):
+    from app.config.db import Base
+    from app.models.answers import Answers
+    from app.models.evaluation import Evaluation
+    from app.models.interview import Interview
+    from app.models.job import ProcessingJob, ProcessingJobCheckpoint
+    from app.models.questions import Questions
+
+    engine = session_factory.kw["bind"]
+    Base.metadata.create_all(engine, tables=[Evaluation.__table__, ProcessingJob.__table__, ProcessingJobCheckpoint.__table__])
+    Interview.__table__.create(engine)
+    Questions.__table__.create(engine)
+    Answers.__table__.create(engine)
+
+    video = os.path.join(workdir, f"synthetic_{args.video_seconds:g}s.mp4")
+    make_video(video, args.video_seconds)
+    s3_client.create_bucket(Bucket=BUCKET)
+
+    db = session_factory()
+    evaluation_id = 0
+    for question_id in range(1, args.questions + 1):
+        db.add(Questions(question_id=question_id, question_text=f"Question {question_id}", sub_tech="python"))
+        db.add(Answers(answer_id=question_id, question_id=question_id, answer=f"Reference answer {question_id}"))
+    for interview_id in range(1, args.interviews + 1):
+        db.add(Interview(interview_id=interview_id, candidate_id=interview_id, manager_id=1))
+        for question_id in range(1, args.questions + 1):
+            evaluation_id += 1
+            key = f"videos/interview{interview_id}_q{question_id}.mp4"
+            s3_client.upload_file(video, BUCKET, key)
+            db.add(Evaluation(evaluation_id=evaluation_id, interview_id=interview_id, question_id=question_id,
+                              videofile_s3key=f"s3://{BUCKET}/{key}"))
+    db.commit()
+    db.close()
+
+
+async def run(args, workdir):
+    import httpx
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from sqlalchemy.orm import sessionmaker
+    import main
+    from app.config.db import get_db, get_async_db
+    from app.routes import interview as interview_routes
+    from app.services.pipeline import PipelineStage
+    from app.services.whisper_registry import whisper_registry
+    from app.utils.s3_utils import get_s3_service
+
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'benchmark.db')}",
+                           connect_args={"check_same_thread": False, "timeout": 30})
+    # The async routes read while job workers write; WAL keeps readers from hitting "database is locked"
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # The routes use the async session and the job workers the sync one, as against Postgres
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(workdir, 'benchmark.db')}",
+                                       connect_args={"timeout": 30})
+    async_session_factory = async_sessionmaker(async_engine, autocommit=False, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    main.app.dependency_overrides[get_db] = override_get_db
+    main.app.dependency_overrides[get_async_db] = override_get_async_db
+    # Streamed responses open their own session once the request's is gone
+    interview_routes.new_async_session = async_session_factory
+    main.SessionLocal = session_factory
+    whisper_registry.loader = lambda size, device=None: StubWhisperModel(args.whisper_realtime_factor)
+
+    # Time every item through every stage
+    stage_seconds = {}
+
+    class TimedStage(PipelineStage):
+        def __init__(self, name, handler, concurrency=1):
+            async def timed(item):
+                started = time.perf_counter()
+                try:
+                    return await handler(item)
+                finally:
+                    stage_seconds.setdefault(name, []).append(time.perf_counter() - started)
+            super().__init__(name, timed, concurrency)
+
+    interview_routes.PipelineStage = TimedStage
+
+    monitor = LoopMonitor()
+    endpoint_seconds = {"process-interview": [], "score-interview": []}
+    first_result_seconds = []
+    job_seconds = []
+    reprocess_seconds = []
+    forced_seconds = []
+    failures = []
+
+    async with main.app.router.lifespan_context(main.app):
+        seed(args, workdir, session_factory, get_s3_service().client)
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            monitor.start()
+            started = time.perf_counter()
+
+            async def process_and_score(interview_id):
+                request_started = time.perf_counter()
+                response = await client.post("/process-interview", json={"interview_id": interview_id})
+                endpoint_seconds["process-interview"].append(time.perf_counter() - request_started)
+                job_id = response.json()["job_id"]
+                while True:
+                    status = (await client.get(f"/jobs/{job_id}")).json()["status"]
+                    if status in ("completed", "failed"):
+                        break
+                    await asyncio.sleep(0.05)
+                job_seconds.append(time.perf_counter() - request_started)
+                if status != "completed":
+                    failures.append({"interview_id": interview_id, "stage": "process", "status": status})
+                    return
+
+                # Streamed, so the time to the first question's scores is measured along with the whole run
+                request_started = time.perf_counter()
+                first_result, summary = None, None
+                async with client.stream("POST", "/score-interview-gpt-4o-mini/stream",
+                                         json={"interview_id": interview_id}) as response:
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        record = json.loads(line)
+                        if record["type"] == "result" and first_result is None:
+                            first_result = time.perf_counter() - request_started
+                            first_result_seconds.append(first_result)
+                        elif record["type"] == "summary":
+                            summary = record
+                endpoint_seconds["score-interview"].append(time.perf_counter() - request_started)
+                if response.status_code != 200 or summary is None or summary["failed"]:
+                    failures.append({"interview_id": interview_id, "stage": "score", "status": response.status_code})
+
+            async def reprocess(interview_id, force=False):
+                # Every video is unchanged, so processing again should only cost metadata lookups;
+                # forced, everything is transcribed again from the local media cache instead of S3
+                request_started = time.perf_counter()
+                job_id = (await client.post("/process-interview",
+                                            json={"interview_id": interview_id, "force": force})).json()["job_id"]
+                while (status := (await client.get(f"/jobs/{job_id}")).json()["status"]) not in ("completed", "failed"):
+                    await asyncio.sleep(0.05)
+                (forced_seconds if force else reprocess_seconds).append(time.perf_counter() - request_started)
+                if status != "completed":
+                    failures.append({"interview_id": interview_id, "stage": "forced" if force else "reprocess",
+                                     "status": status})
+
+            await asyncio.gather(*(process_and_score(i) for i in range(1, args.interviews + 1)))
+            wall_seconds = time.perf_counter() - started
+            await monitor.stop()
+            completed = args.interviews - len(failures)
+
+            # Timed separately so the throughput figure only covers first-time processing
+            failed_ids = {failure["interview_id"] for failure in failures}
+            await asyncio.gather(*(reprocess(i) for i in range(1, args.interviews + 1) if i not in failed_ids))
+            await asyncio.gather(*(reprocess(i, force=True) for i in range(1, args.interviews + 1) if i not in failed_ids))
+            media_cache_stats = (await client.get("/media-cache")).json()
+    await async_engine.dispose()
+
+    return {
+        "config": {key: value for key, value in vars(args).items()
+                   if key not in ("output", "compare", "workdir", "threshold", "min_delta")},
+        "wall_seconds": round(wall_seconds, 3),
+        "interviews_per_hour": round(completed / wall_seconds * 3600, 1) if wall_seconds else 0.0,
+        "failures": failures,
+        "endpoints": {name: percentiles(values) for name, values in endpoint_seconds.items()},
+        "score_first_result_seconds": percentiles(first_result_seconds),
+        "job_seconds": percentiles(job_seconds),
+        "reprocess_seconds": percentiles(reprocess_seconds),
+        "forced_reprocess_seconds": percentiles(forced_seconds),
+        "media_cache": media_cache_stats,
+        "stages": {name: percentiles(values) for name, values in stage_seconds.items()},
+        "event_loop_lag_seconds": percentiles(monitor.lags),
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+
+
+def _latencies(report):
+    """Flatten a report into {metric name: seconds} for comparison."""
+    flat = {}
+    for group in ("endpoints", "stages"):
+        for name, values in report.get(group, {}).items():
+            for q in ("p50", "p90", "p99"):
+                if q in values:
+                    flat[f"{group}.{name}.{q}"] = values[q]
+    for name in ("job_seconds", "reprocess_seconds", "forced_reprocess_seconds", "score_first_result_seconds",
+                 "event_loop_lag_seconds"):
+        for q in ("p50", "p90", "p99"):
+            if q in report.get(name, {}):
+                flat[f"{name}.{q}"] = report[name][q]
+    return flat
+
+
+def compare(report, baseline, threshold, min_delta=0.005):
+    """Print the change of every metric and return the ones that regressed beyond `threshold`."""
+    regressions = []
+    if report["config"] != baseline.get("config"):
+        print(f"Warning: runs used different settings: {baseline.get('config')} vs {report['config']}")
+    current, previous = _latencies(report), _latencies(baseline)
+    print(f"{'metric':<48}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name in sorted(set(current) & set(previous)):
+        old, new = previous[name], current[name]
+        change = (new - old) / old if old else 0.0
+        flagged = change > threshold and new - old > min_delta
+        print(f"{name:<48}{old:>12.4f}{new:>12.4f}{change:>+10.1%}{'  <-' if flagged else ''}")
+        if flagged:
+            regressions.append(name)
+
+    old, new = baseline["interviews_per_hour"], report["interviews_per_hour"]
+    change = (new - old) / old if old else 0.0
+    flagged = change < -threshold
+    print(f"{'interviews_per_hour':<48}{old:>12.1f}{new:>12.1f}{change:>+10.1%}{'  <-' if flagged else ''}")
+    if flagged:
+        regressions.append("interviews_per_hour")
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="interview-benchmark-")
+    os.makedirs(workdir, exist_ok=True)
+    # A fresh database and caches every run; the generated video is reused when --workdir is given
+    for name in ("benchmark.db", "score_cache.db"):
+        if os.path.exists(os.path.join(workdir, name)):
+            os.remove(os.path.join(workdir, name))
+    configure_environment(args, workdir)
+
+    from moto import mock_aws
+    with mock_aws():
+        report = asyncio.run(run(args, workdir))
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if not args.workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"Regressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,20 @@
-from fastapi import FastAPI, Depends
+import asyncio
+import time
+from fastapi import FastAPI, Depends, Request, HTTPException
+from fastapi.responses import PlainTextResponse
 from app.routes import interview, websocket
-from app.config.db import get_db
+from app.config.db import get_db, SessionLocal, init_db, close_db, get_engine, get_async_engine, dispose_async_db
+from app.config.settings import JOB_CONFIG, SEMANTIC_INDEX_CONFIG, APP_CONFIG
+from app.services.jobs import run_job_worker, default_worker_id, queue_stats
+from app.services.transcription_engine import transcription_engine
+from app.utils.s3_utils import init_s3_service, get_s3_service
+from app.services.score_cache import get_score_cache
+from app.services.metadata_cache import metadata_cache
+from app.services.media_cache import media_cache
+from app.services.scheduler import scheduler
+from app.services.progress_hub import progress_hub
+from app.services.semantic_index import semantic_index, refresh_semantic_index
+from app.services import metrics
 
 app = FastAPI()
 
@@ -8,10 +22,154 @@ app = FastAPI()
 app.include_router(interview.router)
 app.include_router(websocket.router)
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    metrics.http_requests_in_flight.inc()
+    started = time.perf_counter()
+    status = 500
+    try:
+        if metrics.wants_profile(request):
+            with metrics.RequestProfiler(request.url.path) as profiler:
+                response = await call_next(request)
+            response.headers["X-Profile-Path"] = profiler.path
+        else:
+            response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.http_requests_in_flight.dec()
+        # The route template keeps label cardinality bounded (/jobs/{job_id}, not /jobs/123)
+        route = request.scope.get("route")
+        metrics.http_request_seconds.observe(
+            time.perf_counter() - started,
+            method=request.method, route=route.path if route else "unmatched", status=status,
+        )
+
+@app.on_event("startup")
+def init_database():
+    # Registered first: the tunnel and engine are created here rather than at import time
+    init_db()
+    metrics.observe_db_pool(get_engine())
+    metrics.observe_db_pool(get_async_engine().sync_engine, "async")
+    metrics.registry.add_collector(collect_job_queue_depth)
+
+def collect_job_queue_depth():
+    # Refreshes the job_queue_depth gauges on every scrape
+    db = SessionLocal()
+    try:
+        queue_stats(db)
+    finally:
+        db.close()
+
+loop_monitor_stop = asyncio.Event()
+loop_monitor_task = None
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    global loop_monitor_task
+    loop_monitor_task = asyncio.create_task(metrics.monitor_event_loop(loop_monitor_stop))
+
+@app.on_event("startup")
+def start_transcription_engine():
+    # Each transcription worker loads and warms every configured Whisper size once
+    if not APP_CONFIG["API_ONLY"]:
+        transcription_engine.start()
+
+@app.on_event("startup")
+def start_s3_service():
+    # One pooled S3 client per worker, shared by every transfer
+    init_s3_service()
+
+@app.on_event("startup")
+def load_semantic_index():
+    # Memory-map the local index, building it from the database the first time
+    if SEMANTIC_INDEX_CONFIG["SEMANTIC_SCORER"] == "local" and not semantic_index.load():
+        db = SessionLocal()
+        try:
+            refresh_semantic_index(db)
+        finally:
+            db.close()
+
+@app.on_event("startup")
+async def start_progress_hub():
+    await progress_hub.start()
+
+job_worker_stop = asyncio.Event()
+job_worker_tasks = []
+
+@app.on_event("startup")
+async def start_job_workers():
+    # In-process job loops; deploy python -m app.worker and set JOB_API_WORKERS=0 to scale out instead
+    if APP_CONFIG["API_ONLY"]:
+        return
+    for i in range(JOB_CONFIG["JOB_API_WORKERS"]):
+        job_worker_tasks.append(asyncio.create_task(
+            run_job_worker(SessionLocal, interview.process_files, f"{default_worker_id()}/api-{i}", job_worker_stop)
+        ))
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    job_worker_stop.set()
+    for task in job_worker_tasks:
+        task.cancel()
+    await asyncio.gather(*job_worker_tasks, return_exceptions=True)
+    await progress_hub.stop()
+    loop_monitor_stop.set()
+    if loop_monitor_task is not None:
+        loop_monitor_task.cancel()
+    # asyncpg connections have to be closed on the loop that opened them
+    await dispose_async_db()
+
+@app.on_event("shutdown")
+def stop_transcription_engine():
+    transcription_engine.shutdown()
+    get_s3_service().close()
+    close_db()
+
 @app.get("/")
 def read_root():
     return {"message": "Interview API is running!"}
 
 @app.get("/test_db_connection")
 def test_db_connection(db=Depends(get_db)):
-    return {"message": "Connected to the database successfully"}
\ No newline at end of file
+    return {"message": "Connected to the database successfully"}
+
+@app.get("/whisper-models")
+async def whisper_model_stats():
+    if APP_CONFIG["API_ONLY"]:
+        raise HTTPException(status_code=503, detail="Whisper is not loaded in API-only mode")
+    return await transcription_engine.model_stats()
+
+@app.get("/transcription-engine")
+def transcription_engine_stats():
+    return transcription_engine.stats()
+
+@app.get("/s3-stats")
+def s3_transfer_stats():
+    return get_s3_service().stats()
+
+@app.get("/score-cache")
+def score_cache_stats():
+    cache = get_score_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+@app.get("/media-cache")
+def media_cache_stats():
+    return media_cache.stats() if media_cache else {"enabled": False}
+
+@app.get("/metadata-cache")
+def metadata_cache_stats():
+    return metadata_cache.stats()
+
+@app.get("/scheduler")
+def scheduler_stats(db=Depends(get_db)):
+    # Queue depth and waits come from the shared job table, slot usage from this process
+    return {"queue": queue_stats(db), "slots": scheduler.stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/progress-hub")
+def progress_hub_stats():
+    return progress_hub.stats
@@ -0,0 +1,12 @@
+-- Indexes for the columns the API filters and joins on.
+-- CONCURRENTLY avoids locking the tables; run outside a transaction:
+--   psql "$DATABASE_URL" -f migrations/001_evaluation_indexes.sql
+
+-- Evaluations are fetched per interview, and live transcription finds an answer by interview and question.
+-- Writes go through EvaluationBatchWriter, keyed on the evaluation_id primary key.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_evaluation_interview_question
+    ON public.evaluation (interview_id, question_id);
+
+-- Reference answers are looked up by question
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_answers_question_id
+    ON public.answers (question_id);
@@ -0,0 +1,36 @@
+-- Durable job queue for interview processing.
+--   psql "$DATABASE_URL" -f migrations/002_processing_jobs.sql
+
+CREATE TABLE IF NOT EXISTS public.processing_job (
+    job_id        BIGSERIAL PRIMARY KEY,
+    interview_id  BIGINT      NOT NULL,
+    status        VARCHAR(16) NOT NULL DEFAULT 'queued',
+    attempts      INTEGER     NOT NULL DEFAULT 0,
+    worker_id     TEXT,
+    error         TEXT,
+    created_at    TIMESTAMP WITHOUT TIME ZONE,
+    started_at    TIMESTAMP WITHOUT TIME ZONE,
+    heartbeat_at  TIMESTAMP WITHOUT TIME ZONE,
+    finished_at   TIMESTAMP WITHOUT TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS ix_processing_job_interview_id
+    ON public.processing_job (interview_id);
+
+-- Workers claim the oldest queued job
+CREATE INDEX IF NOT EXISTS ix_processing_job_status_created_at
+    ON public.processing_job (status, created_at);
+
+-- At most one active job per interview makes re-submission idempotent
+CREATE UNIQUE INDEX IF NOT EXISTS ux_processing_job_active_interview
+    ON public.processing_job (interview_id)
+    WHERE status IN ('queued', 'running');
+
+-- One row per evaluation finished by a job, so a restarted job resumes
+CREATE TABLE IF NOT EXISTS public.processing_job_checkpoint (
+    job_id         BIGINT NOT NULL REFERENCES public.processing_job (job_id) ON DELETE CASCADE,
+    evaluation_id  BIGINT NOT NULL,
+    asrfile_s3key  TEXT,
+    created_at     TIMESTAMP WITHOUT TIME ZONE,
+    PRIMARY KEY (job_id, evaluation_id)
+);
@@ -0,0 +1,10 @@
+-- Priority classes for the processing job queue.
+--   psql "$DATABASE_URL" -f migrations/003_job_priority.sql
+
+-- 0 = urgent, 1 = normal, 2 = bulk; existing jobs become normal
+ALTER TABLE public.processing_job
+    ADD COLUMN IF NOT EXISTS priority SMALLINT NOT NULL DEFAULT 1;
+
+-- Workers claim the most urgent, then oldest, queued job
+CREATE INDEX IF NOT EXISTS ix_processing_job_status_priority_created_at
+    ON public.processing_job (status, priority, created_at);
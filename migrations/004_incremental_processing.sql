@@ -0,0 +1,13 @@
+-- Source video ETags for incremental reprocessing.
+--   psql "$DATABASE_URL" -f migrations/004_incremental_processing.sql
+
+-- ETag of the video each transcript was made from; NULL for transcripts made before this migration
+ALTER TABLE public.evaluation
+    ADD COLUMN IF NOT EXISTS video_etag TEXT;
+
+ALTER TABLE public.processing_job_checkpoint
+    ADD COLUMN IF NOT EXISTS video_etag TEXT;
+
+-- Jobs submitted with force re-transcribe even current videos
+ALTER TABLE public.processing_job
+    ADD COLUMN IF NOT EXISTS force BOOLEAN NOT NULL DEFAULT FALSE;